@@ -0,0 +1,203 @@
+"""Plain HTTP routes served alongside the Reflex backend.
+
+The Starlette app defined here is passed to ``rx.App(api_transformer=...)``,
+which mounts the Reflex backend underneath it, so these routes share the
+backend's host and port (and the single port used on Databricks Apps).
+"""
+
+import io
+import logging
+from typing import Iterator
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app import metrics, profiling
+from app.db import get_pool, init_error, is_ready, wait_until_ready
+from app.table_engine import EntitySpec, select_sql
+from app.states.tickets_state import TICKET_SPEC
+from app.states.refunds_state import REFUND_SPEC
+from app.states.payments_state import PAYMENT_SPEC
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_ROWS = 10_000
+
+EXPORTS: dict[str, EntitySpec] = {
+    spec.name: spec for spec in (TICKET_SPEC, REFUND_SPEC, PAYMENT_SPEC)
+}
+
+
+def _stream_csv(sql: str, params: dict) -> Iterator[bytes]:
+    """Stream ``COPY (...) TO STDOUT`` output chunk by chunk.
+
+    Postgres does the CSV encoding and only one network buffer is held in
+    memory at a time, regardless of how many rows match.
+    """
+    wait_until_ready()
+    pool = get_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            with cur.copy(
+                f"COPY ({sql}) TO STDOUT WITH (FORMAT CSV, HEADER)", params
+            ) as copy:
+                for data in copy:
+                    yield bytes(data)
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be taken and cleared."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _stream_parquet(spec: EntitySpec, sql: str, params: dict) -> Iterator[bytes]:
+    """Stream a Parquet file one row group per server-side cursor batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {
+        "text": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "date": pa.timestamp("us"),
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+    }
+    schema = pa.schema([(c.name, arrow_types[c.kind]) for c in spec.columns])
+    sink = _DrainableSink()
+    wait_until_ready()
+    pool = get_pool()
+    with pool.connection() as conn:
+        with conn.cursor(name="export_cursor") as cur:
+            cur.itersize = EXPORT_BATCH_ROWS
+            cur.execute(sql, params)
+            with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema) as writer:
+                while rows := cur.fetchmany(EXPORT_BATCH_ROWS):
+                    columns = list(zip(*rows))
+                    writer.write_table(
+                        pa.Table.from_arrays(
+                            [
+                                pa.array(col, type=field.type)
+                                for col, field in zip(columns, schema)
+                            ],
+                            schema=schema,
+                        )
+                    )
+                    yield sink.drain()
+            yield sink.drain()
+
+
+async def export_view(request: Request):
+    """``GET /export/{entity}?format=csv|parquet&filter=&search=&sort=&order=``
+
+    Applies the same filter, search and sort as the matching list page.
+    """
+    entity = request.path_params["entity"]
+    if entity not in EXPORTS:
+        return PlainTextResponse(f"Unknown export '{entity}'", status_code=404)
+    spec = EXPORTS[entity]
+    query = request.query_params
+    fmt = query.get("format", "csv")
+    sql, params = select_sql(
+        spec,
+        query.get("filter", "all"),
+        query.get("search", ""),
+        query.get("sort", spec.default_sort),
+        query.get("order", "desc"),
+    )
+    if fmt == "csv":
+        body = _stream_csv(sql, params)
+        media_type = "text/csv"
+    elif fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return PlainTextResponse(
+                "Parquet export requires the optional 'pyarrow' package.",
+                status_code=501,
+            )
+        body = _stream_parquet(spec, sql, params)
+        media_type = "application/vnd.apache.parquet"
+    else:
+        return PlainTextResponse(f"Unsupported format '{fmt}'", status_code=400)
+    logger.info(f"Streaming {entity} export as {fmt}")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{fmt}"'},
+    )
+
+
+async def ready_view(request: Request):
+    """Readiness probe: 200 once the database is initialized, 503 before."""
+    if is_ready():
+        return PlainTextResponse("ready\n")
+    return PlainTextResponse(
+        f"warming up: {init_error() or 'initializing database'}\n", status_code=503
+    )
+
+
+async def metrics_view(request: Request):
+    """``GET /metrics`` in the Prometheus text exposition format."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+async def profile_index_view(request: Request):
+    """``GET /profile`` lists the events that have been profiled."""
+    events = profiling.profiled_events()
+    if not events:
+        return PlainTextResponse(
+            "No profiles yet. Set PROFILE_SAMPLE_RATE (and optionally "
+            "PROFILE_EVENTS) to enable sampling.\n"
+        )
+    lines = [
+        f"{event}\t{invocations} invocations\t{samples} samples\t/profile/{event}"
+        for event, (invocations, samples) in sorted(events.items())
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n")
+
+
+async def profile_view(request: Request):
+    """``GET /profile/{event}`` collapsed stacks for flamegraph.pl or speedscope."""
+    event = request.path_params["event"]
+    stacks = profiling.collapsed_stacks(event)
+    if not stacks:
+        return PlainTextResponse(f"No samples for '{event}'", status_code=404)
+    return PlainTextResponse(
+        stacks,
+        headers={"Content-Disposition": f'attachment; filename="{event}.folded"'},
+    )
+
+
+api = Starlette(
+    routes=[
+        Route("/export/{entity}", export_view),
+        Route("/ready", ready_view),
+        Route("/metrics", metrics_view),
+        Route("/profile", profile_index_view),
+        Route("/profile/{event}", profile_view),
+    ]
+)
@@ -14,17 +14,16 @@ from app.components.tickets_view import tickets_view
 from app.components.refunds_view import refunds_view
 from app.components.payments_view import payments_view
 from app.components.chat_view import chat_view
-from app.db import ensure_schema
-import logging
-
-_db_error: str | None = None
-try:
-    ensure_schema()
-except Exception as e:
-    _db_error = str(e)
-    logging.error(
-        f"Database initialization failed — the app will start but data operations will fail: {e}"
-    )
+from app.components.admin_view import admin_queries_view
+from app.components.customer_view import customer_view
+from app.components.reconciliation_view import reconciliation_view
+from app.states.admin_state import AdminState
+from app.states.customer_state import CustomerState
+from app.states.reconciliation_state import ReconciliationState
+from app.components.startup_banner import startup_banner
+from app.db import start_database_init
+from app.api import api
+from app.metrics import register_app
 
 
 def dashboard_content() -> rx.Component:
@@ -82,6 +81,7 @@ def dashboard_content() -> rx.Component:
 
 def index() -> rx.Component:
     return rx.el.div(
+        startup_banner(),
         sidebar(),
         rx.el.main(
             rx.cond(
@@ -100,30 +100,70 @@ def index() -> rx.Component:
 
 def tickets_page() -> rx.Component:
     return rx.el.div(
-        sidebar(), tickets_view(), class_name="flex min-h-screen font-['Inter']"
+        startup_banner(),
+        sidebar(),
+        tickets_view(),
+        class_name="flex min-h-screen font-['Inter']",
     )
 
 
 def refunds_page() -> rx.Component:
     return rx.el.div(
-        sidebar(), refunds_view(), class_name="flex min-h-screen font-['Inter']"
+        startup_banner(),
+        sidebar(),
+        refunds_view(),
+        class_name="flex min-h-screen font-['Inter']",
     )
 
 
 def payments_page() -> rx.Component:
     return rx.el.div(
-        sidebar(), payments_view(), class_name="flex min-h-screen font-['Inter']"
+        startup_banner(),
+        sidebar(),
+        payments_view(),
+        class_name="flex min-h-screen font-['Inter']",
+    )
+
+
+def customer_page() -> rx.Component:
+    return rx.el.div(
+        startup_banner(),
+        sidebar(),
+        customer_view(),
+        class_name="flex min-h-screen font-['Inter']",
     )
 
 
 def chat_page() -> rx.Component:
     return rx.el.div(
-        sidebar(), chat_view(), class_name="flex min-h-screen font-['Inter']"
+        startup_banner(),
+        sidebar(),
+        chat_view(),
+        class_name="flex min-h-screen font-['Inter']",
+    )
+
+
+def admin_queries_page() -> rx.Component:
+    return rx.el.div(
+        startup_banner(),
+        sidebar(),
+        admin_queries_view(),
+        class_name="flex min-h-screen font-['Inter']",
+    )
+
+
+def admin_reconciliation_page() -> rx.Component:
+    return rx.el.div(
+        startup_banner(),
+        sidebar(),
+        reconciliation_view(),
+        class_name="flex min-h-screen font-['Inter']",
     )
 
 
 app = rx.App(
     theme=rx.theme(appearance="light"),
+    api_transformer=api,
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
         rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", cross_origin=""),
@@ -133,8 +173,25 @@ app = rx.App(
         ),
     ],
 )
+register_app(app)
+# Database setup runs in the background so pages are served immediately;
+# queries wait for it and a banner shows while it is in progress.
+app.register_lifespan_task(start_database_init)
 app.add_page(index, route="/", on_load=DashboardState.fetch_dashboard_data)
-app.add_page(tickets_page, route="/tickets", on_load=TicketsState.fetch_tickets)
-app.add_page(refunds_page, route="/refunds", on_load=RefundsState.fetch_refunds)
-app.add_page(payments_page, route="/payments", on_load=PaymentsState.fetch_payments)
-app.add_page(chat_page, route="/chat")
\ No newline at end of file
+app.add_page(tickets_page, route="/tickets", on_load=TicketsState.load_page)
+app.add_page(refunds_page, route="/refunds", on_load=RefundsState.load_page)
+app.add_page(payments_page, route="/payments", on_load=PaymentsState.load_page)
+app.add_page(
+    customer_page,
+    route="/customers/[customer_id]",
+    on_load=CustomerState.load_customer,
+)
+app.add_page(chat_page, route="/chat")
+app.add_page(
+    admin_queries_page, route="/admin/queries", on_load=AdminState.load_query_stats
+)
+app.add_page(
+    admin_reconciliation_page,
+    route="/admin/reconciliation",
+    on_load=ReconciliationState.load_report,
+)
@@ -0,0 +1,147 @@
+"""Small in-process TTL cache for query results.
+
+Entries live in namespaces (usually one per table). ``invalidate(namespace)``
+bumps the namespace's generation so every entry cached under it is ignored
+from then on; stale entries simply age out of the LRU.
+
+With several backend workers (``REFLEX_REDIS_URL`` set), a cache created
+with a ``name`` keeps its generations in Redis, so a write in one worker
+invalidates the entries cached by all of them. Values stay in process. The
+Redis traffic runs on a background thread per cache and process, never in
+the caller: ``invalidate`` bumps the local generation at once and queues the
+shared increment, and the thread pushes increments and re-reads the shared
+generations at least every ``GENERATION_REFRESH_SECONDS``, which bounds how
+long another worker can serve an invalidated entry.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.environ.get("REFLEX_REDIS_URL", "")
+GENERATION_REFRESH_SECONDS = float(os.environ.get("GENERATION_REFRESH_SECONDS", "1"))
+
+_redis_client = None
+_redis_pid = None
+
+
+def _redis():
+    """Return a Redis client for this process, or None without REFLEX_REDIS_URL."""
+    global _redis_client, _redis_pid
+    if not REDIS_URL:
+        return None
+    if _redis_client is None or _redis_pid != os.getpid():
+        import redis
+
+        _redis_client = redis.Redis.from_url(
+            REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+        _redis_pid = os.getpid()
+    return _redis_client
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024, name: str = ""):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        # Shared generations as last read from Redis, and increments not yet
+        # sent there; both are exchanged by the sync thread.
+        self._shared_generations: dict[str, int] = {}
+        self._pending_bumps: dict[str, int] = {}
+        self._sync_pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def _shared_key(self, namespace: str) -> str:
+        return f"app:cache:{self.name}:{namespace}:generation"
+
+    def _ensure_sync(self) -> None:
+        """Start this process's sync thread if generations are shared (lock held)."""
+        if not self.name or not REDIS_URL or self._sync_pid == os.getpid():
+            return
+        self._sync_pid = os.getpid()
+        threading.Thread(
+            target=self._sync_generations, name=f"cache-sync-{self.name}", daemon=True
+        ).start()
+
+    def _sync_generations(self) -> None:
+        failing = False
+        while True:
+            with self._lock:
+                bumps, self._pending_bumps = self._pending_bumps, {}
+                namespaces = list(self._shared_generations)
+            try:
+                values = []
+                if namespaces:
+                    pipe = _redis().pipeline(transaction=False)
+                    for namespace, count in bumps.items():
+                        pipe.incrby(self._shared_key(namespace), count)
+                    pipe.mget([self._shared_key(n) for n in namespaces])
+                    values = pipe.execute()[-1]
+            except Exception as e:
+                if not failing:
+                    logger.warning(f"Could not sync cache generations with Redis: {e}")
+                failing = True
+                with self._lock:
+                    for namespace, count in bumps.items():
+                        self._pending_bumps[namespace] = (
+                            self._pending_bumps.get(namespace, 0) + count
+                        )
+            else:
+                failing = False
+                with self._lock:
+                    for namespace, value in zip(namespaces, values):
+                        self._shared_generations[namespace] = int(value or 0)
+            self._wake.wait(GENERATION_REFRESH_SECONDS)
+            self._wake.clear()
+
+    def _key(self, namespace: str, key: Hashable) -> tuple:
+        self._ensure_sync()
+        return (
+            namespace,
+            self._generations.get(namespace, 0),
+            self._shared_generations.setdefault(namespace, 0),
+            key,
+        )
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            full_key = self._key(namespace, key)
+            entry = self._entries.get(full_key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[full_key]
+                return default
+            self._entries.move_to_end(full_key)
+            return value
+
+    def set(self, namespace: str, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            full_key = self._key(namespace, key)
+            self._entries[full_key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            if self.name and REDIS_URL:
+                self._ensure_sync()
+                self._shared_generations.setdefault(namespace, 0)
+                self._pending_bumps[namespace] = (
+                    self._pending_bumps.get(namespace, 0) + 1
+                )
+                self._wake.set()
@@ -0,0 +1,27 @@
+"""Lazily imported SDK clients.
+
+``databricks.sdk`` and ``openai`` together take over a second to import,
+and most processes (every worker start, every hot reload, the CLIs) never
+use them, or only once a chat message is sent. Import them here, on first
+use, rather than at module level elsewhere in the app.
+"""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from databricks.sdk import WorkspaceClient
+    from openai import AsyncOpenAI
+
+
+def workspace_client() -> "WorkspaceClient":
+    """Return a Databricks ``WorkspaceClient`` using ambient credentials."""
+    from databricks.sdk import WorkspaceClient
+
+    return WorkspaceClient()
+
+
+def async_openai(api_key: str, base_url: str) -> "AsyncOpenAI":
+    """Return an ``AsyncOpenAI`` client for an OpenAI-compatible endpoint."""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=api_key, base_url=base_url)
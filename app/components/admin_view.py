@@ -0,0 +1,189 @@
+import reflex as rx
+from app.states.admin_state import AdminState
+from app.components.shared import empty_state
+
+
+def stat_th(label: str) -> rx.Component:
+    return rx.el.th(
+        label,
+        class_name="px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase tracking-wider",
+    )
+
+
+def query_stat_row(row: dict) -> rx.Component:
+    return rx.el.tbody(
+        rx.el.tr(
+            rx.el.td(
+                rx.el.div(
+                    rx.el.button(
+                        rx.icon(
+                            rx.cond(
+                                AdminState.expanded_fingerprint == row["fingerprint"],
+                                "chevron-down",
+                                "chevron-right",
+                            ),
+                            class_name="w-4 h-4 text-gray-400",
+                        ),
+                        on_click=AdminState.toggle_plan(row["fingerprint"]),
+                        class_name="mr-2 p-1 hover:bg-gray-100 rounded-md transition-colors",
+                    ),
+                    rx.el.code(
+                        row["fingerprint"],
+                        class_name="text-xs text-gray-800 break-all",
+                    ),
+                    class_name="flex items-start",
+                ),
+                rx.el.p(row["callers"], class_name="text-xs text-gray-400 mt-1 ml-8"),
+                class_name="px-4 py-3 max-w-xl",
+            ),
+            rx.el.td(row["calls"], class_name="px-4 py-3 text-sm text-gray-900"),
+            rx.el.td(row["mean_ms"], class_name="px-4 py-3 text-sm text-gray-900"),
+            rx.el.td(row["max_ms"], class_name="px-4 py-3 text-sm text-gray-900"),
+            rx.el.td(row["total_ms"], class_name="px-4 py-3 text-sm text-gray-900"),
+            rx.el.td(row["rows"], class_name="px-4 py-3 text-sm text-gray-500"),
+            rx.el.td(row["pool_wait_ms"], class_name="px-4 py-3 text-sm text-gray-500"),
+            rx.el.td(
+                row["slow_calls"],
+                class_name=rx.cond(
+                    row["slow_calls"] != "0",
+                    "px-4 py-3 text-sm font-semibold text-red-600",
+                    "px-4 py-3 text-sm text-gray-500",
+                ),
+            ),
+            class_name="hover:bg-gray-50 transition-colors border-b border-gray-100",
+        ),
+        rx.cond(
+            AdminState.expanded_fingerprint == row["fingerprint"],
+            rx.el.tr(
+                rx.el.td(
+                    rx.cond(
+                        row["plan"] != "",
+                        rx.el.pre(
+                            row["plan"],
+                            class_name="text-xs text-gray-700 bg-gray-50 p-4 rounded-lg overflow-x-auto",
+                        ),
+                        rx.el.p(
+                            "No plan captured yet. Plans are captured for slow read-only queries when EXPLAIN_SLOW_QUERIES=true.",
+                            class_name="text-sm text-gray-500",
+                        ),
+                    ),
+                    col_span=8,
+                    class_name="px-6 py-4 bg-gray-50/50",
+                ),
+            ),
+        ),
+    )
+
+
+def admin_queries_view() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.div(
+                rx.el.h1("Query Statistics", class_name="text-2xl font-bold text-gray-900"),
+                rx.el.p(
+                    "Aggregated since this process started. Queries slower than ",
+                    AdminState.slow_query_ms.to_string(),
+                    " ms are logged.",
+                    class_name="text-sm text-gray-500 mt-1",
+                ),
+            ),
+            rx.el.div(
+                rx.el.button(
+                    rx.icon("refresh-cw", class_name="w-4 h-4 mr-2"),
+                    "Refresh",
+                    on_click=AdminState.load_query_stats,
+                    class_name="flex items-center px-4 py-2 bg-white border border-gray-200 text-gray-700 rounded-xl hover:bg-gray-50 transition-colors text-sm font-medium",
+                ),
+                rx.el.button(
+                    rx.icon("trash-2", class_name="w-4 h-4 mr-2"),
+                    "Reset",
+                    on_click=AdminState.reset_query_stats,
+                    class_name="flex items-center px-4 py-2 bg-white border border-gray-200 text-red-600 rounded-xl hover:bg-red-50 transition-colors text-sm font-medium",
+                ),
+                class_name="flex items-center gap-3",
+            ),
+            class_name="flex justify-between items-center mb-6",
+        ),
+        rx.cond(
+            AdminState.query_rows.length() > 0,
+            rx.el.div(
+                rx.el.table(
+                    rx.el.thead(
+                        rx.el.tr(
+                            stat_th("Statement"),
+                            stat_th("Calls"),
+                            stat_th("Mean ms"),
+                            stat_th("Max ms"),
+                            stat_th("Total ms"),
+                            stat_th("Rows"),
+                            stat_th("Pool wait ms"),
+                            stat_th("Slow"),
+                        ),
+                        class_name="bg-gray-50 border-b border-gray-100",
+                    ),
+                    rx.foreach(AdminState.query_rows, query_stat_row),
+                    class_name="w-full",
+                ),
+                class_name="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-x-auto mb-8",
+            ),
+            empty_state(
+                "database", "No queries yet", "Statistics appear once queries have run."
+            ),
+        ),
+        rx.el.h2("Slow Query Log", class_name="text-lg font-bold text-gray-900 mb-4"),
+        rx.cond(
+            AdminState.slow_rows.length() > 0,
+            rx.el.div(
+                rx.el.table(
+                    rx.el.thead(
+                        rx.el.tr(
+                            stat_th("Time"),
+                            stat_th("Event"),
+                            stat_th("Duration ms"),
+                            stat_th("Rows"),
+                            stat_th("Pool wait ms"),
+                            stat_th("Statement"),
+                        ),
+                        class_name="bg-gray-50 border-b border-gray-100",
+                    ),
+                    rx.el.tbody(
+                        rx.foreach(
+                            AdminState.slow_rows,
+                            lambda q: rx.el.tr(
+                                rx.el.td(
+                                    q["at"],
+                                    class_name="px-4 py-3 text-sm text-gray-500 whitespace-nowrap",
+                                ),
+                                rx.el.td(
+                                    q["caller"], class_name="px-4 py-3 text-sm text-gray-900"
+                                ),
+                                rx.el.td(
+                                    q["duration_ms"],
+                                    class_name="px-4 py-3 text-sm font-semibold text-red-600",
+                                ),
+                                rx.el.td(
+                                    q["rows"], class_name="px-4 py-3 text-sm text-gray-500"
+                                ),
+                                rx.el.td(
+                                    q["pool_wait_ms"],
+                                    class_name="px-4 py-3 text-sm text-gray-500",
+                                ),
+                                rx.el.td(
+                                    rx.el.code(
+                                        q["fingerprint"],
+                                        class_name="text-xs text-gray-800 break-all",
+                                    ),
+                                    class_name="px-4 py-3 max-w-xl",
+                                ),
+                                class_name="border-b border-gray-100",
+                            ),
+                        ),
+                    ),
+                    class_name="w-full",
+                ),
+                class_name="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-x-auto",
+            ),
+            rx.el.p("No slow queries recorded.", class_name="text-sm text-gray-500"),
+        ),
+        class_name="flex-1 md:ml-72 p-8 bg-gray-50/50 min-h-screen",
+    )
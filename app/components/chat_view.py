@@ -73,9 +73,23 @@ def chat_view() -> rx.Component:
             rx.el.div(
                 rx.scroll_area(
                     rx.el.div(
+                        rx.cond(
+                            ChatState.has_earlier,
+                            rx.el.button(
+                                "Show earlier messages",
+                                on_click=ChatState.load_earlier,
+                                class_name="self-center text-xs text-indigo-600 hover:text-indigo-800 font-medium mb-6",
+                            ),
+                        ),
                         rx.foreach(ChatState.messages, message_bubble),
                         rx.cond(
-                            ChatState.loading,
+                            ChatState.streaming_reply != "",
+                            message_bubble(
+                                {"role": "assistant", "content": ChatState.streaming_reply}
+                            ),
+                        ),
+                        rx.cond(
+                            ChatState.loading & (ChatState.streaming_reply == ""),
                             rx.el.div(
                                 rx.el.div(
                                     rx.el.div(
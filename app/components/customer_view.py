@@ -0,0 +1,237 @@
+import reflex as rx
+from app.states.customer_state import CustomerState
+from app.components.shared import empty_state, status_badge
+
+TICKET_STATUS_COLORS = {
+    "open": "bg-green-100 text-green-700",
+    "pending": "bg-yellow-100 text-yellow-700",
+    "resolved": "bg-blue-100 text-blue-700",
+    "closed": "bg-gray-100 text-gray-600",
+}
+PAYMENT_STATUS_COLORS = {
+    "succeeded": "bg-green-100 text-green-700",
+    "pending": "bg-yellow-100 text-yellow-700",
+    "failed": "bg-red-100 text-red-700",
+    "refunded": "bg-violet-100 text-violet-700",
+}
+
+
+def total_card(
+    title: str, value: rx.Var, detail: rx.Var, icon: str, style: str
+) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.icon(icon, class_name="w-5 h-5"),
+            class_name=f"p-2 rounded-lg {style} w-fit mb-3",
+        ),
+        rx.el.p(title, class_name="text-sm font-medium text-gray-500"),
+        rx.el.h3(value, class_name="text-2xl font-bold text-gray-900"),
+        rx.el.p(detail, class_name="text-xs text-gray-500 font-medium mt-1"),
+        class_name="bg-white rounded-2xl p-6 shadow-sm border border-gray-100",
+    )
+
+
+def section(
+    title: str,
+    shown: rx.Var[int],
+    total: rx.Var[int],
+    href: rx.Var[str] | None,
+    rows: rx.Component,
+) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h3(title, class_name="text-lg font-bold text-gray-900"),
+            rx.el.div(
+                rx.el.span(
+                    shown.to_string(),
+                    " of ",
+                    total.to_string(),
+                    class_name="text-xs text-gray-500",
+                ),
+                rx.el.a(
+                    "View all",
+                    rx.icon("arrow-right", class_name="w-3 h-3 ml-1"),
+                    href=href,
+                    class_name="text-xs text-indigo-600 hover:text-indigo-800 flex items-center font-medium",
+                )
+                if href is not None
+                else rx.fragment(),
+                class_name="flex items-center gap-3",
+            ),
+            class_name="flex items-center justify-between mb-4",
+        ),
+        rx.cond(
+            shown > 0,
+            rows,
+            rx.el.p("None.", class_name="text-sm text-gray-400 italic"),
+        ),
+        class_name="bg-white rounded-2xl p-6 shadow-sm border border-gray-100",
+    )
+
+
+def record_row(*children: rx.Component) -> rx.Component:
+    return rx.el.div(
+        *children,
+        class_name="flex items-center justify-between gap-4 py-2 border-b border-gray-100 last:border-0 text-sm",
+    )
+
+
+def refund_badge(approved: rx.Var) -> rx.Component:
+    return rx.cond(
+        approved,
+        rx.el.span(
+            "Approved",
+            class_name="text-xs bg-green-100 text-green-700 px-2 py-0.5 rounded-full",
+        ),
+        rx.cond(
+            approved == None,
+            rx.el.span(
+                "Pending",
+                class_name="text-xs bg-yellow-100 text-yellow-700 px-2 py-0.5 rounded-full",
+            ),
+            rx.el.span(
+                "Denied",
+                class_name="text-xs bg-red-100 text-red-700 px-2 py-0.5 rounded-full",
+            ),
+        ),
+    )
+
+
+def customer_view() -> rx.Component:
+    totals = CustomerState.totals
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h1(
+                "Customer ",
+                rx.el.span(CustomerState.customer, class_name="font-mono"),
+                class_name="text-2xl font-bold text-gray-900",
+            ),
+            rx.el.p(
+                "Tickets, payments and refunds for this customer.",
+                class_name="text-sm text-gray-500 mt-1",
+            ),
+            class_name="mb-6",
+        ),
+        rx.cond(
+            CustomerState.loading,
+            rx.el.div(rx.spinner(), class_name="flex justify-center py-12"),
+            rx.cond(
+                CustomerState.has_records,
+                rx.el.div(
+                    rx.el.div(
+                        total_card(
+                            "Tickets",
+                            totals["tickets"].to_string(),
+                            f"{totals['open_tickets']} open or pending",
+                            "ticket",
+                            "bg-blue-50 text-blue-600",
+                        ),
+                        total_card(
+                            "Paid",
+                            totals["paid"],
+                            f"{totals['payments']} payments",
+                            "dollar-sign",
+                            "bg-emerald-50 text-emerald-600",
+                        ),
+                        total_card(
+                            "Refunded",
+                            totals["refunded"],
+                            f"{totals['refunds']} refunds, {totals['pending_refunds']} pending",
+                            "rotate-ccw",
+                            "bg-amber-50 text-amber-600",
+                        ),
+                        class_name="grid grid-cols-1 md:grid-cols-3 gap-6 mb-6",
+                    ),
+                    rx.el.div(
+                        section(
+                            "Tickets",
+                            CustomerState.tickets.length(),
+                            totals["tickets"].to(int),
+                            f"/tickets?search={CustomerState.customer}",
+                            rx.foreach(
+                                CustomerState.tickets,
+                                lambda t: record_row(
+                                    rx.el.a(
+                                        t["ticket_id"],
+                                        href=f"/tickets?search={t['ticket_id']}",
+                                        class_name="font-mono text-xs text-indigo-600 hover:text-indigo-800 w-24 shrink-0",
+                                    ),
+                                    rx.el.span(
+                                        t["subject"],
+                                        class_name="flex-1 text-gray-700 truncate",
+                                    ),
+                                    status_badge(t["status"], TICKET_STATUS_COLORS),
+                                    rx.el.span(
+                                        t["date"],
+                                        class_name="text-gray-500 w-24 text-right",
+                                    ),
+                                ),
+                            ),
+                        ),
+                        section(
+                            "Payments",
+                            CustomerState.payments.length(),
+                            totals["payments"].to(int),
+                            f"/payments?search={CustomerState.customer}",
+                            rx.foreach(
+                                CustomerState.payments,
+                                lambda p: record_row(
+                                    rx.el.a(
+                                        p["payment_id"],
+                                        href=f"/payments?search={p['payment_id']}",
+                                        class_name="font-mono text-xs text-indigo-600 hover:text-indigo-800 w-24 shrink-0",
+                                    ),
+                                    rx.el.span(
+                                        f"${p['amount']} ",
+                                        p["currency"],
+                                        class_name="flex-1 font-medium text-gray-900",
+                                    ),
+                                    status_badge(p["status"], PAYMENT_STATUS_COLORS),
+                                    rx.el.span(
+                                        p["date"],
+                                        class_name="text-gray-500 w-24 text-right",
+                                    ),
+                                ),
+                            ),
+                        ),
+                        section(
+                            "Refunds",
+                            CustomerState.refunds.length(),
+                            totals["refunds"].to(int),
+                            None,
+                            rx.foreach(
+                                CustomerState.refunds,
+                                lambda r: record_row(
+                                    rx.el.a(
+                                        r["refund_id"],
+                                        href=f"/refunds?search={r['refund_id']}",
+                                        class_name="font-mono text-xs text-indigo-600 hover:text-indigo-800 w-24 shrink-0",
+                                    ),
+                                    rx.el.span(
+                                        r["sku"],
+                                        class_name="flex-1 text-gray-700 truncate",
+                                    ),
+                                    rx.el.span(
+                                        f"${r['amount']}",
+                                        class_name="font-medium text-gray-900",
+                                    ),
+                                    refund_badge(r["approved"]),
+                                    rx.el.span(
+                                        r["date"],
+                                        class_name="text-gray-500 w-24 text-right",
+                                    ),
+                                ),
+                            ),
+                        ),
+                        class_name="grid grid-cols-1 xl:grid-cols-2 gap-6",
+                    ),
+                ),
+                empty_state(
+                    "user-search",
+                    "No records found",
+                    "This customer has no tickets, payments or refunds.",
+                ),
+            ),
+        ),
+        class_name="flex-1 md:ml-72 p-8 bg-gray-50/50 min-h-screen",
+    )
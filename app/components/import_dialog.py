@@ -0,0 +1,109 @@
+import reflex as rx
+from app.states.import_state import ImportState
+
+UPLOAD_ID = "bulk_import_upload"
+
+
+def import_button(entity: str) -> rx.Component:
+    return rx.el.button(
+        rx.icon("upload", class_name="w-4 h-4 mr-2"),
+        "Import",
+        on_click=ImportState.open_import(entity),
+        class_name="flex items-center px-4 py-2 bg-white border border-gray-200 text-gray-700 rounded-xl hover:bg-gray-50 transition-colors text-sm font-medium",
+    )
+
+
+def import_dialog() -> rx.Component:
+    return rx.radix.primitives.dialog.root(
+        rx.radix.primitives.dialog.portal(
+            rx.radix.primitives.dialog.overlay(
+                class_name="fixed inset-0 bg-black/50 backdrop-blur-sm z-40"
+            ),
+            rx.radix.primitives.dialog.content(
+                rx.radix.primitives.dialog.title(
+                    "Bulk Import",
+                    class_name="text-xl font-semibold text-gray-900 mb-2",
+                ),
+                rx.el.p(
+                    "Upload a CSV (with a header row) or JSONL file. Rows whose id "
+                    "already exists are updated; invalid rows are skipped and listed below.",
+                    class_name="text-sm text-gray-500 mb-4",
+                ),
+                rx.upload.root(
+                    rx.el.div(
+                        rx.icon("file-up", class_name="w-8 h-8 text-gray-400 mb-2"),
+                        rx.cond(
+                            rx.selected_files(UPLOAD_ID).length() > 0,
+                            rx.el.span(
+                                rx.selected_files(UPLOAD_ID)[0],
+                                class_name="text-sm font-medium text-gray-900",
+                            ),
+                            rx.el.span(
+                                "Drop a file here or click to browse",
+                                class_name="text-sm text-gray-500",
+                            ),
+                        ),
+                        class_name="flex flex-col items-center justify-center py-8",
+                    ),
+                    id=UPLOAD_ID,
+                    accept={
+                        "text/csv": [".csv"],
+                        "application/x-ndjson": [".jsonl", ".ndjson"],
+                    },
+                    max_files=1,
+                    class_name="border-2 border-dashed border-gray-200 rounded-xl cursor-pointer hover:border-indigo-300 mb-4",
+                ),
+                rx.cond(
+                    ImportState.summary != "",
+                    rx.el.div(
+                        rx.el.p(
+                            ImportState.summary,
+                            class_name="text-sm font-medium text-gray-900 mb-2",
+                        ),
+                        rx.cond(
+                            ImportState.error_count > 0,
+                            rx.el.div(
+                                rx.foreach(
+                                    ImportState.errors,
+                                    lambda err: rx.el.div(
+                                        rx.el.span(
+                                            "Line ",
+                                            err["line"],
+                                            class_name="text-xs font-mono text-gray-500 w-20 shrink-0",
+                                        ),
+                                        rx.el.span(
+                                            err["message"],
+                                            class_name="text-xs text-red-700",
+                                        ),
+                                        class_name="flex py-1 border-b border-gray-100 last:border-0",
+                                    ),
+                                ),
+                                class_name="max-h-48 overflow-y-auto bg-red-50/50 rounded-lg px-3 py-2",
+                            ),
+                        ),
+                        class_name="mb-4",
+                    ),
+                ),
+                rx.el.div(
+                    rx.el.button(
+                        "Close",
+                        type="button",
+                        on_click=ImportState.close_import,
+                        class_name="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-lg hover:bg-gray-50",
+                    ),
+                    rx.el.button(
+                        rx.cond(ImportState.importing, rx.spinner(size="1"), "Import"),
+                        on_click=ImportState.handle_upload(
+                            rx.upload_files(upload_id=UPLOAD_ID)
+                        ),
+                        disabled=ImportState.importing,
+                        class_name="flex items-center px-4 py-2 text-sm font-medium text-white bg-indigo-600 rounded-lg hover:bg-indigo-700 disabled:opacity-50",
+                    ),
+                    class_name="flex justify-end gap-3 pt-4 border-t border-gray-100",
+                ),
+                class_name="fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2 bg-white rounded-2xl shadow-xl p-6 w-full max-w-lg z-50",
+            ),
+        ),
+        open=ImportState.is_open,
+        on_open_change=ImportState.close_import,
+    )
@@ -1,12 +1,25 @@
 import reflex as rx
-from app.states.payments_state import PaymentsState
+from app.states.payments_state import PaymentsState, PAYMENT_SPEC
 from app.components.shared import (
+    row_column,
     form_field,
     th,
     status_badge,
     empty_state,
     pagination_control,
+    virtual_row,
+    virtual_table,
+    expanded_detail,
+    scroll_mode_toggle,
+    scroll_status,
+    export_links,
 )
+from app.components.import_dialog import import_button, import_dialog
+
+
+def col(payment: rx.Var, name: str) -> rx.Var:
+    """A column of a ``PaymentsState.rows`` row."""
+    return row_column(PAYMENT_SPEC, payment, name)
 
 
 def payment_modal() -> rx.Component:
@@ -23,19 +36,26 @@ def payment_modal() -> rx.Component:
                     class_name="text-xl font-semibold text-gray-900 mb-4",
                 ),
                 rx.el.form(
+                    rx.el.input(
+                        type="hidden",
+                        name="idempotency_key",
+                        value=rx.cond(
+                            PaymentsState.is_edit_mode, "", PaymentsState.form_token
+                        ),
+                    ),
                     rx.cond(
                         PaymentsState.is_edit_mode,
                         rx.el.input(
                             type="hidden",
                             name="payment_id",
-                            value=PaymentsState.current_payment["payment_id"],
+                            value=PaymentsState.current_row["payment_id"],
                         ),
                     ),
                     form_field(
                         "Customer ID",
                         rx.el.input(
                             name="customer_id",
-                            default_value=PaymentsState.current_payment["customer_id"],
+                            default_value=PaymentsState.current_row["customer_id"],
                             class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 outline-none",
                         ),
                         required=True,
@@ -47,7 +67,7 @@ def payment_modal() -> rx.Component:
                                 rx.el.input(
                                     name="amount_cents",
                                     type="number",
-                                    default_value=PaymentsState.current_payment[
+                                    default_value=PaymentsState.current_row[
                                         "amount_cents"
                                     ],
                                     class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 outline-none",
@@ -61,7 +81,7 @@ def payment_modal() -> rx.Component:
                                 "Currency",
                                 rx.el.input(
                                     name="currency",
-                                    default_value=PaymentsState.current_payment[
+                                    default_value=PaymentsState.current_row[
                                         "currency"
                                     ],
                                     class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 outline-none uppercase",
@@ -82,7 +102,7 @@ def payment_modal() -> rx.Component:
                                 rx.el.option("Failed", value="failed"),
                                 rx.el.option("Refunded", value="refunded"),
                                 name="payment_status",
-                                default_value=PaymentsState.current_payment[
+                                default_value=PaymentsState.current_row[
                                     "payment_status"
                                 ],
                                 class_name="w-full px-3 py-2 border border-gray-300 rounded-lg appearance-none bg-white",
@@ -109,7 +129,7 @@ def payment_modal() -> rx.Component:
                         ),
                         class_name="flex justify-end gap-3 mt-6 pt-6 border-t border-gray-100",
                     ),
-                    on_submit=PaymentsState.save_payment,
+                    on_submit=PaymentsState.save,
                 ),
                 class_name="fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2 bg-white rounded-2xl shadow-xl p-6 w-full max-w-md z-50",
             ),
@@ -119,15 +139,94 @@ def payment_modal() -> rx.Component:
     )
 
 
+def _related_panel() -> rx.Component:
+    return expanded_detail(
+        PaymentsState.expanded_id,
+        PaymentsState.toggle_row(PaymentsState.expanded_id),
+        rx.el.h4(
+            "Related Refunds",
+            class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-3",
+        ),
+        rx.cond(
+            PaymentsState.loading_related,
+            rx.el.div(
+                rx.spinner(size="1"),
+                class_name="py-2",
+            ),
+            rx.cond(
+                PaymentsState.related_refunds.length() > 0,
+                rx.el.div(
+                    rx.foreach(
+                        PaymentsState.related_refunds,
+                        lambda r: rx.el.div(
+                            rx.el.div(
+                                rx.el.span(
+                                    r["date"],
+                                    class_name="text-gray-500 w-24",
+                                ),
+                                rx.el.span(
+                                    r["sku"],
+                                    class_name="font-mono text-gray-700",
+                                ),
+                                rx.cond(
+                                    r["approved"],
+                                    rx.el.span(
+                                        "Approved",
+                                        class_name="text-xs bg-green-100 text-green-700 px-2 py-0.5 rounded-full ml-2",
+                                    ),
+                                    rx.cond(
+                                        r["approved"] == None,
+                                        rx.el.span(
+                                            "Pending",
+                                            class_name="text-xs bg-yellow-100 text-yellow-700 px-2 py-0.5 rounded-full ml-2",
+                                        ),
+                                        rx.el.span(
+                                            "Denied",
+                                            class_name="text-xs bg-red-100 text-red-700 px-2 py-0.5 rounded-full ml-2",
+                                        ),
+                                    ),
+                                ),
+                                class_name="flex items-center text-sm",
+                            ),
+                            rx.el.button(
+                                "View Refund",
+                                rx.icon(
+                                    "arrow-right",
+                                    class_name="w-3 h-3 ml-1",
+                                ),
+                                class_name="text-xs text-indigo-600 hover:text-indigo-800 flex items-center font-medium",
+                                on_click=rx.redirect(
+                                    f"/refunds?search={r['refund_id']}"
+                                ),
+                            ),
+                            class_name="flex items-center justify-between py-2 border-b border-gray-100 last:border-0",
+                        ),
+                    ),
+                    class_name="bg-white rounded-lg border border-gray-200 px-4 py-2",
+                ),
+                rx.el.p(
+                    "No refunds found for this payment.",
+                    class_name="text-sm text-gray-400 italic",
+                ),
+            ),
+        ),
+    )
+
+
 def payments_view() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h1("Stripe Payments", class_name="text-2xl font-bold text-gray-900"),
-            rx.el.button(
-                rx.icon("plus", class_name="w-4 h-4 mr-2"),
-                "Record Payment",
-                on_click=PaymentsState.open_create_modal,
-                class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-xl hover:bg-indigo-700 transition-colors text-sm font-medium",
+            rx.el.div(
+                export_links("payments", PaymentsState.export_query),
+                import_button("payments"),
+                rx.el.button(
+                    rx.icon("plus", class_name="w-4 h-4 mr-2"),
+                    "Record Payment",
+                    on_click=PaymentsState.open_create_modal,
+                    class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-xl hover:bg-indigo-700 transition-colors text-sm font-medium",
+                ),
+                class_name="flex items-center gap-3",
             ),
             class_name="flex justify-between items-center mb-6",
         ),
@@ -139,7 +238,7 @@ def payments_view() -> rx.Component:
                     rx.el.option("Pending", value="pending"),
                     rx.el.option("Failed", value="failed"),
                     rx.el.option("Refunded", value="refunded"),
-                    on_change=PaymentsState.filter_status,
+                    on_change=PaymentsState.set_filter,
                     class_name="pl-3 pr-8 py-2 border border-gray-200 rounded-xl appearance-none bg-white focus:outline-none focus:ring-2 focus:ring-indigo-500",
                 ),
                 rx.icon(
@@ -151,7 +250,7 @@ def payments_view() -> rx.Component:
             rx.el.div(
                 rx.el.input(
                     placeholder="Search payments...",
-                    on_change=PaymentsState.search_payments.debounce(300),
+                    on_change=PaymentsState.search.debounce(300),
                     class_name="w-full pl-10 pr-4 py-2 border border-gray-200 rounded-xl focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent",
                 ),
                 rx.icon(
@@ -160,15 +259,16 @@ def payments_view() -> rx.Component:
                 ),
                 class_name="relative w-64",
             ),
+            scroll_mode_toggle(PaymentsState.infinite, PaymentsState.toggle_infinite),
             class_name="flex gap-4 mb-6",
         ),
         rx.cond(
             PaymentsState.loading,
             rx.el.div(rx.spinner(), class_name="flex justify-center py-12"),
             rx.cond(
-                PaymentsState.payments.length() > 0,
+                PaymentsState.rows.length() > 0,
                 rx.el.div(
-                    rx.el.table(
+                    virtual_table(
                         rx.el.thead(
                             rx.el.tr(
                                 th(
@@ -195,51 +295,55 @@ def payments_view() -> rx.Component:
                                 ),
                                 rx.el.th("", class_name="px-6 py-3"),
                             ),
-                            class_name="bg-gray-50 border-b border-gray-100",
+                            class_name="sticky top-0 z-10 bg-gray-50 border-b border-gray-100",
                         ),
-                        rx.foreach(
-                            PaymentsState.payments,
-                            lambda p: rx.el.tbody(
-                                rx.el.tr(
+                        rx.el.tbody(
+                            rx.foreach(
+                                PaymentsState.rows,
+                                lambda p: virtual_row(
                                     rx.el.td(
                                         rx.el.div(
                                             rx.el.button(
                                                 rx.icon(
                                                     rx.cond(
-                                                        PaymentsState.expanded_payment_id
-                                                        == p["payment_id"],
+                                                        PaymentsState.expanded_id
+                                                        == col(p, "payment_id"),
                                                         "chevron-down",
                                                         "chevron-right",
                                                     ),
                                                     class_name="w-4 h-4 text-gray-400",
                                                 ),
                                                 on_click=PaymentsState.toggle_row(
-                                                    p["payment_id"]
+                                                    col(p, "payment_id")
                                                 ),
                                                 class_name="mr-2 p-1 hover:bg-gray-100 rounded-md transition-colors",
                                             ),
-                                            p["payment_date"],
+                                            col(p, "payment_date"),
                                             class_name="flex items-center",
                                         ),
                                         class_name="px-6 py-4 text-sm text-gray-500 whitespace-nowrap",
                                     ),
                                     rx.el.td(
-                                        p["customer_id"],
+                                        rx.el.a(
+                                            col(p, "customer_id"),
+                                            href=f"/customers/{col(p, 'customer_id')}",
+                                            class_name="hover:text-indigo-600",
+                                        ),
                                         class_name="px-6 py-4 text-sm font-medium text-gray-900",
                                     ),
                                     rx.el.td(
                                         rx.el.span(
                                             "$",
-                                            (p["amount_cents"] / 100).to_string(),
+                                            (col(p, "amount_cents") / 100).to_string(),
                                             " ",
-                                            p["currency"],
+                                            col(p, "currency"),
                                             class_name="font-mono",
                                         ),
                                         class_name="px-6 py-4 text-sm text-gray-900",
                                     ),
                                     rx.el.td(
                                         status_badge(
-                                            p["payment_status"],
+                                            col(p, "payment_status"),
                                             {
                                                 "succeeded": "bg-green-100 text-green-700",
                                                 "pending": "bg-yellow-100 text-yellow-700",
@@ -254,7 +358,7 @@ def payments_view() -> rx.Component:
                                             rx.el.button(
                                                 rx.icon("pencil", class_name="w-4 h-4"),
                                                 on_click=PaymentsState.open_edit_modal(
-                                                    p
+                                                    col(p, "payment_id")
                                                 ),
                                                 class_name="p-2 text-gray-400 hover:text-indigo-600 hover:bg-indigo-50 rounded-lg",
                                             ),
@@ -263,7 +367,7 @@ def payments_view() -> rx.Component:
                                                     "trash-2", class_name="w-4 h-4"
                                                 ),
                                                 on_click=PaymentsState.prompt_delete(
-                                                    p["payment_id"]
+                                                    col(p, "payment_id")
                                                 ),
                                                 class_name="p-2 text-gray-400 hover:text-red-600 hover:bg-red-50 rounded-lg",
                                             ),
@@ -272,110 +376,39 @@ def payments_view() -> rx.Component:
                                         class_name="px-6 py-4",
                                     ),
                                     class_name=rx.cond(
-                                        PaymentsState.expanded_payment_id
-                                        == p["payment_id"],
+                                        PaymentsState.expanded_id
+                                        == col(p, "payment_id"),
                                         "bg-indigo-50/50 border-b border-gray-100",
                                         "hover:bg-gray-50 transition-colors border-b border-gray-100 last:border-0",
                                     ),
                                 ),
-                                rx.cond(
-                                    PaymentsState.expanded_payment_id
-                                    == p["payment_id"],
-                                    rx.el.tr(
-                                        rx.el.td(
-                                            rx.el.div(
-                                                rx.el.h4(
-                                                    "Related Refunds",
-                                                    class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-3",
-                                                ),
-                                                rx.cond(
-                                                    PaymentsState.loading_related,
-                                                    rx.el.div(
-                                                        rx.spinner(size="1"),
-                                                        class_name="py-2",
-                                                    ),
-                                                    rx.cond(
-                                                        PaymentsState.related_refunds.length()
-                                                        > 0,
-                                                        rx.el.div(
-                                                            rx.foreach(
-                                                                PaymentsState.related_refunds,
-                                                                lambda r: rx.el.div(
-                                                                    rx.el.div(
-                                                                        rx.el.span(
-                                                                            r["date"],
-                                                                            class_name="text-gray-500 w-24",
-                                                                        ),
-                                                                        rx.el.span(
-                                                                            r["sku"],
-                                                                            class_name="font-mono text-gray-700",
-                                                                        ),
-                                                                        rx.cond(
-                                                                            r[
-                                                                                "approved"
-                                                                            ],
-                                                                            rx.el.span(
-                                                                                "Approved",
-                                                                                class_name="text-xs bg-green-100 text-green-700 px-2 py-0.5 rounded-full ml-2",
-                                                                            ),
-                                                                            rx.cond(
-                                                                                r[
-                                                                                    "approved"
-                                                                                ]
-                                                                                == None,
-                                                                                rx.el.span(
-                                                                                    "Pending",
-                                                                                    class_name="text-xs bg-yellow-100 text-yellow-700 px-2 py-0.5 rounded-full ml-2",
-                                                                                ),
-                                                                                rx.el.span(
-                                                                                    "Denied",
-                                                                                    class_name="text-xs bg-red-100 text-red-700 px-2 py-0.5 rounded-full ml-2",
-                                                                                ),
-                                                                            ),
-                                                                        ),
-                                                                        class_name="flex items-center text-sm",
-                                                                    ),
-                                                                    rx.el.button(
-                                                                        "View Refund",
-                                                                        rx.icon(
-                                                                            "arrow-right",
-                                                                            class_name="w-3 h-3 ml-1",
-                                                                        ),
-                                                                        class_name="text-xs text-indigo-600 hover:text-indigo-800 flex items-center font-medium",
-                                                                        on_click=rx.redirect(
-                                                                            f"/refunds?search={r['refund_id']}"
-                                                                        ),
-                                                                    ),
-                                                                    class_name="flex items-center justify-between py-2 border-b border-gray-100 last:border-0",
-                                                                ),
-                                                            ),
-                                                            class_name="bg-white rounded-lg border border-gray-200 px-4 py-2",
-                                                        ),
-                                                        rx.el.p(
-                                                            "No refunds found for this payment.",
-                                                            class_name="text-sm text-gray-400 italic",
-                                                        ),
-                                                    ),
-                                                ),
-                                                class_name="p-6 bg-gray-50/80",
-                                            ),
-                                            col_span=5,
-                                            class_name="p-0",
-                                        )
-                                    ),
-                                ),
-                                class_name="divide-y divide-gray-100",
                             ),
+                            class_name="divide-y divide-gray-100",
                         ),
-                        class_name="w-full text-left",
+                        PaymentsState.rows,
+                        PaymentsState.window_start,
+                        PaymentsState.page_rows,
+                        PaymentsState.scroll_to_row,
+                        5,
                     ),
-                    pagination_control(
-                        PaymentsState.page,
-                        PaymentsState.total_pages,
-                        PaymentsState.prev_page,
-                        PaymentsState.next_page,
-                        PaymentsState.total_count,
-                        PaymentsState.page_size,
+                    _related_panel(),
+                    rx.cond(
+                        PaymentsState.infinite,
+                        scroll_status(
+                            PaymentsState.window_start,
+                            PaymentsState.rows.length(),
+                            PaymentsState.total_count,
+                            PaymentsState.loading_more,
+                        ),
+                        pagination_control(
+                            PaymentsState.page,
+                            PaymentsState.total_pages,
+                            PaymentsState.prev_page,
+                            PaymentsState.next_page,
+                            PaymentsState.total_count,
+                            PaymentsState.page_size,
+                            PaymentsState.set_page_size,
+                        ),
                     ),
                     class_name="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-hidden",
                 ),
@@ -387,6 +420,7 @@ def payments_view() -> rx.Component:
             ),
         ),
         payment_modal(),
+        import_dialog(),
         rx.radix.primitives.dialog.root(
             rx.radix.primitives.dialog.portal(
                 rx.radix.primitives.dialog.overlay(
@@ -0,0 +1,145 @@
+import reflex as rx
+from app.states.reconciliation_state import ReconciliationState
+from app.components.admin_view import stat_th
+from app.components.shared import empty_state
+
+
+def kind_card(kind: rx.Var) -> rx.Component:
+    return rx.el.button(
+        rx.el.p(kind["label"], class_name="text-sm font-medium text-gray-500 text-left"),
+        rx.el.h3(
+            kind["count"].to_string(),
+            class_name=rx.cond(
+                kind["count"].to(int) > 0,
+                "text-2xl font-bold text-red-600 text-left",
+                "text-2xl font-bold text-gray-900 text-left",
+            ),
+        ),
+        on_click=ReconciliationState.filter_kind(kind["kind"]),
+        class_name=rx.cond(
+            ReconciliationState.kind_filter == kind["kind"],
+            "bg-white rounded-2xl p-6 shadow-sm border-2 border-indigo-500",
+            "bg-white rounded-2xl p-6 shadow-sm border border-gray-100 hover:border-gray-300 transition-colors",
+        ),
+    )
+
+
+def discrepancy_row(row: rx.Var) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            rx.el.code(row["kind"], class_name="text-xs text-gray-800"),
+            class_name="px-4 py-3 whitespace-nowrap",
+        ),
+        rx.el.td(
+            rx.el.a(
+                row["refund_id"],
+                href=f"/refunds?search={row['refund_id']}",
+                class_name="font-mono text-xs text-indigo-600 hover:text-indigo-800",
+            ),
+            class_name="px-4 py-3",
+        ),
+        rx.el.td(
+            rx.el.a(
+                row["payment_id"],
+                href=f"/payments?search={row['payment_id']}",
+                class_name="font-mono text-xs text-indigo-600 hover:text-indigo-800",
+            ),
+            class_name="px-4 py-3",
+        ),
+        rx.el.td(row["amount"], class_name="px-4 py-3 text-sm text-gray-900"),
+        rx.el.td(row["detail"], class_name="px-4 py-3 text-sm text-gray-500"),
+        class_name="border-b border-gray-100 hover:bg-gray-50 transition-colors",
+    )
+
+
+def reconciliation_view() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.div(
+                rx.el.h1("Reconciliation", class_name="text-2xl font-bold text-gray-900"),
+                rx.el.p(
+                    rx.cond(
+                        ReconciliationState.has_run,
+                        rx.fragment(
+                            "Last run ",
+                            ReconciliationState.finished_at,
+                            " checked ",
+                            ReconciliationState.refunds_checked.to_string(),
+                            " refunds and ",
+                            ReconciliationState.payments_checked.to_string(),
+                            " payments in ",
+                            ReconciliationState.duration,
+                            ".",
+                        ),
+                        "Refunds checked against their payments.",
+                    ),
+                    class_name="text-sm text-gray-500 mt-1",
+                ),
+            ),
+            rx.el.button(
+                rx.cond(
+                    ReconciliationState.running,
+                    rx.spinner(size="1", class_name="mr-2"),
+                    rx.icon("play", class_name="w-4 h-4 mr-2"),
+                ),
+                rx.cond(ReconciliationState.running, "Running...", "Run now"),
+                on_click=ReconciliationState.run_reconciliation,
+                disabled=ReconciliationState.running,
+                class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-xl hover:bg-indigo-700 transition-colors text-sm font-medium disabled:opacity-50",
+            ),
+            class_name="flex justify-between items-center mb-6",
+        ),
+        rx.cond(
+            ReconciliationState.has_run,
+            rx.el.div(
+                rx.el.div(
+                    rx.foreach(ReconciliationState.kind_counts, kind_card),
+                    class_name="grid grid-cols-1 md:grid-cols-2 xl:grid-cols-4 gap-6 mb-6",
+                ),
+                rx.cond(
+                    ReconciliationState.rows.length() > 0,
+                    rx.el.div(
+                        rx.el.table(
+                            rx.el.thead(
+                                rx.el.tr(
+                                    stat_th("Check"),
+                                    stat_th("Refund"),
+                                    stat_th("Payment"),
+                                    stat_th("Amount"),
+                                    stat_th("Detail"),
+                                ),
+                                class_name="bg-gray-50 border-b border-gray-100",
+                            ),
+                            rx.el.tbody(
+                                rx.foreach(ReconciliationState.rows, discrepancy_row)
+                            ),
+                            class_name="w-full",
+                        ),
+                        rx.el.p(
+                            "Showing ",
+                            ReconciliationState.rows.length().to_string(),
+                            " of ",
+                            ReconciliationState.shown_total.to_string(),
+                            " discrepancies.",
+                            class_name="px-4 py-3 text-xs text-gray-500",
+                        ),
+                        class_name="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-x-auto",
+                    ),
+                    rx.el.p(
+                        rx.cond(
+                            ReconciliationState.loading,
+                            "Loading...",
+                            "No discrepancies found.",
+                        ),
+                        class_name="text-sm text-gray-500",
+                    ),
+                ),
+            ),
+            empty_state(
+                "scale",
+                "Not run yet",
+                "Run a reconciliation to check refunds against their payments.",
+            ),
+        ),
+        class_name="flex-1 md:ml-72 p-8 bg-gray-50/50 min-h-screen",
+    )
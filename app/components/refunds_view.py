@@ -1,14 +1,30 @@
 import reflex as rx
-from app.states.refunds_state import RefundsState
+from app.states.refunds_state import RefundsState, REFUND_SPEC
 from app.components.shared import (
+    row_column,
     form_field,
     th,
     status_badge,
     empty_state,
     pagination_control,
+    virtual_row,
+    virtual_table,
+    expanded_detail,
+    scroll_mode_toggle,
+    scroll_status,
+    export_links,
+    bulk_action_bar,
+    bulk_outcomes_panel,
+    select_checkbox,
 )
 
 
+def col(refund: rx.Var, name: str) -> rx.Var:
+    """A column of a ``RefundsState.rows`` row."""
+    return row_column(REFUND_SPEC, refund, name)
+from app.components.import_dialog import import_button, import_dialog
+
+
 def refund_modal() -> rx.Component:
     return rx.radix.primitives.dialog.root(
         rx.radix.primitives.dialog.portal(
@@ -30,14 +46,14 @@ def refund_modal() -> rx.Component:
                         rx.el.input(
                             type="hidden",
                             name="refund_id",
-                            value=RefundsState.current_refund["refund_id"],
+                            value=RefundsState.current_row["refund_id"],
                         ),
                     ),
                     form_field(
                         "Ticket ID",
                         rx.el.input(
                             name="ticket_id",
-                            default_value=RefundsState.current_refund["ticket_id"],
+                            default_value=RefundsState.current_row["ticket_id"],
                             class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 outline-none",
                         ),
                     ),
@@ -45,7 +61,7 @@ def refund_modal() -> rx.Component:
                         "Payment ID",
                         rx.el.input(
                             name="payment_id",
-                            default_value=RefundsState.current_refund["payment_id"],
+                            default_value=RefundsState.current_row["payment_id"],
                             class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 outline-none",
                         ),
                     ),
@@ -53,7 +69,7 @@ def refund_modal() -> rx.Component:
                         "SKU",
                         rx.el.input(
                             name="sku",
-                            default_value=RefundsState.current_refund["sku"],
+                            default_value=RefundsState.current_row["sku"],
                             class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 outline-none",
                         ),
                     ),
@@ -66,10 +82,10 @@ def refund_modal() -> rx.Component:
                                 rx.el.option("Denied", value="false"),
                                 name="approval_status",
                                 default_value=rx.cond(
-                                    RefundsState.current_refund["approved"] == None,
+                                    RefundsState.current_row["approved"] == None,
                                     "pending",
                                     rx.cond(
-                                        RefundsState.current_refund["approved"],
+                                        RefundsState.current_row["approved"],
                                         "true",
                                         "false",
                                     ),
@@ -97,7 +113,7 @@ def refund_modal() -> rx.Component:
                         ),
                         class_name="flex justify-end gap-3 mt-6 pt-6 border-t border-gray-100",
                     ),
-                    on_submit=RefundsState.save_refund,
+                    on_submit=RefundsState.save,
                 ),
                 class_name="fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2 bg-white rounded-2xl shadow-xl p-6 w-full max-w-md z-50",
             ),
@@ -107,15 +123,125 @@ def refund_modal() -> rx.Component:
     )
 
 
+def _related_panel() -> rx.Component:
+    return expanded_detail(
+        RefundsState.expanded_id,
+        RefundsState.toggle_row(RefundsState.expanded_id),
+        rx.cond(
+            RefundsState.loading_related,
+            rx.el.div(
+                rx.spinner(size="1"),
+                class_name="py-4 flex justify-center",
+            ),
+            rx.el.div(
+                rx.el.div(
+                    rx.el.h4(
+                        "Related Ticket",
+                        class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-2",
+                    ),
+                    rx.el.div(
+                        rx.el.div(
+                            rx.el.span(
+                                "Subject:",
+                                class_name="text-sm text-gray-500 w-20",
+                            ),
+                            rx.el.span(
+                                RefundsState.related_ticket["subject"],
+                                class_name="text-sm font-medium text-gray-900",
+                            ),
+                            class_name="flex mb-1",
+                        ),
+                        rx.el.div(
+                            rx.el.span(
+                                "Customer:",
+                                class_name="text-sm text-gray-500 w-20",
+                            ),
+                            rx.el.a(
+                                RefundsState.related_ticket["customer_id"],
+                                href=f"/customers/{RefundsState.related_ticket['customer_id']}",
+                                class_name="text-sm font-mono text-gray-700 hover:text-indigo-600",
+                            ),
+                            class_name="flex mb-1",
+                        ),
+                        rx.el.div(
+                            rx.el.span(
+                                "Status:",
+                                class_name="text-sm text-gray-500 w-20",
+                            ),
+                            rx.el.span(
+                                RefundsState.related_ticket["status"],
+                                class_name="text-sm capitalize text-gray-900",
+                            ),
+                            class_name="flex",
+                        ),
+                        class_name="bg-white p-3 rounded-lg border border-gray-200",
+                    ),
+                    class_name="flex-1",
+                ),
+                rx.el.div(
+                    rx.el.h4(
+                        "Related Payment",
+                        class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-2",
+                    ),
+                    rx.el.div(
+                        rx.el.div(
+                            rx.el.span(
+                                "Amount:",
+                                class_name="text-sm text-gray-500 w-20",
+                            ),
+                            rx.el.span(
+                                f"${RefundsState.related_payment['amount']}",
+                                class_name="text-sm font-medium text-gray-900",
+                            ),
+                            class_name="flex mb-1",
+                        ),
+                        rx.el.div(
+                            rx.el.span(
+                                "Status:",
+                                class_name="text-sm text-gray-500 w-20",
+                            ),
+                            rx.el.span(
+                                RefundsState.related_payment["status"],
+                                class_name="text-sm capitalize text-gray-900",
+                            ),
+                            class_name="flex mb-1",
+                        ),
+                        rx.el.div(
+                            rx.el.span(
+                                "ID:",
+                                class_name="text-sm text-gray-500 w-20",
+                            ),
+                            rx.el.a(
+                                RefundsState.related_payment["payment_id"],
+                                href=f"/payments?search={RefundsState.related_payment['payment_id']}",
+                                class_name="text-sm text-indigo-600 hover:underline font-mono truncate",
+                            ),
+                            class_name="flex",
+                        ),
+                        class_name="bg-white p-3 rounded-lg border border-gray-200",
+                    ),
+                    class_name="flex-1",
+                ),
+                class_name="grid grid-cols-1 md:grid-cols-2 gap-4",
+            ),
+        ),
+    )
+
+
 def refunds_view() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h1("Refund Requests", class_name="text-2xl font-bold text-gray-900"),
-            rx.el.button(
-                rx.icon("plus", class_name="w-4 h-4 mr-2"),
-                "New Refund",
-                on_click=RefundsState.open_create_modal,
-                class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-xl hover:bg-indigo-700 transition-colors text-sm font-medium",
+            rx.el.div(
+                export_links("refunds", RefundsState.export_query),
+                import_button("refunds"),
+                rx.el.button(
+                    rx.icon("plus", class_name="w-4 h-4 mr-2"),
+                    "New Refund",
+                    on_click=RefundsState.open_create_modal,
+                    class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-xl hover:bg-indigo-700 transition-colors text-sm font-medium",
+                ),
+                class_name="flex items-center gap-3",
             ),
             class_name="flex justify-between items-center mb-6",
         ),
@@ -126,7 +252,7 @@ def refunds_view() -> rx.Component:
                     rx.el.option("Pending", value="pending"),
                     rx.el.option("Approved", value="approved"),
                     rx.el.option("Denied", value="denied"),
-                    on_change=RefundsState.filter_approval,
+                    on_change=RefundsState.set_filter,
                     class_name="pl-3 pr-8 py-2 border border-gray-200 rounded-xl appearance-none bg-white focus:outline-none focus:ring-2 focus:ring-indigo-500",
                 ),
                 rx.icon(
@@ -138,7 +264,7 @@ def refunds_view() -> rx.Component:
             rx.el.div(
                 rx.el.input(
                     placeholder="Search ticket or payment ID...",
-                    on_change=RefundsState.search_refunds.debounce(300),
+                    on_change=RefundsState.search.debounce(300),
                     class_name="w-full pl-10 pr-4 py-2 border border-gray-200 rounded-xl focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent",
                 ),
                 rx.icon(
@@ -147,17 +273,41 @@ def refunds_view() -> rx.Component:
                 ),
                 class_name="relative w-64",
             ),
+            scroll_mode_toggle(RefundsState.infinite, RefundsState.toggle_infinite),
             class_name="flex gap-4 mb-6",
         ),
+        bulk_action_bar(
+            RefundsState.selected_ids.length(),
+            [
+                ("Approve", "check", RefundsState.bulk_set("true")),
+                ("Deny", "x", RefundsState.bulk_set("false")),
+                (
+                    "Reset to Pending",
+                    "rotate-ccw",
+                    RefundsState.bulk_set("pending"),
+                ),
+            ],
+            RefundsState.clear_selection,
+        ),
+        bulk_outcomes_panel(
+            RefundsState.bulk_outcomes, RefundsState.dismiss_bulk_outcomes
+        ),
         rx.cond(
             RefundsState.loading,
             rx.el.div(rx.spinner(), class_name="flex justify-center py-12"),
             rx.cond(
-                RefundsState.refunds.length() > 0,
+                RefundsState.rows.length() > 0,
                 rx.el.div(
-                    rx.el.table(
+                    virtual_table(
                         rx.el.thead(
                             rx.el.tr(
+                                rx.el.th(
+                                    select_checkbox(
+                                        RefundsState.page_selected,
+                                        RefundsState.set_page_selected,
+                                    ),
+                                    class_name="pl-6 py-3 w-4",
+                                ),
                                 th(
                                     "Date",
                                     "request_date",
@@ -176,57 +326,66 @@ def refunds_view() -> rx.Component:
                                 th("Status", "approved", "", "", None),
                                 rx.el.th("", class_name="px-6 py-3"),
                             ),
-                            class_name="bg-gray-50 border-b border-gray-100",
+                            class_name="sticky top-0 z-10 bg-gray-50 border-b border-gray-100",
                         ),
-                        rx.foreach(
-                            RefundsState.refunds,
-                            lambda r: rx.el.tbody(
-                                rx.el.tr(
+                        rx.el.tbody(
+                            rx.foreach(
+                                RefundsState.rows,
+                                lambda r: virtual_row(
+                                    rx.el.td(
+                                        select_checkbox(
+                                            RefundsState.selected_ids.contains(
+                                                col(r, "refund_id")
+                                            ),
+                                            lambda _checked: RefundsState.toggle_select(
+                                                col(r, "refund_id")
+                                            ),
+                                        ),
+                                        class_name="pl-6 py-4 w-4",
+                                    ),
                                     rx.el.td(
                                         rx.el.div(
                                             rx.el.button(
                                                 rx.icon(
                                                     rx.cond(
-                                                        RefundsState.expanded_refund_id
-                                                        == r["refund_id"],
+                                                        RefundsState.expanded_id
+                                                        == col(r, "refund_id"),
                                                         "chevron-down",
                                                         "chevron-right",
                                                     ),
                                                     class_name="w-4 h-4 text-gray-400",
                                                 ),
                                                 on_click=RefundsState.toggle_row(
-                                                    r["refund_id"],
-                                                    r["ticket_id"],
-                                                    r["payment_id"],
+                                                    col(r, "refund_id")
                                                 ),
                                                 class_name="mr-2 p-1 hover:bg-gray-100 rounded-md transition-colors",
                                             ),
-                                            r["request_date"],
+                                            col(r, "request_date"),
                                             class_name="flex items-center",
                                         ),
                                         class_name="px-6 py-4 text-sm text-gray-900",
                                     ),
                                     rx.el.td(
                                         rx.el.a(
-                                            r["ticket_id"],
-                                            href=f"/tickets?search={r['ticket_id']}",
+                                            col(r, "ticket_id"),
+                                            href=f"/tickets?search={col(r, 'ticket_id')}",
                                             class_name="text-indigo-600 hover:text-indigo-900 hover:underline font-mono",
                                         ),
                                         class_name="px-6 py-4 text-sm",
                                     ),
                                     rx.el.td(
-                                        r["sku"],
+                                        col(r, "sku"),
                                         class_name="px-6 py-4 text-sm text-gray-500",
                                     ),
                                     rx.el.td(
                                         rx.cond(
-                                            r["approved"] == None,
+                                            col(r, "approved") == None,
                                             rx.el.span(
                                                 "Pending",
                                                 class_name="px-2 py-1 bg-yellow-100 text-yellow-700 text-xs rounded-full font-medium",
                                             ),
                                             rx.cond(
-                                                r["approved"],
+                                                col(r, "approved"),
                                                 rx.el.span(
                                                     "Approved",
                                                     class_name="px-2 py-1 bg-green-100 text-green-700 text-xs rounded-full font-medium",
@@ -244,7 +403,7 @@ def refunds_view() -> rx.Component:
                                             rx.el.button(
                                                 rx.icon("pencil", class_name="w-4 h-4"),
                                                 on_click=RefundsState.open_edit_modal(
-                                                    r
+                                                    col(r, "refund_id")
                                                 ),
                                                 class_name="p-2 text-gray-400 hover:text-indigo-600 hover:bg-indigo-50 rounded-lg",
                                             ),
@@ -253,7 +412,7 @@ def refunds_view() -> rx.Component:
                                                     "trash-2", class_name="w-4 h-4"
                                                 ),
                                                 on_click=RefundsState.prompt_delete(
-                                                    r["refund_id"]
+                                                    col(r, "refund_id")
                                                 ),
                                                 class_name="p-2 text-gray-400 hover:text-red-600 hover:bg-red-50 rounded-lg",
                                             ),
@@ -262,141 +421,39 @@ def refunds_view() -> rx.Component:
                                         class_name="px-6 py-4",
                                     ),
                                     class_name=rx.cond(
-                                        RefundsState.expanded_refund_id
-                                        == r["refund_id"],
+                                        RefundsState.expanded_id
+                                        == col(r, "refund_id"),
                                         "bg-indigo-50/50 border-b border-gray-100",
                                         "hover:bg-gray-50 transition-colors border-b border-gray-100 last:border-0",
                                     ),
                                 ),
-                                rx.cond(
-                                    RefundsState.expanded_refund_id == r["refund_id"],
-                                    rx.el.tr(
-                                        rx.el.td(
-                                            rx.el.div(
-                                                rx.cond(
-                                                    RefundsState.loading_related,
-                                                    rx.el.div(
-                                                        rx.spinner(size="1"),
-                                                        class_name="py-4 flex justify-center",
-                                                    ),
-                                                    rx.el.div(
-                                                        rx.el.div(
-                                                            rx.el.h4(
-                                                                "Related Ticket",
-                                                                class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-2",
-                                                            ),
-                                                            rx.el.div(
-                                                                rx.el.div(
-                                                                    rx.el.span(
-                                                                        "Subject:",
-                                                                        class_name="text-sm text-gray-500 w-20",
-                                                                    ),
-                                                                    rx.el.span(
-                                                                        RefundsState.related_ticket[
-                                                                            "subject"
-                                                                        ],
-                                                                        class_name="text-sm font-medium text-gray-900",
-                                                                    ),
-                                                                    class_name="flex mb-1",
-                                                                ),
-                                                                rx.el.div(
-                                                                    rx.el.span(
-                                                                        "Customer:",
-                                                                        class_name="text-sm text-gray-500 w-20",
-                                                                    ),
-                                                                    rx.el.span(
-                                                                        RefundsState.related_ticket[
-                                                                            "customer_id"
-                                                                        ],
-                                                                        class_name="text-sm font-mono text-gray-700",
-                                                                    ),
-                                                                    class_name="flex mb-1",
-                                                                ),
-                                                                rx.el.div(
-                                                                    rx.el.span(
-                                                                        "Status:",
-                                                                        class_name="text-sm text-gray-500 w-20",
-                                                                    ),
-                                                                    rx.el.span(
-                                                                        RefundsState.related_ticket[
-                                                                            "status"
-                                                                        ],
-                                                                        class_name="text-sm capitalize text-gray-900",
-                                                                    ),
-                                                                    class_name="flex",
-                                                                ),
-                                                                class_name="bg-white p-3 rounded-lg border border-gray-200",
-                                                            ),
-                                                            class_name="flex-1",
-                                                        ),
-                                                        rx.el.div(
-                                                            rx.el.h4(
-                                                                "Related Payment",
-                                                                class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-2",
-                                                            ),
-                                                            rx.el.div(
-                                                                rx.el.div(
-                                                                    rx.el.span(
-                                                                        "Amount:",
-                                                                        class_name="text-sm text-gray-500 w-20",
-                                                                    ),
-                                                                    rx.el.span(
-                                                                        f"${RefundsState.related_payment['amount']}",
-                                                                        class_name="text-sm font-medium text-gray-900",
-                                                                    ),
-                                                                    class_name="flex mb-1",
-                                                                ),
-                                                                rx.el.div(
-                                                                    rx.el.span(
-                                                                        "Status:",
-                                                                        class_name="text-sm text-gray-500 w-20",
-                                                                    ),
-                                                                    rx.el.span(
-                                                                        RefundsState.related_payment[
-                                                                            "status"
-                                                                        ],
-                                                                        class_name="text-sm capitalize text-gray-900",
-                                                                    ),
-                                                                    class_name="flex mb-1",
-                                                                ),
-                                                                rx.el.div(
-                                                                    rx.el.span(
-                                                                        "ID:",
-                                                                        class_name="text-sm text-gray-500 w-20",
-                                                                    ),
-                                                                    rx.el.a(
-                                                                        r["payment_id"],
-                                                                        href=f"/payments?search={r['payment_id']}",
-                                                                        class_name="text-sm text-indigo-600 hover:underline font-mono truncate",
-                                                                    ),
-                                                                    class_name="flex",
-                                                                ),
-                                                                class_name="bg-white p-3 rounded-lg border border-gray-200",
-                                                            ),
-                                                            class_name="flex-1",
-                                                        ),
-                                                        class_name="grid grid-cols-1 md:grid-cols-2 gap-4",
-                                                    ),
-                                                ),
-                                                class_name="p-6 bg-gray-50/80",
-                                            ),
-                                            col_span=5,
-                                            class_name="p-0",
-                                        )
-                                    ),
-                                ),
-                                class_name="divide-y divide-gray-100",
                             ),
+                            class_name="divide-y divide-gray-100",
                         ),
-                        class_name="w-full text-left",
+                        RefundsState.rows,
+                        RefundsState.window_start,
+                        RefundsState.page_rows,
+                        RefundsState.scroll_to_row,
+                        6,
                     ),
-                    pagination_control(
-                        RefundsState.page,
-                        RefundsState.total_pages,
-                        RefundsState.prev_page,
-                        RefundsState.next_page,
-                        RefundsState.total_count,
-                        RefundsState.page_size,
+                    _related_panel(),
+                    rx.cond(
+                        RefundsState.infinite,
+                        scroll_status(
+                            RefundsState.window_start,
+                            RefundsState.rows.length(),
+                            RefundsState.total_count,
+                            RefundsState.loading_more,
+                        ),
+                        pagination_control(
+                            RefundsState.page,
+                            RefundsState.total_pages,
+                            RefundsState.prev_page,
+                            RefundsState.next_page,
+                            RefundsState.total_count,
+                            RefundsState.page_size,
+                            RefundsState.set_page_size,
+                        ),
                     ),
                     class_name="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-hidden",
                 ),
@@ -408,6 +465,7 @@ def refunds_view() -> rx.Component:
             ),
         ),
         refund_modal(),
+        import_dialog(),
         rx.radix.primitives.dialog.root(
             rx.radix.primitives.dialog.portal(
                 rx.radix.primitives.dialog.overlay(
@@ -1,5 +1,102 @@
 import reflex as rx
 from typing import Callable, Any
+from reflex.vars.object import ObjectVar
+from app.table_engine import PAGE_SIZES, EntitySpec
+
+_KIND_TYPES = {"int": int, "bool": bool}
+# Height in pixels of one list row in a virtual_table; the spacers above and
+# below the loaded rows, and the scroll position sent to the server, assume it.
+# Rows are built with virtual_row and the table does not wrap text, so every
+# row really is this tall; row details go in an expanded_detail below it.
+ROW_HEIGHT = 57
+
+
+def row_column(spec: EntitySpec, row: rx.Var, name: str) -> rx.Var:
+    """Column ``name`` of a list-page row (rows are tuples in ``spec`` column order)."""
+    kind = spec.columns[spec.index(name)].kind
+    return row[spec.index(name)].to(_KIND_TYPES.get(kind, str))
+
+
+def _first_visible_row(e: ObjectVar) -> tuple[rx.Var[int]]:
+    return ((e.target.to(dict).scrollTop.to(int) // ROW_HEIGHT).to(int),)
+
+
+class ScrollBox(rx.el.Div):
+    """A div whose scroll event carries the index of the first visible row."""
+
+    on_scroll: rx.EventHandler[_first_visible_row]
+
+
+def _spacer(rows: rx.Var[int], columns: int) -> rx.Component:
+    return rx.cond(
+        rows > 0,
+        rx.el.tbody(
+            rx.el.tr(
+                rx.el.td(col_span=columns, class_name="p-0"),
+                style={"height": f"{rows * ROW_HEIGHT}px"},
+            )
+        ),
+    )
+
+
+def virtual_row(*cells: rx.Component, **props) -> rx.Component:
+    """A ``ROW_HEIGHT`` tall body row of a virtual_table."""
+    return rx.el.tr(*cells, style={"height": f"{ROW_HEIGHT}px"}, **props)
+
+
+def virtual_table(
+    header: rx.Component,
+    body: rx.Component,
+    rows: rx.Var[list],
+    window_start: rx.Var[int],
+    page_rows: rx.Var[int],
+    on_scroll_row: rx.event.EventType,
+    columns: int,
+) -> rx.Component:
+    """A scrolling table that renders only the loaded window of a page.
+
+    ``body`` renders ``rows`` as one virtual_row each, starting at page row
+    ``window_start``; the rest of the page's ``page_rows`` are stood in for by
+    empty space of the same height. Scrolling sends the first visible row to
+    ``on_scroll_row``, which loads another window when needed.
+    """
+    return ScrollBox.create(
+        rx.el.table(
+            header,
+            _spacer(window_start, columns),
+            body,
+            _spacer(page_rows - window_start - rows.length(), columns),
+            class_name="w-full text-left whitespace-nowrap",
+        ),
+        on_scroll=[on_scroll_row.throttle(150), on_scroll_row.debounce(150)],
+        class_name="max-h-[70vh] overflow-y-auto",
+    )
+
+
+def expanded_detail(
+    expanded_id: rx.Var[str], on_close: rx.event.EventType, *children: rx.Component
+) -> rx.Component:
+    """The related records of the expanded list row, shown below the table.
+
+    Kept out of the virtual_table so expanding a row does not change the
+    height of the rows the table scrolls over.
+    """
+    return rx.cond(
+        expanded_id != "",
+        rx.el.div(
+            rx.el.div(
+                rx.el.span(expanded_id, class_name="font-mono text-xs text-gray-500"),
+                rx.el.button(
+                    rx.icon("x", class_name="w-4 h-4"),
+                    on_click=on_close,
+                    class_name="p-1 text-gray-400 hover:text-gray-600 hover:bg-gray-100 rounded-md",
+                ),
+                class_name="flex items-center justify-between mb-3",
+            ),
+            *children,
+            class_name="p-6 bg-gray-50/80 border-t border-gray-100",
+        ),
+    )
 
 
 def form_field(
@@ -89,6 +186,7 @@ def pagination_control(
     next_event: rx.event.EventType,
     total_count: rx.Var[int],
     page_size: int = 10,
+    on_page_size: rx.event.EventType | None = None,
 ) -> rx.Component:
     start_idx = (current_page - 1) * page_size + 1
     end_idx = rx.cond(
@@ -109,6 +207,17 @@ def pagination_control(
             class_name="flex-1 flex items-center",
         ),
         rx.el.div(
+            rx.el.select(
+                *[
+                    rx.el.option(f"{size} / page", value=str(size))
+                    for size in PAGE_SIZES
+                ],
+                value=rx.Var.create(page_size).to_string(),
+                on_change=on_page_size,
+                class_name="pl-3 pr-8 py-2 border border-gray-200 rounded-lg bg-white text-sm text-gray-600 focus:outline-none focus:ring-2 focus:ring-indigo-500",
+            )
+            if on_page_size is not None
+            else rx.fragment(),
             rx.el.button(
                 rx.icon("chevron-left", class_name="w-4 h-4"),
                 on_click=prev_event,
@@ -134,4 +243,153 @@ def pagination_control(
             class_name="flex items-center gap-2",
         ),
         class_name="flex items-center justify-between px-6 py-4 bg-white border-t border-gray-100",
-    )
\ No newline at end of file
+    )
+
+
+def scroll_mode_toggle(
+    active: rx.Var[bool], on_toggle: rx.event.EventType
+) -> rx.Component:
+    return rx.el.button(
+        rx.icon("infinity", class_name="w-4 h-4 mr-2"),
+        "Infinite scroll",
+        on_click=on_toggle,
+        class_name=rx.cond(
+            active,
+            "flex items-center px-4 py-2 border border-indigo-200 bg-indigo-50 text-indigo-700 rounded-xl text-sm font-medium",
+            "flex items-center px-4 py-2 border border-gray-200 bg-white text-gray-600 rounded-xl hover:bg-gray-50 text-sm font-medium",
+        ),
+    )
+
+
+def scroll_status(
+    window_start: rx.Var[int],
+    loaded: rx.Var[int],
+    total_count: rx.Var[int],
+    loading_more: rx.Var[bool],
+) -> rx.Component:
+    """Footer of an infinite-scroll list: which rows are loaded out of how many."""
+    return rx.el.div(
+        rx.el.p(
+            "Rows ",
+            rx.el.span((window_start + 1).to_string(), class_name="font-semibold"),
+            " to ",
+            rx.el.span(
+                (window_start + loaded).to_string(), class_name="font-semibold"
+            ),
+            " of ",
+            rx.el.span(total_count.to_string(), class_name="font-semibold"),
+            class_name="text-sm text-gray-700 font-medium",
+        ),
+        rx.cond(loading_more, rx.spinner(size="1")),
+        class_name="flex items-center justify-between px-6 py-4 bg-white border-t border-gray-100",
+    )
+
+
+def bulk_action_bar(
+    selected_count: rx.Var[int],
+    actions: list[tuple[str, str, rx.event.EventType]],
+    clear_event: rx.event.EventType,
+) -> rx.Component:
+    """Toolbar shown above a table while one or more rows are selected."""
+    return rx.cond(
+        selected_count > 0,
+        rx.el.div(
+            rx.el.span(
+                selected_count.to_string(),
+                " selected",
+                class_name="text-sm font-medium text-indigo-900",
+            ),
+            rx.el.div(
+                *[
+                    rx.el.button(
+                        rx.icon(icon, class_name="w-4 h-4 mr-2"),
+                        label,
+                        on_click=event,
+                        class_name="flex items-center px-3 py-1.5 text-sm font-medium text-gray-700 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 transition-colors",
+                    )
+                    for label, icon, event in actions
+                ],
+                rx.el.button(
+                    "Clear",
+                    on_click=clear_event,
+                    class_name="px-3 py-1.5 text-sm font-medium text-gray-500 hover:text-gray-700",
+                ),
+                class_name="flex items-center gap-2",
+            ),
+            class_name="flex items-center justify-between px-4 py-3 mb-4 bg-indigo-50 border border-indigo-100 rounded-xl",
+        ),
+    )
+
+
+def bulk_outcomes_panel(
+    outcomes: rx.Var[list[dict[str, str]]],
+    dismiss_event: rx.event.EventType,
+) -> rx.Component:
+    """Per-row results of the last bulk action."""
+    return rx.cond(
+        outcomes.length() > 0,
+        rx.el.div(
+            rx.el.div(
+                rx.el.h4(
+                    "Bulk action results",
+                    class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider",
+                ),
+                rx.el.button(
+                    rx.icon("x", class_name="w-4 h-4"),
+                    on_click=dismiss_event,
+                    class_name="p-1 text-gray-400 hover:text-gray-600 rounded-md",
+                ),
+                class_name="flex items-center justify-between mb-2",
+            ),
+            rx.el.div(
+                rx.foreach(
+                    outcomes,
+                    lambda o: rx.el.div(
+                        rx.el.span(
+                            o["id"], class_name="font-mono text-xs text-gray-600"
+                        ),
+                        status_badge(
+                            o["outcome"],
+                            {
+                                "updated": "bg-green-100 text-green-700",
+                                "unchanged": "bg-gray-100 text-gray-600",
+                                "not found": "bg-red-100 text-red-700",
+                            },
+                        ),
+                        class_name="flex items-center justify-between py-1",
+                    ),
+                ),
+                class_name="max-h-40 overflow-y-auto",
+            ),
+            class_name="px-4 py-3 mb-4 bg-white border border-gray-200 rounded-xl",
+        ),
+    )
+
+
+def select_checkbox(
+    checked: rx.Var[bool], on_change: rx.event.EventType
+) -> rx.Component:
+    return rx.checkbox(checked=checked, on_change=on_change, color_scheme="indigo")
+
+
+def export_links(entity: str, query: rx.Var[str]) -> rx.Component:
+    """Download links for the current filtered view, served by ``app.api``.
+
+    The href is relative so the browser resolves it against the deployed
+    app's own origin; plain links are not rewritten to the backend URL.
+    """
+    base = f"/export/{entity}"
+    return rx.el.div(
+        rx.el.a(
+            rx.icon("download", class_name="w-4 h-4 mr-2"),
+            "CSV",
+            href=f"{base}?format=csv&{query}",
+            class_name="flex items-center px-3 py-2 text-sm font-medium text-gray-700 hover:bg-gray-50",
+        ),
+        rx.el.a(
+            "Parquet",
+            href=f"{base}?format=parquet&{query}",
+            class_name="flex items-center px-3 py-2 text-sm font-medium text-gray-700 hover:bg-gray-50 border-l border-gray-200",
+        ),
+        class_name="flex items-center bg-white border border-gray-200 rounded-xl overflow-hidden",
+    )
@@ -1,5 +1,6 @@
 import reflex as rx
 from app.states.dashboard_state import SidebarState
+from app.states.search_state import SearchState
 
 
 def sidebar_item(label: str, icon: str, href: str) -> rx.Component:
@@ -35,6 +36,56 @@ def sidebar_item(label: str, icon: str, href: str) -> rx.Component:
     )
 
 
+def search_result(result: rx.Var) -> rx.Component:
+    return rx.el.a(
+        rx.el.div(
+            rx.el.span(
+                result["kind"],
+                class_name="text-[10px] font-semibold uppercase tracking-wider text-indigo-600",
+            ),
+            rx.el.span(result["id"], class_name="font-mono text-xs text-gray-400"),
+            class_name="flex items-center justify-between",
+        ),
+        rx.el.p(result["title"], class_name="text-sm text-gray-900 truncate"),
+        rx.el.p(result["detail"], class_name="text-xs text-gray-500 truncate"),
+        href=result["href"],
+        on_click=SearchState.clear,
+        class_name="block px-3 py-2 rounded-lg hover:bg-gray-50",
+    )
+
+
+def global_search() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.input(
+                placeholder="Search everything...",
+                on_change=SearchState.search.debounce(250),
+                class_name="w-full pl-9 pr-3 py-2 text-sm border border-gray-200 rounded-xl focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent",
+            ),
+            rx.icon(
+                "search",
+                class_name="absolute left-3 top-1/2 -translate-y-1/2 w-4 h-4 text-gray-400",
+            ),
+            class_name="relative",
+        ),
+        rx.cond(
+            SearchState.show_results,
+            rx.el.div(
+                rx.cond(
+                    SearchState.results.length() > 0,
+                    rx.foreach(SearchState.results, search_result),
+                    rx.el.p(
+                        rx.cond(SearchState.searching, "Searching...", "No matches."),
+                        class_name="px-3 py-2 text-sm text-gray-400 italic",
+                    ),
+                ),
+                class_name="absolute left-0 right-0 mt-2 max-h-96 overflow-y-auto bg-white border border-gray-200 rounded-xl shadow-lg p-1 z-50",
+            ),
+        ),
+        class_name="relative px-4 mb-8",
+    )
+
+
 def sidebar() -> rx.Component:
     return rx.el.aside(
         rx.el.div(
@@ -48,6 +99,7 @@ def sidebar() -> rx.Component:
                 ),
                 class_name="flex items-center gap-3 px-4 mb-10",
             ),
+            global_search(),
             rx.el.nav(
                 rx.el.div(
                     rx.el.p(
@@ -64,6 +116,18 @@ def sidebar() -> rx.Component:
                     ),
                     class_name="mb-8",
                 ),
+                rx.el.div(
+                    rx.el.p(
+                        "ADMIN",
+                        class_name="text-xs font-bold text-gray-400 px-4 mb-4 tracking-wider",
+                    ),
+                    rx.el.div(
+                        sidebar_item("Query Stats", "activity", "/admin/queries"),
+                        sidebar_item("Reconciliation", "scale", "/admin/reconciliation"),
+                        class_name="flex flex-col gap-2",
+                    ),
+                    class_name="mb-8",
+                ),
                 class_name="flex-1",
             ),
             rx.el.div(
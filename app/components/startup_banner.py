@@ -0,0 +1,29 @@
+import reflex as rx
+from app.states.startup_state import StartupState
+
+
+def startup_banner() -> rx.Component:
+    """Fixed notice shown while the database is still initializing."""
+    return rx.el.div(
+        rx.cond(
+            StartupState.warming_up,
+            rx.el.div(
+                rx.spinner(size="1"),
+                rx.el.div(
+                    rx.el.p(
+                        "Warming up — connecting to the database. Data will appear shortly.",
+                        class_name="text-sm font-medium text-amber-900",
+                    ),
+                    rx.cond(
+                        StartupState.init_error != "",
+                        rx.el.p(
+                            "Last attempt failed: " + StartupState.init_error,
+                            class_name="text-xs text-amber-700 mt-0.5",
+                        ),
+                    ),
+                ),
+                class_name="fixed top-4 left-1/2 -translate-x-1/2 z-50 flex items-center gap-3 px-4 py-3 bg-amber-50 border border-amber-200 rounded-lg shadow-md",
+            ),
+        ),
+        on_mount=StartupState.watch_database,
+    )
@@ -1,14 +1,29 @@
 import reflex as rx
-from app.states.tickets_state import TicketsState, Ticket
+from app.states.tickets_state import TicketsState, TICKET_SPEC
 from app.components.shared import (
+    row_column,
     form_field,
     th,
     status_badge,
     empty_state,
     pagination_control,
+    virtual_row,
+    virtual_table,
+    expanded_detail,
+    scroll_mode_toggle,
+    scroll_status,
+    export_links,
+    bulk_action_bar,
+    bulk_outcomes_panel,
+    select_checkbox,
 )
 
 
+def col(ticket: rx.Var, name: str) -> rx.Var:
+    """A column of a ``TicketsState.rows`` row."""
+    return row_column(TICKET_SPEC, ticket, name)
+
+
 def ticket_modal() -> rx.Component:
     return rx.radix.primitives.dialog.root(
         rx.radix.primitives.dialog.portal(
@@ -26,14 +41,14 @@ def ticket_modal() -> rx.Component:
                         rx.el.input(
                             type="hidden",
                             name="ticket_id",
-                            value=TicketsState.current_ticket["ticket_id"],
+                            value=TicketsState.current_row["ticket_id"],
                         ),
                     ),
                     form_field(
                         "Customer ID",
                         rx.el.input(
                             name="customer_id",
-                            default_value=TicketsState.current_ticket["customer_id"],
+                            default_value=TicketsState.current_row["customer_id"],
                             class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-indigo-500 outline-none transition-all",
                             placeholder="CUST-001",
                         ),
@@ -43,7 +58,7 @@ def ticket_modal() -> rx.Component:
                         "Subject",
                         rx.el.input(
                             name="subject",
-                            default_value=TicketsState.current_ticket["subject"],
+                            default_value=TicketsState.current_row["subject"],
                             class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-indigo-500 outline-none transition-all",
                             placeholder="Login issue...",
                         ),
@@ -58,7 +73,7 @@ def ticket_modal() -> rx.Component:
                                 rx.el.option("Resolved", value="resolved"),
                                 rx.el.option("Closed", value="closed"),
                                 name="status",
-                                default_value=TicketsState.current_ticket["status"],
+                                default_value=TicketsState.current_row["status"],
                                 class_name="w-full px-3 py-2 border border-gray-300 rounded-lg appearance-none bg-white focus:ring-2 focus:ring-indigo-500 focus:border-indigo-500 outline-none transition-all",
                             ),
                             rx.icon(
@@ -83,7 +98,7 @@ def ticket_modal() -> rx.Component:
                         ),
                         class_name="flex justify-end gap-3 mt-6 pt-6 border-t border-gray-100",
                     ),
-                    on_submit=TicketsState.save_ticket,
+                    on_submit=TicketsState.save,
                 ),
                 class_name="fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2 bg-white rounded-2xl shadow-xl p-6 w-full max-w-md z-50 focus:outline-none",
             ),
@@ -93,15 +108,93 @@ def ticket_modal() -> rx.Component:
     )
 
 
+def _related_panel() -> rx.Component:
+    return expanded_detail(
+        TicketsState.expanded_id,
+        TicketsState.toggle_row(TicketsState.expanded_id),
+        rx.el.h4(
+            "Related Refunds",
+            class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-3",
+        ),
+        rx.cond(
+            TicketsState.loading_related,
+            rx.el.div(
+                rx.spinner(size="1"),
+                class_name="py-2",
+            ),
+            rx.cond(
+                TicketsState.related_refunds.length() > 0,
+                rx.el.div(
+                    rx.foreach(
+                        TicketsState.related_refunds,
+                        lambda r: rx.el.div(
+                            rx.el.div(
+                                rx.el.span(
+                                    r["date"],
+                                    class_name="text-gray-500 w-24",
+                                ),
+                                rx.el.span(
+                                    f"${r['amount']}",
+                                    class_name="font-medium text-gray-900",
+                                ),
+                                rx.cond(
+                                    r["approved"],
+                                    rx.el.span(
+                                        "Approved",
+                                        class_name="text-xs bg-green-100 text-green-700 px-2 py-0.5 rounded-full ml-2",
+                                    ),
+                                    rx.cond(
+                                        r["approved"] == None,
+                                        rx.el.span(
+                                            "Pending",
+                                            class_name="text-xs bg-yellow-100 text-yellow-700 px-2 py-0.5 rounded-full ml-2",
+                                        ),
+                                        rx.el.span(
+                                            "Denied",
+                                            class_name="text-xs bg-red-100 text-red-700 px-2 py-0.5 rounded-full ml-2",
+                                        ),
+                                    ),
+                                ),
+                                class_name="flex items-center text-sm",
+                            ),
+                            rx.el.button(
+                                "View Refund",
+                                rx.icon(
+                                    "arrow-right",
+                                    class_name="w-3 h-3 ml-1",
+                                ),
+                                class_name="text-xs text-indigo-600 hover:text-indigo-800 flex items-center font-medium",
+                                on_click=rx.redirect(
+                                    f"/refunds?search={r['refund_id']}"
+                                ),
+                            ),
+                            class_name="flex items-center justify-between py-2 border-b border-gray-100 last:border-0",
+                        ),
+                    ),
+                    class_name="bg-white rounded-lg border border-gray-200 px-4 py-2",
+                ),
+                rx.el.p(
+                    "No refunds found for this ticket.",
+                    class_name="text-sm text-gray-400 italic",
+                ),
+            ),
+        ),
+    )
+
+
 def tickets_view() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h1("Help Tickets", class_name="text-2xl font-bold text-gray-900"),
-            rx.el.button(
-                rx.icon("plus", class_name="w-4 h-4 mr-2"),
-                "New Ticket",
-                on_click=TicketsState.open_create_modal,
-                class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-xl hover:bg-indigo-700 transition-colors text-sm font-medium",
+            rx.el.div(
+                export_links("tickets", TicketsState.export_query),
+                rx.el.button(
+                    rx.icon("plus", class_name="w-4 h-4 mr-2"),
+                    "New Ticket",
+                    on_click=TicketsState.open_create_modal,
+                    class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-xl hover:bg-indigo-700 transition-colors text-sm font-medium",
+                ),
+                class_name="flex items-center gap-3",
             ),
             class_name="flex justify-between items-center mb-6",
         ),
@@ -109,7 +202,7 @@ def tickets_view() -> rx.Component:
             rx.el.div(
                 rx.el.input(
                     placeholder="Search tickets...",
-                    on_change=TicketsState.search_tickets.debounce(300),
+                    on_change=TicketsState.search.debounce(300),
                     class_name="w-full pl-10 pr-4 py-2 border border-gray-200 rounded-xl focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent",
                 ),
                 rx.icon(
@@ -125,7 +218,7 @@ def tickets_view() -> rx.Component:
                     rx.el.option("Pending", value="pending"),
                     rx.el.option("Resolved", value="resolved"),
                     rx.el.option("Closed", value="closed"),
-                    on_change=TicketsState.filter_status,
+                    on_change=TicketsState.set_filter,
                     class_name="pl-3 pr-8 py-2 border border-gray-200 rounded-xl appearance-none bg-white focus:outline-none focus:ring-2 focus:ring-indigo-500",
                 ),
                 rx.icon(
@@ -134,17 +227,42 @@ def tickets_view() -> rx.Component:
                 ),
                 class_name="relative",
             ),
+            scroll_mode_toggle(TicketsState.infinite, TicketsState.toggle_infinite),
             class_name="flex gap-4 mb-6",
         ),
+        bulk_action_bar(
+            TicketsState.selected_ids.length(),
+            [
+                ("Mark Open", "circle-dot", TicketsState.bulk_set("open")),
+                ("Mark Pending", "clock", TicketsState.bulk_set("pending")),
+                (
+                    "Mark Resolved",
+                    "circle-check",
+                    TicketsState.bulk_set("resolved"),
+                ),
+                ("Close", "circle-x", TicketsState.bulk_set("closed")),
+            ],
+            TicketsState.clear_selection,
+        ),
+        bulk_outcomes_panel(
+            TicketsState.bulk_outcomes, TicketsState.dismiss_bulk_outcomes
+        ),
         rx.cond(
             TicketsState.loading,
             rx.el.div(rx.spinner(), class_name="flex justify-center py-12"),
             rx.cond(
-                TicketsState.tickets.length() > 0,
+                TicketsState.rows.length() > 0,
                 rx.el.div(
-                    rx.el.table(
+                    virtual_table(
                         rx.el.thead(
                             rx.el.tr(
+                                rx.el.th(
+                                    select_checkbox(
+                                        TicketsState.page_selected,
+                                        TicketsState.set_page_selected,
+                                    ),
+                                    class_name="pl-6 py-3 w-4",
+                                ),
                                 th(
                                     "Ticket ID",
                                     "ticket_id",
@@ -182,31 +300,42 @@ def tickets_view() -> rx.Component:
                                 ),
                                 rx.el.th("", class_name="px-6 py-3"),
                             ),
-                            class_name="bg-gray-50 border-b border-gray-100",
+                            class_name="sticky top-0 z-10 bg-gray-50 border-b border-gray-100",
                         ),
-                        rx.foreach(
-                            TicketsState.tickets,
-                            lambda t: rx.el.tbody(
-                                rx.el.tr(
+                        rx.el.tbody(
+                            rx.foreach(
+                                TicketsState.rows,
+                                lambda t: virtual_row(
+                                    rx.el.td(
+                                        select_checkbox(
+                                            TicketsState.selected_ids.contains(
+                                                col(t, "ticket_id")
+                                            ),
+                                            lambda _checked: TicketsState.toggle_select(
+                                                col(t, "ticket_id")
+                                            ),
+                                        ),
+                                        class_name="pl-6 py-4 w-4",
+                                    ),
                                     rx.el.td(
                                         rx.el.div(
                                             rx.el.button(
                                                 rx.icon(
                                                     rx.cond(
-                                                        TicketsState.expanded_ticket_id
-                                                        == t["ticket_id"],
+                                                        TicketsState.expanded_id
+                                                        == col(t, "ticket_id"),
                                                         "chevron-down",
                                                         "chevron-right",
                                                     ),
                                                     class_name="w-4 h-4 text-gray-400",
                                                 ),
                                                 on_click=TicketsState.toggle_row(
-                                                    t["ticket_id"]
+                                                    col(t, "ticket_id")
                                                 ),
                                                 class_name="mr-2 p-1 hover:bg-gray-100 rounded-md transition-colors",
                                             ),
                                             rx.el.span(
-                                                t["ticket_id"],
+                                                col(t, "ticket_id"),
                                                 class_name="font-mono text-xs text-gray-400",
                                             ),
                                             class_name="flex items-center",
@@ -214,16 +343,24 @@ def tickets_view() -> rx.Component:
                                         class_name="px-6 py-4",
                                     ),
                                     rx.el.td(
-                                        t["customer_id"],
+                                        rx.el.a(
+                                            col(t, "customer_id"),
+                                            href=f"/customers/{col(t, 'customer_id')}",
+                                            class_name="hover:text-indigo-600",
+                                        ),
                                         class_name="px-6 py-4 text-sm font-medium text-gray-900",
                                     ),
                                     rx.el.td(
-                                        t["subject"],
+                                        rx.el.div(
+                                            col(t, "subject"),
+                                            title=col(t, "subject"),
+                                            class_name="max-w-xs truncate",
+                                        ),
                                         class_name="px-6 py-4 text-sm text-gray-500",
                                     ),
                                     rx.el.td(
                                         status_badge(
-                                            t["status"],
+                                            col(t, "status"),
                                             {
                                                 "open": "bg-green-100 text-green-700",
                                                 "pending": "bg-yellow-100 text-yellow-700",
@@ -234,7 +371,7 @@ def tickets_view() -> rx.Component:
                                         class_name="px-6 py-4",
                                     ),
                                     rx.el.td(
-                                        t["created_at"],
+                                        col(t, "created_at"),
                                         class_name="px-6 py-4 text-sm text-gray-500 whitespace-nowrap",
                                     ),
                                     rx.el.td(
@@ -242,7 +379,7 @@ def tickets_view() -> rx.Component:
                                             rx.el.button(
                                                 rx.icon("pencil", class_name="w-4 h-4"),
                                                 on_click=TicketsState.open_edit_modal(
-                                                    t
+                                                    col(t, "ticket_id")
                                                 ),
                                                 class_name="p-2 text-gray-400 hover:text-indigo-600 hover:bg-indigo-50 rounded-lg transition-colors",
                                             ),
@@ -251,7 +388,7 @@ def tickets_view() -> rx.Component:
                                                     "trash-2", class_name="w-4 h-4"
                                                 ),
                                                 on_click=TicketsState.prompt_delete(
-                                                    t["ticket_id"]
+                                                    col(t, "ticket_id")
                                                 ),
                                                 class_name="p-2 text-gray-400 hover:text-red-600 hover:bg-red-50 rounded-lg transition-colors",
                                             ),
@@ -260,109 +397,39 @@ def tickets_view() -> rx.Component:
                                         class_name="px-6 py-4",
                                     ),
                                     class_name=rx.cond(
-                                        TicketsState.expanded_ticket_id
-                                        == t["ticket_id"],
+                                        TicketsState.expanded_id
+                                        == col(t, "ticket_id"),
                                         "bg-indigo-50/50 border-b border-gray-100",
                                         "hover:bg-gray-50 transition-colors border-b border-gray-100 last:border-0",
                                     ),
                                 ),
-                                rx.cond(
-                                    TicketsState.expanded_ticket_id == t["ticket_id"],
-                                    rx.el.tr(
-                                        rx.el.td(
-                                            rx.el.div(
-                                                rx.el.h4(
-                                                    "Related Refunds",
-                                                    class_name="text-xs font-semibold text-gray-500 uppercase tracking-wider mb-3",
-                                                ),
-                                                rx.cond(
-                                                    TicketsState.loading_related,
-                                                    rx.el.div(
-                                                        rx.spinner(size="1"),
-                                                        class_name="py-2",
-                                                    ),
-                                                    rx.cond(
-                                                        TicketsState.related_refunds.length()
-                                                        > 0,
-                                                        rx.el.div(
-                                                            rx.foreach(
-                                                                TicketsState.related_refunds,
-                                                                lambda r: rx.el.div(
-                                                                    rx.el.div(
-                                                                        rx.el.span(
-                                                                            r["date"],
-                                                                            class_name="text-gray-500 w-24",
-                                                                        ),
-                                                                        rx.el.span(
-                                                                            f"${r['amount']}",
-                                                                            class_name="font-medium text-gray-900",
-                                                                        ),
-                                                                        rx.cond(
-                                                                            r[
-                                                                                "approved"
-                                                                            ],
-                                                                            rx.el.span(
-                                                                                "Approved",
-                                                                                class_name="text-xs bg-green-100 text-green-700 px-2 py-0.5 rounded-full ml-2",
-                                                                            ),
-                                                                            rx.cond(
-                                                                                r[
-                                                                                    "approved"
-                                                                                ]
-                                                                                == None,
-                                                                                rx.el.span(
-                                                                                    "Pending",
-                                                                                    class_name="text-xs bg-yellow-100 text-yellow-700 px-2 py-0.5 rounded-full ml-2",
-                                                                                ),
-                                                                                rx.el.span(
-                                                                                    "Denied",
-                                                                                    class_name="text-xs bg-red-100 text-red-700 px-2 py-0.5 rounded-full ml-2",
-                                                                                ),
-                                                                            ),
-                                                                        ),
-                                                                        class_name="flex items-center text-sm",
-                                                                    ),
-                                                                    rx.el.button(
-                                                                        "View Refund",
-                                                                        rx.icon(
-                                                                            "arrow-right",
-                                                                            class_name="w-3 h-3 ml-1",
-                                                                        ),
-                                                                        class_name="text-xs text-indigo-600 hover:text-indigo-800 flex items-center font-medium",
-                                                                        on_click=rx.redirect(
-                                                                            f"/refunds?search={r['refund_id']}"
-                                                                        ),
-                                                                    ),
-                                                                    class_name="flex items-center justify-between py-2 border-b border-gray-100 last:border-0",
-                                                                ),
-                                                            ),
-                                                            class_name="bg-white rounded-lg border border-gray-200 px-4 py-2",
-                                                        ),
-                                                        rx.el.p(
-                                                            "No refunds found for this ticket.",
-                                                            class_name="text-sm text-gray-400 italic",
-                                                        ),
-                                                    ),
-                                                ),
-                                                class_name="p-6 bg-gray-50/80",
-                                            ),
-                                            col_span=5,
-                                            class_name="p-0",
-                                        )
-                                    ),
-                                ),
-                                class_name="divide-y divide-gray-100",
                             ),
+                            class_name="divide-y divide-gray-100",
                         ),
-                        class_name="w-full text-left",
+                        TicketsState.rows,
+                        TicketsState.window_start,
+                        TicketsState.page_rows,
+                        TicketsState.scroll_to_row,
+                        7,
                     ),
-                    pagination_control(
-                        TicketsState.page,
-                        TicketsState.total_pages,
-                        TicketsState.prev_page,
-                        TicketsState.next_page,
-                        TicketsState.total_count,
-                        TicketsState.page_size,
+                    _related_panel(),
+                    rx.cond(
+                        TicketsState.infinite,
+                        scroll_status(
+                            TicketsState.window_start,
+                            TicketsState.rows.length(),
+                            TicketsState.total_count,
+                            TicketsState.loading_more,
+                        ),
+                        pagination_control(
+                            TicketsState.page,
+                            TicketsState.total_pages,
+                            TicketsState.prev_page,
+                            TicketsState.next_page,
+                            TicketsState.total_count,
+                            TicketsState.page_size,
+                            TicketsState.set_page_size,
+                        ),
                     ),
                     class_name="bg-white rounded-2xl shadow-sm border border-gray-100 overflow-hidden",
                 ),
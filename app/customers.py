@@ -0,0 +1,129 @@
+"""One customer's tickets, payments, refunds and totals in a single query.
+
+The customer page needs records from all three tables. Rather than a count
+and a page query per table, :func:`load_customer` sends one statement whose
+CTEs select the customer's tickets and payments through their
+``customer_id`` indexes, and the refunds linked to either through the
+``ticket_id`` and ``payment_id`` indexes. Postgres aggregates the totals over
+all of them, builds the newest ``CUSTOMER_RECORDS`` of each list as JSON and
+returns a single value.
+
+Results are cached per customer for ``CUSTOMER_CACHE_SECONDS``; any write
+through :func:`app.table_engine.invalidate` drops them.
+"""
+
+import os
+
+from app.cache import TTLCache
+from app.db import fetch_one
+
+CUSTOMER_CACHE_SECONDS = float(os.environ.get("CUSTOMER_CACHE_SECONDS", "15"))
+# Records of each kind listed on the page; totals cover all of them.
+CUSTOMER_RECORDS = int(os.environ.get("CUSTOMER_RECORDS", "50"))
+
+_customer_cache = TTLCache(CUSTOMER_CACHE_SECONDS, max_entries=256, name="customers")
+
+CUSTOMER_SQL = """
+    WITH t AS (
+        SELECT ticket_id, subject, status, created_at
+        FROM help_ticket
+        WHERE customer_id = %(cid)s
+    ),
+    p AS (
+        SELECT payment_id, amount_cents, currency, payment_status, payment_date
+        FROM stripe_payments
+        WHERE customer_id = %(cid)s
+    ),
+    r AS (
+        SELECT r.refund_id, r.ticket_id, r.payment_id, r.sku, r.approved,
+               r.request_date, pay.amount_cents
+        FROM refund_requests r
+        LEFT JOIN stripe_payments pay ON pay.payment_id = r.payment_id
+        WHERE r.ticket_id IN (SELECT ticket_id FROM t)
+           OR r.payment_id IN (SELECT payment_id FROM p)
+    )
+    SELECT json_build_object(
+        'totals', json_build_object(
+            'tickets', (SELECT COUNT(*) FROM t),
+            'open_tickets',
+                (SELECT COUNT(*) FROM t WHERE status IN ('open', 'pending')),
+            'payments', (SELECT COUNT(*) FROM p),
+            'paid', (
+                SELECT '$' || to_char(COALESCE(SUM(amount_cents), 0) / 100.0,
+                                      'FM999999999990.00')
+                FROM p WHERE payment_status = 'succeeded'
+            ),
+            'refunds', (SELECT COUNT(*) FROM r),
+            'pending_refunds', (SELECT COUNT(*) FROM r WHERE approved IS NULL),
+            'refunded', (
+                SELECT '$' || to_char(COALESCE(SUM(amount_cents), 0) / 100.0,
+                                      'FM999999999990.00')
+                FROM (
+                    -- A payment with several approved refunds counts once.
+                    SELECT DISTINCT payment_id, amount_cents FROM r
+                    WHERE approved AND payment_id IS NOT NULL
+                ) refunded_payments
+            )
+        ),
+        'tickets', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'ticket_id', ticket_id,
+                'subject', COALESCE(subject, ''),
+                'status', COALESCE(status, ''),
+                'date', COALESCE(to_char(created_at, 'YYYY-MM-DD'), '')
+            ) ORDER BY created_at DESC NULLS LAST), '[]')
+            FROM (
+                SELECT * FROM t ORDER BY created_at DESC NULLS LAST
+                LIMIT %(limit)s
+            ) newest
+        ),
+        'payments', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'payment_id', payment_id,
+                'amount', COALESCE(amount_cents, 0) / 100.0,
+                'currency', COALESCE(currency, ''),
+                'status', COALESCE(payment_status, ''),
+                'date', COALESCE(to_char(payment_date, 'YYYY-MM-DD'), '')
+            ) ORDER BY payment_date DESC NULLS LAST), '[]')
+            FROM (
+                SELECT * FROM p ORDER BY payment_date DESC NULLS LAST
+                LIMIT %(limit)s
+            ) newest
+        ),
+        'refunds', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'refund_id', refund_id,
+                'ticket_id', COALESCE(ticket_id, ''),
+                'sku', COALESCE(sku, ''),
+                'amount', COALESCE(amount_cents, 0) / 100.0,
+                'approved', approved,
+                'date', COALESCE(to_char(request_date, 'YYYY-MM-DD'), '')
+            ) ORDER BY request_date DESC NULLS LAST), '[]')
+            FROM (
+                SELECT * FROM r ORDER BY request_date DESC NULLS LAST
+                LIMIT %(limit)s
+            ) newest
+        )
+    )
+"""
+
+
+async def load_customer(customer_id: str) -> dict:
+    """Return ``{"totals", "tickets", "payments", "refunds"}`` for a customer.
+
+    The lists hold the newest ``CUSTOMER_RECORDS`` records of each kind,
+    formatted for display.
+    """
+    customer = _customer_cache.get("customers", customer_id)
+    if customer is None:
+        row = await fetch_one(
+            CUSTOMER_SQL, {"cid": customer_id, "limit": CUSTOMER_RECORDS}, prepare=True
+        )
+        customer = row[0]
+        _customer_cache.set("customers", customer_id, customer)
+    return customer
+
+
+def invalidate() -> None:
+    """Drop cached customers after tickets, payments or refunds change."""
+    _customer_cache.invalidate("customers")
@@ -0,0 +1,324 @@
+"""Synthetic tickets, payments and refunds for testing at production volume.
+
+Generates referentially consistent data: every refund points at a payment
+and a support ticket of the same customer, the ticket is opened after the
+payment and the refund requested after the ticket; approved refunds mark
+their payment ``refunded``. Customers are skewed (a few customers account
+for most activity), timestamps are spread over ``days`` with more recent
+activity, and statuses, amounts and currencies follow fixed distributions.
+
+Rows are produced in independent batches, each from its own seeded RNG, and
+loaded with ``COPY`` by a pool of worker threads, one transaction per batch.
+The same seed always yields the same rows, including ids (time-ordered ULIDs
+backdated to each row's timestamp, see ``app.ids``).
+
+Command line usage::
+
+    python -m app.datagen --tickets 1000000 --payments 1500000 --refunds 200000
+    python -m app.datagen --tickets 5000000 --customers 500000 --days 1095 --truncate
+"""
+
+import argparse
+import datetime
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from app.db import get_pool
+from app.ids import new_id, TICKET_PREFIX, REFUND_PREFIX, PAYMENT_PREFIX
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50_000
+DEFAULT_WORKERS = 4
+
+TICKET_COLUMNS = "ticket_id, customer_id, subject, status, created_at, resolved_at"
+PAYMENT_COLUMNS = (
+    "payment_id, customer_id, amount_cents, currency, payment_status, payment_date"
+)
+REFUND_COLUMNS = (
+    "refund_id, ticket_id, payment_id, sku, request_date, approved, approval_date"
+)
+
+TICKET_STATUSES = (("open", 15), ("pending", 15), ("resolved", 45), ("closed", 25))
+PAYMENT_STATUSES = (("succeeded", 88), ("pending", 4), ("failed", 8))
+CURRENCIES = (("USD", 80), ("EUR", 12), ("GBP", 8))
+# approved: True, False, or None while the decision is pending.
+REFUND_DECISIONS = ((True, 60), (False, 15), (None, 25))
+TICKET_SUBJECTS = (
+    "Cannot log in to my account",
+    "Billing discrepancy on invoice",
+    "App crashes on checkout page",
+    "Shipping address not updating",
+    "Two-factor authentication not working",
+    "Promo code not applying at checkout",
+    "Account locked after password reset",
+    "Missing order confirmation email",
+    "Question about my subscription",
+    "Feature request",
+)
+REFUND_SUBJECTS = (
+    "Refund request for damaged item",
+    "Received wrong item in order",
+    "Duplicate charge on credit card",
+    "Subscription auto-renewed unexpectedly",
+    "Order never arrived",
+)
+SKU_COUNT = 500
+
+
+@dataclass
+class GenerationConfig:
+    tickets: int = 100_000
+    payments: int = 150_000
+    # Each refund also accounts for one of the tickets and payments above.
+    refunds: int = 20_000
+    customers: int = 10_000
+    days: int = 730
+    # Customer skew: 1 is uniform; larger values concentrate activity on
+    # fewer customers (customer rank ~ random() ** skew).
+    skew: float = 2.0
+    seed: int = 42
+    end: datetime.datetime | None = None
+    batch_size: int = DEFAULT_BATCH_SIZE
+    workers: int = DEFAULT_WORKERS
+
+    def __post_init__(self):
+        if self.refunds > min(self.tickets, self.payments):
+            raise ValueError("refunds cannot exceed the number of tickets or payments")
+        if self.customers < 1 or self.days < 1 or self.skew < 1:
+            raise ValueError("customers and days must be positive and skew at least 1")
+
+
+@dataclass
+class Batch:
+    tickets: list[tuple] = field(default_factory=list)
+    payments: list[tuple] = field(default_factory=list)
+    refunds: list[tuple] = field(default_factory=list)
+
+
+@dataclass
+class GenerationReport:
+    tickets: int = 0
+    payments: int = 0
+    refunds: int = 0
+    seconds: float = 0.0
+
+    @property
+    def summary(self) -> str:
+        rows = self.tickets + self.payments + self.refunds
+        rate = rows / self.seconds if self.seconds else 0.0
+        return (
+            f"{self.tickets} tickets, {self.payments} payments, {self.refunds} refunds "
+            f"in {self.seconds:.1f}s ({rate:,.0f} rows/s)"
+        )
+
+
+def _weighted(rng: random.Random, choices: tuple) -> object:
+    values = [value for value, _ in choices]
+    weights = [weight for _, weight in choices]
+    return rng.choices(values, weights)[0]
+
+
+def _share(total: int, index: int, count: int) -> int:
+    return total * (index + 1) // count - total * index // count
+
+
+def batch_count(config: GenerationConfig) -> int:
+    largest = max(config.tickets, config.payments, config.refunds)
+    return max(1, -(-largest // config.batch_size))
+
+
+class _BatchBuilder:
+    def __init__(self, config: GenerationConfig, index: int, end: datetime.datetime):
+        self.config = config
+        self.end = end
+        self.rng = random.Random(config.seed * 1_000_003 + index)
+
+    def customer(self) -> str:
+        rank = int(self.config.customers * self.rng.random() ** self.config.skew)
+        return f"CUST-{rank:07d}"
+
+    def timestamp(self) -> datetime.datetime:
+        # Squaring biases towards recent dates, like a growing business.
+        age_days = self.config.days * self.rng.random() ** 2
+        return (self.end - datetime.timedelta(days=age_days)).replace(microsecond=0)
+
+    def after(self, start: datetime.datetime, max_hours: float) -> datetime.datetime:
+        delay = datetime.timedelta(hours=self.rng.expovariate(3 / max_hours))
+        return min(start + delay, self.end).replace(microsecond=0)
+
+    def id(self, prefix: str, at: datetime.datetime) -> str:
+        return new_id(prefix, int(at.timestamp() * 1000), self.rng.getrandbits(80))
+
+    def payment(self) -> list:
+        at = self.timestamp()
+        amount = max(99, int(self.rng.lognormvariate(8.3, 0.9)))
+        return [
+            self.id(PAYMENT_PREFIX, at),
+            self.customer(),
+            amount,
+            _weighted(self.rng, CURRENCIES),
+            _weighted(self.rng, PAYMENT_STATUSES),
+            at,
+        ]
+
+    def ticket(self, customer: str, subject: str, created: datetime.datetime) -> tuple:
+        status = _weighted(self.rng, TICKET_STATUSES)
+        resolved = (
+            self.after(created, 96) if status in ("resolved", "closed") else None
+        )
+        return (
+            self.id(TICKET_PREFIX, created),
+            customer,
+            subject,
+            status,
+            created,
+            resolved,
+        )
+
+    def build(self, tickets: int, payments: int, refunds: int) -> Batch:
+        batch = Batch()
+        payment_rows = [self.payment() for _ in range(payments)]
+        for payment in payment_rows[:refunds]:
+            payment_id, customer, _, _, _, paid_at = payment
+            payment[4] = "succeeded"
+            ticket = self.ticket(
+                customer, self.rng.choice(REFUND_SUBJECTS), self.after(paid_at, 480)
+            )
+            requested = self.after(ticket[4], 2)
+            approved = _weighted(self.rng, REFUND_DECISIONS)
+            if approved:
+                payment[4] = "refunded"
+            batch.tickets.append(ticket)
+            batch.refunds.append(
+                (
+                    self.id(REFUND_PREFIX, requested),
+                    ticket[0],
+                    payment_id,
+                    f"SKU-{self.rng.randrange(SKU_COUNT):04d}",
+                    requested,
+                    approved,
+                    None if approved is None else self.after(requested, 72),
+                )
+            )
+        for _ in range(tickets - refunds):
+            batch.tickets.append(
+                self.ticket(
+                    self.customer(), self.rng.choice(TICKET_SUBJECTS), self.timestamp()
+                )
+            )
+        batch.payments = [tuple(payment) for payment in payment_rows]
+        return batch
+
+
+def build_batch(
+    config: GenerationConfig, index: int, end: datetime.datetime | None = None
+) -> Batch:
+    """Build batch ``index`` of ``batch_count(config)``; same inputs, same rows."""
+    count = batch_count(config)
+    builder = _BatchBuilder(config, index, end or config.end or datetime.datetime.now())
+    return builder.build(
+        _share(config.tickets, index, count),
+        _share(config.payments, index, count),
+        _share(config.refunds, index, count),
+    )
+
+
+def _load_batch(config: GenerationConfig, index: int, end: datetime.datetime) -> Batch:
+    batch = build_batch(config, index, end)
+    with get_pool().connection() as conn:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                for table, columns, rows in (
+                    ("help_ticket", TICKET_COLUMNS, batch.tickets),
+                    ("stripe_payments", PAYMENT_COLUMNS, batch.payments),
+                    ("refund_requests", REFUND_COLUMNS, batch.refunds),
+                ):
+                    with cur.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                        for row in rows:
+                            copy.write_row(row)
+    return batch
+
+
+def generate(config: GenerationConfig, truncate: bool = False) -> GenerationReport:
+    """Generate and load ``config``'s rows; optionally empty the tables first.
+
+    Batches are built and copied concurrently by ``config.workers`` threads
+    (capped at the pool size). Tables are analyzed afterwards so the planner
+    sees the new volume.
+    """
+    pool = get_pool()
+    workers = max(1, min(config.workers, pool.max_size))
+    end = config.end or datetime.datetime.now()
+    count = batch_count(config)
+    report = GenerationReport()
+    started = time.perf_counter()
+    if truncate:
+        with pool.connection() as conn:
+            conn.execute("TRUNCATE help_ticket, refund_requests, stripe_payments")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="datagen") as executor:
+        loaded = executor.map(lambda i: _load_batch(config, i, end), range(count))
+        for done, batch in enumerate(loaded, start=1):
+            report.tickets += len(batch.tickets)
+            report.payments += len(batch.payments)
+            report.refunds += len(batch.refunds)
+            logger.info(f"Loaded batch {done}/{count}")
+    with pool.connection() as conn:
+        conn.execute("ANALYZE help_ticket, refund_requests, stripe_payments")
+    report.seconds = time.perf_counter() - started
+    logger.info(f"Generated {report.summary}")
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.db import ensure_schema
+
+    defaults = GenerationConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=defaults.tickets)
+    parser.add_argument("--payments", type=int, default=defaults.payments)
+    parser.add_argument("--refunds", type=int, default=defaults.refunds)
+    parser.add_argument("--customers", type=int, default=defaults.customers)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--skew", type=float, default=defaults.skew)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--end", type=datetime.datetime.fromisoformat, help="latest timestamp (default now)"
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument(
+        "--truncate", action="store_true", help="delete existing rows first"
+    )
+    args = parser.parse_args(argv)
+    try:
+        config = GenerationConfig(
+            tickets=args.tickets,
+            payments=args.payments,
+            refunds=args.refunds,
+            customers=args.customers,
+            days=args.days,
+            skew=args.skew,
+            seed=args.seed,
+            end=args.end,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    ensure_schema()
+    report = generate(config, truncate=args.truncate)
+    print(report.summary)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    sys.exit(main())
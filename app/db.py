@@ -2,14 +2,60 @@ import os
 import uuid
 import asyncio
 import logging
-from databricks.sdk import WorkspaceClient
+import threading
+import time
+from typing import Callable
 import psycopg
 from psycopg_pool import ConnectionPool
+from app import query_stats
+from app.clients import workspace_client
 
 logger = logging.getLogger(__name__)
 
 APP_SCHEMA = "app_data"
+EAGER_RELATED_ROWS = os.environ.get("EAGER_RELATED_ROWS", "false").lower() == "true"
+IDEMPOTENCY_WINDOW_SECONDS = int(os.environ.get("IDEMPOTENCY_WINDOW_SECONDS", "86400"))
+CHAT_RETENTION_DAYS = int(os.environ.get("CHAT_RETENTION_DAYS", "7"))
+# How often expired idempotency keys and chat messages are deleted.
+RETENTION_PURGE_SECONDS = float(os.environ.get("RETENTION_PURGE_SECONDS", "3600"))
+# Queries are prepared server-side once they have run this many times on a
+# connection ("none" disables automatic preparation); hot queries pass
+# ``prepare=True`` to be prepared on first use. Each connection keeps at most
+# PREPARED_MAX statements, evicting the least recently used.
+_prepare_threshold = os.environ.get("PREPARE_THRESHOLD", "5")
+PREPARE_THRESHOLD = None if _prepare_threshold == "none" else int(_prepare_threshold)
+PREPARED_MAX = int(os.environ.get("PREPARED_MAX", "100"))
+# Each backend worker process has its own pool of up to POOL_MAX_SIZE
+# connections. DB_MAX_CONNECTIONS optionally caps the total across workers
+# (Reflex runs several Granian workers when a Redis state manager is set).
+BACKEND_WORKERS = max(
+    1, int(os.environ.get("GRANIAN_WORKERS") or os.environ.get("WEB_CONCURRENCY") or 1)
+)
+POOL_MAX_SIZE = int(os.environ.get("POOL_MAX_SIZE", "5"))
+DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", "0"))
+POOL_MIN_SIZE = int(os.environ.get("POOL_MIN_SIZE", "1"))
+# Serializes ensure_schema() across workers starting at the same time.
+SCHEMA_LOCK_KEY = 0x7265666C6578
+# Held by the worker running the retention purge so workers take turns.
+PURGE_LOCK_KEY = 0x7075726765
+# Bump when the DDL in ensure_schema() changes; startup skips the schema work
+# when the database already records this version.
+SCHEMA_VERSION = 6
+# How long a query issued while the database is still initializing waits
+# for it before failing.
+DB_INIT_TIMEOUT_SECONDS = float(os.environ.get("DB_INIT_TIMEOUT_SECONDS", "30"))
 _pool = None
+_pool_pid = None
+# Pools inherited across fork(). Their connections belong to the parent, so
+# they are kept referenced rather than closed or garbage collected (which
+# would send a terminate message on the parent's sockets).
+_inherited_pools: list[ConnectionPool] = []
+_init_started = False
+_ready = threading.Event()
+_init_error: str | None = None
+
+SqlParams = dict[str, str | int | float | bool | list[str] | None] | tuple | None
+Statement = tuple[str, SqlParams]
 
 
 def _get_instance_name() -> str:
@@ -28,17 +74,35 @@ def _get_instance_name() -> str:
     return name
 
 
+def _databricks_credential() -> str:
+    """Generate a short-lived Lakebase database credential."""
+    w = workspace_client()
+    return w.database.generate_database_credential(
+        request_id=str(uuid.uuid4()),
+        instance_names=[_get_instance_name()],
+    ).token
+
+
+_credential_provider: Callable[[], str] = _databricks_credential
+
+
+def set_credential_provider(provider: Callable[[], str]) -> None:
+    """Replace the password source used for new connections.
+
+    Used to run against a plain Postgres (e.g. the benchmarks) instead of
+    Lakebase. Must be called before the pool is created.
+    """
+    global _credential_provider
+    _credential_provider = provider
+
+
 class RotatingTokenConnection(psycopg.Connection):
     """psycopg Connection subclass that fetches a fresh Databricks token on each connect."""
 
     @classmethod
     def connect(cls, conninfo: str = "", **kwargs):
-        w = WorkspaceClient()
-        kwargs["password"] = w.database.generate_database_credential(
-            request_id=str(uuid.uuid4()),
-            instance_names=[_get_instance_name()],
-        ).token
-        kwargs.setdefault("sslmode", "require")
+        kwargs["password"] = _credential_provider()
+        kwargs.setdefault("sslmode", os.environ.get("PGSSLMODE", "require"))
         return super().connect(conninfo, **kwargs)
 
 
@@ -50,6 +114,7 @@ def _configure_connection(conn: psycopg.Connection) -> None:
     """
     conn.execute(f"SET search_path TO {APP_SCHEMA}, public")
     conn.commit()
+    conn.prepared_max = PREPARED_MAX
 
 
 def get_pool() -> ConnectionPool:
@@ -59,7 +124,10 @@ def get_pool() -> ConnectionPool:
     to be set — either manually for local development or automatically by
     Databricks Apps when a Lakebase database resource is attached.
     """
-    global _pool
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid != os.getpid():
+        _inherited_pools.append(_pool)
+        _pool = None
     if _pool is None:
         if not os.environ.get("PGHOST"):
             raise RuntimeError(
@@ -68,19 +136,38 @@ def get_pool() -> ConnectionPool:
                 "See: https://docs.databricks.com/aws/en/dev-tools/databricks-apps/lakebase"
             )
         if not os.environ.get("PGUSER"):
-            w = WorkspaceClient()
+            w = workspace_client()
             os.environ["PGUSER"] = w.current_user.me().user_name
         _pool = ConnectionPool(
             conninfo="",
             connection_class=RotatingTokenConnection,
             configure=_configure_connection,
-            min_size=1,
-            max_size=5,
-            open=True,
+            kwargs={"prepare_threshold": PREPARE_THRESHOLD},
+            min_size=min(POOL_MIN_SIZE, pool_max_size()),
+            max_size=pool_max_size(),
+            open=False,
         )
+        # Returns immediately; the pool's workers open min_size connections
+        # concurrently in the background.
+        _pool.open(wait=False)
+        _pool_pid = os.getpid()
     return _pool
 
 
+def pool_max_size() -> int:
+    """Connections per worker: POOL_MAX_SIZE, within the DB_MAX_CONNECTIONS budget."""
+    if DB_MAX_CONNECTIONS > 0:
+        return max(1, min(POOL_MAX_SIZE, DB_MAX_CONNECTIONS // BACKEND_WORKERS))
+    return POOL_MAX_SIZE
+
+
+def pool_stats() -> dict[str, int]:
+    """Return the pool's current statistics, or nothing before it is opened."""
+    if _pool is None or _pool_pid != os.getpid():
+        return {}
+    return _pool.get_stats()
+
+
 def ensure_schema() -> None:
     """Create application schema and tables if they do not already exist.
 
@@ -88,6 +175,11 @@ def ensure_schema() -> None:
     even when the database role lacks ``CREATE`` privileges on the ``public``
     schema.  The pool's ``search_path`` is set to ``app_data, public`` so all
     queries using unqualified table names resolve correctly.
+
+    Runs in one transaction under an advisory lock, so several workers
+    starting together neither race on the DDL nor seed twice. Once done, the
+    ``schema_version`` table records ``SCHEMA_VERSION`` and later startups
+    skip straight past it.
     """
     pool = get_pool()
     ddl = f"""
@@ -117,113 +209,457 @@ def ensure_schema() -> None:
         payment_status TEXT,
         payment_date TIMESTAMP
     );
+    CREATE TABLE IF NOT EXISTS {APP_SCHEMA}.idempotency_keys (
+        idempotency_key TEXT PRIMARY KEY,
+        record_id TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    CREATE TABLE IF NOT EXISTS {APP_SCHEMA}.chat_messages (
+        conversation_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (conversation_id, seq)
+    );
+    CREATE TABLE IF NOT EXISTS {APP_SCHEMA}.reconciliation_runs (
+        run_id SERIAL PRIMARY KEY,
+        started_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        finished_at TIMESTAMP,
+        refunds_checked BIGINT,
+        payments_checked BIGINT,
+        counts JSONB
+    );
+    CREATE TABLE IF NOT EXISTS {APP_SCHEMA}.reconciliation_discrepancies (
+        run_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        refund_id TEXT,
+        payment_id TEXT,
+        amount_cents INTEGER,
+        detail TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS {APP_SCHEMA}.schema_version (
+        version INTEGER NOT NULL
+    );
+    -- Customer page (app/customers.py): a customer's records, and the refunds
+    -- linked to them.
+    CREATE INDEX IF NOT EXISTS help_ticket_customer_id_idx
+        ON {APP_SCHEMA}.help_ticket (customer_id, created_at);
+    CREATE INDEX IF NOT EXISTS stripe_payments_customer_id_idx
+        ON {APP_SCHEMA}.stripe_payments (customer_id, payment_date);
+    CREATE INDEX IF NOT EXISTS refund_requests_ticket_id_idx
+        ON {APP_SCHEMA}.refund_requests (ticket_id);
+    CREATE INDEX IF NOT EXISTS refund_requests_payment_id_idx
+        ON {APP_SCHEMA}.refund_requests (payment_id);
+    -- Reconciliation report (app/reconciliation.py), listed in this order.
+    CREATE INDEX IF NOT EXISTS reconciliation_discrepancies_run_idx
+        ON {APP_SCHEMA}.reconciliation_discrepancies
+        (run_id, kind, payment_id, refund_id);
+    -- Retention purge (purge_expired_rows): rows older than the window.
+    CREATE INDEX IF NOT EXISTS idempotency_keys_created_at_idx
+        ON {APP_SCHEMA}.idempotency_keys (created_at);
+    CREATE INDEX IF NOT EXISTS chat_messages_created_at_idx
+        ON {APP_SCHEMA}.chat_messages (created_at);
     """
     with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(ddl)
-    logger.info("Database schema verified — tables are ready.")
-    _seed_sample_data(pool)
+        if _schema_version(conn) == SCHEMA_VERSION:
+            logger.info("Database schema is current — skipping schema setup.")
+        else:
+            with conn.transaction():
+                conn.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_KEY,))
+                # Another worker may have finished while we waited for the lock.
+                if _schema_version(conn) != SCHEMA_VERSION:
+                    with conn.cursor() as cur:
+                        cur.execute(ddl)
+                    keys_ok = _ensure_unique_keys(conn)
+                    _ensure_search_indexes(conn)
+                    _seed_sample_data(conn)
+                    # Leave the version unset while a unique key is missing so
+                    # the next startup tries again. The trigram indexes are
+                    # optional and do not hold it back.
+                    if keys_ok:
+                        conn.execute(f"DELETE FROM {APP_SCHEMA}.schema_version")
+                        conn.execute(
+                            f"INSERT INTO {APP_SCHEMA}.schema_version (version) "
+                            "VALUES (%s)",
+                            (SCHEMA_VERSION,),
+                        )
+            logger.info("Database schema verified — tables are ready.")
 
 
-def _seed_sample_data(pool: ConnectionPool) -> None:
-    """Insert sample data into empty tables so the dashboard is populated on first run."""
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM help_ticket")
-            if cur.fetchone()[0] > 0:
-                logger.info("Tables already contain data — skipping seed.")
-                return
+def _schema_version(conn: psycopg.Connection) -> int:
+    """Return the schema version recorded in the database (0 if none)."""
+    table = f"{APP_SCHEMA}.schema_version"
+    if conn.execute("SELECT to_regclass(%s)", (table,)).fetchone()[0] is None:
+        return 0
+    row = conn.execute(f"SELECT MAX(version) FROM {table}").fetchone()
+    return row[0] or 0
 
-            tickets = [
-                ("TKT-001", "CUST-101", "Cannot log in to my account", "open", "2025-06-01 09:15:00", None),
-                ("TKT-002", "CUST-102", "Billing discrepancy on invoice #4821", "pending", "2025-06-02 11:30:00", None),
-                ("TKT-003", "CUST-103", "App crashes on checkout page", "resolved", "2025-05-28 14:00:00", "2025-06-01 10:00:00"),
-                ("TKT-004", "CUST-104", "Request for feature: dark mode", "closed", "2025-05-20 08:45:00", "2025-05-25 16:30:00"),
-                ("TKT-005", "CUST-105", "Shipping address not updating", "open", "2025-06-03 10:20:00", None),
-                ("TKT-006", "CUST-101", "Two-factor authentication not working", "open", "2025-06-04 13:00:00", None),
-                ("TKT-007", "CUST-106", "Received wrong item in order #7733", "pending", "2025-06-04 15:45:00", None),
-                ("TKT-008", "CUST-107", "Subscription auto-renewed unexpectedly", "resolved", "2025-05-30 09:00:00", "2025-06-02 14:20:00"),
-                ("TKT-009", "CUST-108", "Promo code SAVE20 not applying at checkout", "open", "2025-06-05 08:10:00", None),
-                ("TKT-010", "CUST-109", "Account locked after password reset", "closed", "2025-05-15 11:00:00", "2025-05-16 09:30:00"),
-                ("TKT-011", "CUST-110", "Missing order confirmation email", "pending", "2025-06-05 16:30:00", None),
-                ("TKT-012", "CUST-102", "Duplicate charge on credit card", "open", "2025-06-06 10:00:00", None),
-            ]
-            cur.executemany(
-                "INSERT INTO help_ticket (ticket_id, customer_id, subject, status, created_at, resolved_at) "
-                "VALUES (%s, %s, %s, %s, %s, %s)",
-                tickets,
-            )
 
-            payments = [
-                ("PAY-001", "CUST-101", 4999, "USD", "succeeded", "2025-05-28 10:00:00"),
-                ("PAY-002", "CUST-102", 12500, "USD", "succeeded", "2025-05-29 11:30:00"),
-                ("PAY-003", "CUST-103", 7999, "USD", "succeeded", "2025-05-30 09:15:00"),
-                ("PAY-004", "CUST-104", 3200, "USD", "failed", "2025-05-31 14:00:00"),
-                ("PAY-005", "CUST-105", 15000, "USD", "succeeded", "2025-06-01 08:45:00"),
-                ("PAY-006", "CUST-106", 6499, "USD", "pending", "2025-06-02 12:00:00"),
-                ("PAY-007", "CUST-107", 8999, "USD", "succeeded", "2025-06-03 10:30:00"),
-                ("PAY-008", "CUST-108", 2499, "USD", "refunded", "2025-06-03 16:00:00"),
-                ("PAY-009", "CUST-109", 19999, "USD", "succeeded", "2025-06-04 09:00:00"),
-                ("PAY-010", "CUST-110", 5500, "USD", "failed", "2025-06-05 11:20:00"),
-            ]
-            cur.executemany(
-                "INSERT INTO stripe_payments (payment_id, customer_id, amount_cents, currency, payment_status, payment_date) "
-                "VALUES (%s, %s, %s, %s, %s, %s)",
-                payments,
+def init_database() -> None:
+    """Open the pool and bring the schema up to date, retrying until it succeeds.
+
+    Runs on a background thread started by :func:`start_database_init`, so
+    the app serves pages while the database warms up.
+    """
+    global _init_error
+    delay = 1.0
+    started = time.perf_counter()
+    while True:
+        try:
+            ensure_schema()
+        except Exception as e:
+            _init_error = str(e)
+            logger.error(
+                f"Database initialization failed, retrying in {delay:.0f}s: {e}"
             )
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+            continue
+        _init_error = None
+        _ready.set()
+        logger.info(f"Database ready after {time.perf_counter() - started:.1f}s")
+        return
+
+
+def start_database_init() -> None:
+    """Start :func:`init_database` and the retention purge in the background.
+
+    Registered as an app startup task.
+    """
+    global _init_started
+    if _init_started:
+        return
+    _init_started = True
+    threading.Thread(target=init_database, name="db-init", daemon=True).start()
+    threading.Thread(
+        target=_purge_periodically, name="db-retention-purge", daemon=True
+    ).start()
+
+
+def purge_expired_rows() -> None:
+    """Delete idempotency keys and chat messages past their retention window.
+
+    Skipped when another worker is already purging.
+    """
+    with get_pool().connection() as conn:
+        with conn.transaction():
+            locked = conn.execute(
+                "SELECT pg_try_advisory_xact_lock(%s)", (PURGE_LOCK_KEY,)
+            ).fetchone()[0]
+            if not locked:
+                return
+            keys = conn.execute(
+                "DELETE FROM idempotency_keys "
+                "WHERE created_at < NOW() - %s * INTERVAL '1 second'",
+                (IDEMPOTENCY_WINDOW_SECONDS,),
+            ).rowcount
+            messages = conn.execute(
+                "DELETE FROM chat_messages "
+                "WHERE created_at < NOW() - %s * INTERVAL '1 day'",
+                (CHAT_RETENTION_DAYS,),
+            ).rowcount
+    if keys or messages:
+        logger.info(
+            f"Retention purge deleted {keys} idempotency keys and "
+            f"{messages} chat messages"
+        )
+
+
+def _purge_periodically() -> None:
+    """Run :func:`purge_expired_rows` every ``RETENTION_PURGE_SECONDS``."""
+    _ready.wait()
+    while True:
+        try:
+            purge_expired_rows()
+        except Exception as e:
+            logger.warning(f"Retention purge failed, retrying later: {e}")
+        time.sleep(RETENTION_PURGE_SECONDS)
 
-            refunds = [
-                ("REF-001", "TKT-003", "PAY-003", "SKU-WIDGET-A", "2025-06-01 10:30:00", True, "2025-06-02 09:00:00"),
-                ("REF-002", "TKT-002", "PAY-002", "SKU-GADGET-B", "2025-06-02 14:00:00", None, None),
-                ("REF-003", "TKT-007", "PAY-007", "SKU-WIDGET-A", "2025-06-04 16:00:00", None, None),
-                ("REF-004", "TKT-008", "PAY-008", "SKU-SERVICE-C", "2025-06-01 09:30:00", True, "2025-06-01 15:00:00"),
-                ("REF-005", "TKT-004", "PAY-004", "SKU-GADGET-B", "2025-05-25 12:00:00", False, "2025-05-26 10:00:00"),
-                ("REF-006", "TKT-012", "PAY-002", "SKU-PREMIUM-D", "2025-06-06 10:30:00", None, None),
-                ("REF-007", "TKT-009", "PAY-009", "SKU-WIDGET-A", "2025-06-05 09:00:00", True, "2025-06-06 08:00:00"),
-            ]
-            cur.executemany(
-                "INSERT INTO refund_requests (refund_id, ticket_id, payment_id, sku, request_date, approved, approval_date) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                refunds,
+
+def is_ready() -> bool:
+    """Whether queries can run: initialization finished, or was never started."""
+    return not _init_started or _ready.is_set()
+
+
+def init_error() -> str | None:
+    """The last initialization error while the database is not ready yet."""
+    return _init_error
+
+
+def wait_until_ready() -> None:
+    """Block until initialization finishes, up to ``DB_INIT_TIMEOUT_SECONDS``.
+
+    Scripts that call :func:`ensure_schema` themselves never start the
+    background initialization and are not gated.
+    """
+    if is_ready():
+        return
+    if not _ready.wait(DB_INIT_TIMEOUT_SECONDS):
+        raise RuntimeError(
+            f"The database is not ready yet: {_init_error or 'still initializing'}"
+        )
+
+
+UNIQUE_KEYS = {
+    "help_ticket": "ticket_id",
+    "refund_requests": "refund_id",
+    "stripe_payments": "payment_id",
+}
+
+
+def _ensure_unique_keys(conn: psycopg.Connection) -> bool:
+    """Add a unique index on each table's id column; False if one is missing.
+
+    The upserts (``INSERT ... ON CONFLICT``) rely on these. Each index is
+    created in its own savepoint so that a table which already contains
+    duplicate ids only logs a warning instead of blocking startup.
+    """
+    created = True
+    for table, column in UNIQUE_KEYS.items():
+        try:
+            with conn.transaction():
+                conn.execute(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_{column}_key "
+                    f"ON {APP_SCHEMA}.{table} ({column})"
+                )
+        except psycopg.errors.UniqueViolation:
+            logger.warning(
+                f"{table} contains duplicate {column} values — the unique index "
+                f"could not be created and upserts into {table} will fail until "
+                "the duplicates are removed."
             )
+            created = False
+    return created
+
+
+# Columns matched by ILIKE '%...%' searches (the list pages' search fields and
+# the global search in app/search.py).
+SEARCH_COLUMNS = {
+    "help_ticket": ("ticket_id", "customer_id", "subject"),
+    "refund_requests": ("refund_id", "ticket_id", "payment_id"),
+    "stripe_payments": ("payment_id", "customer_id"),
+}
+
+
+def _ensure_search_indexes(conn: psycopg.Connection) -> None:
+    """Add trigram indexes for the search columns if ``pg_trgm`` is available.
+
+    Postgres can answer ``ILIKE '%term%'`` from a ``gin_trgm_ops`` index for
+    terms of three or more characters instead of scanning the table. This
+    needs the ``pg_trgm`` extension; without it searches still work but
+    scan, and a warning is logged. The indexes are optional, so a failure
+    here does not stop the schema version from being recorded; they are
+    tried again the next time ``SCHEMA_VERSION`` changes.
+    """
+    try:
+        with conn.transaction():
+            conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for table, columns in SEARCH_COLUMNS.items():
+                for column in columns:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm "
+                        f"ON {APP_SCHEMA}.{table} USING gin ({column} gin_trgm_ops)"
+                    )
+    except psycopg.Error as e:
+        logger.warning(
+            f"Trigram search indexes could not be created ({e}) — searches will "
+            "scan their tables."
+        )
+
+
+def _seed_sample_data(conn: psycopg.Connection) -> None:
+    """Insert sample data into empty tables so the dashboard is populated on first run."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM help_ticket")
+        if cur.fetchone()[0] > 0:
+            logger.info("Tables already contain data — skipping seed.")
+            return
+
+        tickets = [
+            ("TKT-001", "CUST-101", "Cannot log in to my account", "open", "2025-06-01 09:15:00", None),
+            ("TKT-002", "CUST-102", "Billing discrepancy on invoice #4821", "pending", "2025-06-02 11:30:00", None),
+            ("TKT-003", "CUST-103", "App crashes on checkout page", "resolved", "2025-05-28 14:00:00", "2025-06-01 10:00:00"),
+            ("TKT-004", "CUST-104", "Request for feature: dark mode", "closed", "2025-05-20 08:45:00", "2025-05-25 16:30:00"),
+            ("TKT-005", "CUST-105", "Shipping address not updating", "open", "2025-06-03 10:20:00", None),
+            ("TKT-006", "CUST-101", "Two-factor authentication not working", "open", "2025-06-04 13:00:00", None),
+            ("TKT-007", "CUST-106", "Received wrong item in order #7733", "pending", "2025-06-04 15:45:00", None),
+            ("TKT-008", "CUST-107", "Subscription auto-renewed unexpectedly", "resolved", "2025-05-30 09:00:00", "2025-06-02 14:20:00"),
+            ("TKT-009", "CUST-108", "Promo code SAVE20 not applying at checkout", "open", "2025-06-05 08:10:00", None),
+            ("TKT-010", "CUST-109", "Account locked after password reset", "closed", "2025-05-15 11:00:00", "2025-05-16 09:30:00"),
+            ("TKT-011", "CUST-110", "Missing order confirmation email", "pending", "2025-06-05 16:30:00", None),
+            ("TKT-012", "CUST-102", "Duplicate charge on credit card", "open", "2025-06-06 10:00:00", None),
+        ]
+        cur.executemany(
+            "INSERT INTO help_ticket (ticket_id, customer_id, subject, status, created_at, resolved_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            tickets,
+        )
+
+        payments = [
+            ("PAY-001", "CUST-101", 4999, "USD", "succeeded", "2025-05-28 10:00:00"),
+            ("PAY-002", "CUST-102", 12500, "USD", "succeeded", "2025-05-29 11:30:00"),
+            ("PAY-003", "CUST-103", 7999, "USD", "succeeded", "2025-05-30 09:15:00"),
+            ("PAY-004", "CUST-104", 3200, "USD", "failed", "2025-05-31 14:00:00"),
+            ("PAY-005", "CUST-105", 15000, "USD", "succeeded", "2025-06-01 08:45:00"),
+            ("PAY-006", "CUST-106", 6499, "USD", "pending", "2025-06-02 12:00:00"),
+            ("PAY-007", "CUST-107", 8999, "USD", "succeeded", "2025-06-03 10:30:00"),
+            ("PAY-008", "CUST-108", 2499, "USD", "refunded", "2025-06-03 16:00:00"),
+            ("PAY-009", "CUST-109", 19999, "USD", "succeeded", "2025-06-04 09:00:00"),
+            ("PAY-010", "CUST-110", 5500, "USD", "failed", "2025-06-05 11:20:00"),
+        ]
+        cur.executemany(
+            "INSERT INTO stripe_payments (payment_id, customer_id, amount_cents, currency, payment_status, payment_date) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            payments,
+        )
+
+        refunds = [
+            ("REF-001", "TKT-003", "PAY-003", "SKU-WIDGET-A", "2025-06-01 10:30:00", True, "2025-06-02 09:00:00"),
+            ("REF-002", "TKT-002", "PAY-002", "SKU-GADGET-B", "2025-06-02 14:00:00", None, None),
+            ("REF-003", "TKT-007", "PAY-007", "SKU-WIDGET-A", "2025-06-04 16:00:00", None, None),
+            ("REF-004", "TKT-008", "PAY-008", "SKU-SERVICE-C", "2025-06-01 09:30:00", True, "2025-06-01 15:00:00"),
+            ("REF-005", "TKT-004", "PAY-004", "SKU-GADGET-B", "2025-05-25 12:00:00", False, "2025-05-26 10:00:00"),
+            ("REF-006", "TKT-012", "PAY-002", "SKU-PREMIUM-D", "2025-06-06 10:30:00", None, None),
+            ("REF-007", "TKT-009", "PAY-009", "SKU-WIDGET-A", "2025-06-05 09:00:00", True, "2025-06-06 08:00:00"),
+        ]
+        cur.executemany(
+            "INSERT INTO refund_requests (refund_id, ticket_id, payment_id, sku, request_date, approved, approval_date) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            refunds,
+        )
 
     logger.info("Sample seed data inserted into empty tables.")
 
 
+# ``prepare``: True prepares the statement on first use (for hot queries with
+# a fixed SQL text), False never prepares it, None follows PREPARE_THRESHOLD.
 def _execute_sync(
     sql: str,
-    params: dict[str, str | int | float | bool | None] | tuple | None = None,
+    params: SqlParams = None,
     fetch: str | None = None,
+    prepare: bool | None = None,
+    caller: str = "",
 ) -> list[tuple] | tuple | None:
+    wait_until_ready()
     pool = get_pool()
+    requested = time.perf_counter()
     with pool.connection() as conn:
+        acquired = time.perf_counter()
         with conn.cursor() as cur:
-            cur.execute(sql, params)
+            cur.execute(sql, params, prepare=prepare)
             if fetch == "all":
-                return cur.fetchall()
+                result = cur.fetchall()
+                rows = len(result)
             elif fetch == "one":
-                return cur.fetchone()
+                result = cur.fetchone()
+                rows = 0 if result is None else 1
             else:
-                return None
+                result = None
+                rows = max(cur.rowcount, 0)
+    finished = time.perf_counter()
+    query_stats.record(
+        sql,
+        params,
+        (finished - acquired) * 1000,
+        rows,
+        (acquired - requested) * 1000,
+        caller,
+    )
+    return result
+
+
+def _execute_batch_sync(
+    statements: list[Statement], prepare: bool | None = None, caller: str = ""
+) -> list[list[tuple]]:
+    """Run independent statements on one connection in pipeline mode.
+
+    All statements are sent before any result is read, so the batch costs a
+    single network round trip instead of one per statement. Each statement
+    is recorded in the query stats with the duration of the whole batch.
+    """
+    wait_until_ready()
+    pool = get_pool()
+    requested = time.perf_counter()
+    with pool.connection() as conn:
+        acquired = time.perf_counter()
+        cursors = []
+        try:
+            with conn.pipeline():
+                for sql, params in statements:
+                    cur = conn.cursor()
+                    cursors.append(cur)
+                    cur.execute(sql, params, prepare=prepare)
+            results = [cur.fetchall() if cur.description else [] for cur in cursors]
+        finally:
+            for cur in cursors:
+                cur.close()
+    finished = time.perf_counter()
+    for (sql, params), rows in zip(statements, results):
+        query_stats.record(
+            sql,
+            params,
+            (finished - acquired) * 1000,
+            len(rows),
+            (acquired - requested) * 1000,
+            caller,
+        )
+    return results
 
 
 async def fetch_all(
-    sql: str, params: dict[str, str | int | float | bool | None] | tuple | None = None
+    sql: str, params: SqlParams = None, prepare: bool | None = None
 ) -> list[tuple]:
     loop = asyncio.get_running_loop()
-    result = await loop.run_in_executor(None, _execute_sync, sql, params, "all")
+    result = await loop.run_in_executor(
+        None,
+        _execute_sync,
+        sql,
+        params,
+        "all",
+        prepare,
+        query_stats.calling_event(),
+    )
     return result if result is not None else []
 
 
 async def fetch_one(
-    sql: str, params: dict[str, str | int | float | bool | None] | tuple | None = None
+    sql: str, params: SqlParams = None, prepare: bool | None = None
 ) -> tuple | None:
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, _execute_sync, sql, params, "one")
+    return await loop.run_in_executor(
+        None,
+        _execute_sync,
+        sql,
+        params,
+        "one",
+        prepare,
+        query_stats.calling_event(),
+    )
 
 
 async def execute(
-    sql: str, params: dict[str, str | int | float | bool | None] | tuple | None = None
+    sql: str, params: SqlParams = None, prepare: bool | None = None
 ) -> None:
     loop = asyncio.get_running_loop()
-    await loop.run_in_executor(None, _execute_sync, sql, params, None)
\ No newline at end of file
+    await loop.run_in_executor(
+        None,
+        _execute_sync,
+        sql,
+        params,
+        None,
+        prepare,
+        query_stats.calling_event(),
+    )
+
+
+async def fetch_batch(
+    statements: list[Statement], prepare: bool | None = None
+) -> list[list[tuple]]:
+    """Return the rows of each ``(sql, params)`` statement, in order."""
+    if not statements:
+        return []
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, _execute_batch_sync, statements, prepare, query_stats.calling_event()
+    )
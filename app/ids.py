@@ -0,0 +1,65 @@
+"""Time-ordered identifiers for new tickets, refunds and payments.
+
+IDs have the same ``<PREFIX>-`` shape as the seeded records (``TKT-001``)
+followed by a ULID: a 48-bit millisecond timestamp and 80 random bits,
+Crockford base32 encoded to 26 characters, e.g. ``TKT-01JB3Y4M9Q7ZK2P5W8XRTN6HVD``.
+
+Because ULIDs sort by creation time, new rows land on the right-hand edge of
+the btree index on the id column instead of at random leaf pages, and the
+most recent records sit next to each other in the index.
+"""
+
+import os
+import threading
+import time
+
+TICKET_PREFIX = "TKT"
+REFUND_PREFIX = "REF"
+PAYMENT_PREFIX = "PAY"
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(26):
+        chars.append(_CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def ulid(timestamp_ms: int | None = None, random_part: int | None = None) -> str:
+    """Return a new ULID string.
+
+    Without an explicit timestamp, IDs generated in the same millisecond by
+    this process are strictly increasing (the random part is incremented).
+    Passing ``timestamp_ms`` backdates the ID, e.g. for generated history;
+    ``random_part`` (80 bits) then makes it reproducible from a seeded RNG.
+    """
+    global _last_ms, _last_random
+    if timestamp_ms is not None:
+        if random_part is None:
+            random_part = int.from_bytes(os.urandom(10), "big")
+        return _encode((timestamp_ms << _RANDOM_BITS) | (random_part & _RANDOM_MAX))
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms and _last_random < _RANDOM_MAX:
+            now_ms, random_part = _last_ms, _last_random + 1
+        else:
+            now_ms = max(now_ms, _last_ms + 1)
+            random_part = int.from_bytes(os.urandom(10), "big")
+        _last_ms, _last_random = now_ms, random_part
+    return _encode((now_ms << _RANDOM_BITS) | random_part)
+
+
+def new_id(
+    prefix: str, timestamp_ms: int | None = None, random_part: int | None = None
+) -> str:
+    """Return ``<prefix>-<ULID>``, e.g. ``new_id(TICKET_PREFIX)``."""
+    return f"{prefix}-{ulid(timestamp_ms, random_part)}"
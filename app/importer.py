@@ -0,0 +1,278 @@
+"""Bulk import of payments and refunds from CSV or JSONL files.
+
+Rows are validated in Python in batches, streamed into a temporary staging
+table with ``COPY ... FROM STDIN`` and merged into the target table with
+``INSERT ... ON CONFLICT DO UPDATE`` in a single transaction. Invalid rows
+are skipped and reported by line number; valid rows are imported.
+
+Command line usage::
+
+    python -m app.importer payments payments.csv
+    python -m app.importer refunds refunds.jsonl --batch-size 50000
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import logging
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, TextIO
+
+from app.db import get_pool, wait_until_ready
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10_000
+PAYMENT_STATUSES = {"succeeded", "pending", "failed", "refunded"}
+
+
+def _required(value) -> str:
+    text = str(value).strip() if value is not None else ""
+    if not text:
+        raise ValueError("is required")
+    return text
+
+
+def _optional(value) -> str | None:
+    text = str(value).strip() if value is not None else ""
+    return text or None
+
+
+def _timestamp(value) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(_required(value))
+
+
+def _optional_timestamp(value) -> datetime.datetime | None:
+    text = _optional(value)
+    return datetime.datetime.fromisoformat(text) if text else None
+
+
+def _amount_cents(value) -> int:
+    amount = int(_required(value))
+    if amount < 0:
+        raise ValueError("must not be negative")
+    return amount
+
+
+def _currency(value) -> str:
+    code = _required(value).upper()
+    if len(code) != 3 or not code.isalpha():
+        raise ValueError("must be a 3-letter ISO code")
+    return code
+
+
+def _payment_status(value) -> str:
+    status = _required(value).lower()
+    if status not in PAYMENT_STATUSES:
+        raise ValueError(f"must be one of {', '.join(sorted(PAYMENT_STATUSES))}")
+    return status
+
+
+def _approved(value) -> bool | None:
+    if isinstance(value, bool) or value is None:
+        return value
+    text = str(value).strip().lower()
+    if text in ("", "null", "none", "pending"):
+        return None
+    if text in ("true", "t", "1", "yes", "approved"):
+        return True
+    if text in ("false", "f", "0", "no", "denied"):
+        return False
+    raise ValueError("must be true, false or empty")
+
+
+# entity -> (table, key column, [(column, parser), ...])
+IMPORT_SPECS: dict[str, tuple[str, str, list[tuple[str, Callable]]]] = {
+    "payments": (
+        "stripe_payments",
+        "payment_id",
+        [
+            ("payment_id", _required),
+            ("customer_id", _required),
+            ("amount_cents", _amount_cents),
+            ("currency", _currency),
+            ("payment_status", _payment_status),
+            ("payment_date", _timestamp),
+        ],
+    ),
+    "refunds": (
+        "refund_requests",
+        "refund_id",
+        [
+            ("refund_id", _required),
+            ("ticket_id", _required),
+            ("payment_id", _required),
+            ("sku", _optional),
+            ("request_date", _timestamp),
+            ("approved", _approved),
+            ("approval_date", _optional_timestamp),
+        ],
+    ),
+}
+
+
+@dataclass
+class ImportReport:
+    entity: str
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def summary(self) -> str:
+        return (
+            f"{self.rows_read} rows read: {self.inserted} inserted, "
+            f"{self.updated} updated, {len(self.errors)} rejected"
+        )
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, dict | None]]:
+    """Yield ``(line_number, record)`` pairs from a CSV or JSONL stream.
+
+    Unparseable JSONL lines yield ``None`` so they are reported, not fatal.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            yield line_no, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported import format '{fmt}'")
+
+
+def _validated_batches(
+    entity: str,
+    records: Iterable[tuple[int, dict | None]],
+    batch_size: int,
+    report: ImportReport,
+) -> Iterator[list[tuple]]:
+    _, key, columns = IMPORT_SPECS[entity]
+    key_index = [name for name, _ in columns].index(key)
+    seen: dict[str, int] = {}
+    batch: list[tuple] = []
+    for line_no, record in records:
+        report.rows_read += 1
+        if record is None:
+            report.errors.append((line_no, "not a valid JSON object"))
+            continue
+        try:
+            row = []
+            for name, parse in columns:
+                try:
+                    row.append(parse(record.get(name)))
+                except ValueError as e:
+                    raise ValueError(f"{name} {e}") from None
+        except ValueError as e:
+            report.errors.append((line_no, str(e)))
+            continue
+        row_key = row[key_index]
+        if row_key in seen:
+            first = seen[row_key]
+            report.errors.append(
+                (line_no, f"duplicate {key} {row_key} (first seen on line {first})")
+            )
+            continue
+        seen[row_key] = line_no
+        batch.append(tuple(row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_records(
+    entity: str,
+    records: Iterable[tuple[int, dict | None]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportReport:
+    """Validate and load records into the entity's table in one transaction.
+
+    Existing rows with the same id are updated; new ids are inserted.
+    """
+    table, key, columns = IMPORT_SPECS[entity]
+    names = [name for name, _ in columns]
+    column_list = ", ".join(names)
+    assignments = ", ".join(
+        f"{name} = EXCLUDED.{name}" for name in names if name != key
+    )
+    report = ImportReport(entity=entity)
+    wait_until_ready()
+    pool = get_pool()
+    with pool.connection() as conn:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"CREATE TEMP TABLE import_staging (LIKE {table}) ON COMMIT DROP"
+                )
+                for batch in _validated_batches(entity, records, batch_size, report):
+                    with cur.copy(
+                        f"COPY import_staging ({column_list}) FROM STDIN"
+                    ) as copy:
+                        for row in batch:
+                            copy.write_row(row)
+                cur.execute(
+                    f"""
+                    WITH upserted AS (
+                        INSERT INTO {table} ({column_list})
+                        SELECT {column_list} FROM import_staging
+                        ON CONFLICT ({key}) DO UPDATE SET {assignments}
+                        RETURNING (xmax = 0) AS inserted
+                    )
+                    SELECT COUNT(*) FILTER (WHERE inserted),
+                           COUNT(*) FILTER (WHERE NOT inserted)
+                    FROM upserted
+                    """
+                )
+                report.inserted, report.updated = cur.fetchone()
+    logger.info(f"Imported {entity}: {report.summary}")
+    return report
+
+
+def import_file(
+    entity: str, path: str, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> ImportReport:
+    """Import a CSV or JSONL file from disk."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return import_records(entity, read_records(f, fmt), batch_size)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entity", choices=sorted(IMPORT_SPECS))
+    parser.add_argument("path", help="CSV or JSONL file ('-' for stdin)")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv"
+    if args.path == "-":
+        records = read_records(sys.stdin, fmt)
+        report = import_records(args.entity, records, args.batch_size)
+    else:
+        report = import_file(args.entity, args.path, fmt, args.batch_size)
+    for line_no, message in report.errors:
+        print(f"line {line_no}: {message}", file=sys.stderr)
+    print(report.summary)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""Prometheus-format metrics served at ``/metrics``.
+
+A small in-process registry (counters, gauges and histograms with labels)
+rendered in the Prometheus text exposition format, so no extra dependency
+is needed. Recording a sample is a dict lookup and a few additions under a
+lock; anything more expensive (pool stats, session counts, state sizes) is
+collected only when ``/metrics`` is scraped.
+
+Event handlers are timed with :func:`track_event`, placed directly under
+``@rx.event``::
+
+    @rx.event(background=True)
+    @track_event
+    async def fetch_rows(self):
+        ...
+"""
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Iterable
+
+from app.profiling import event_name, profile_event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MAX_SIZED_SESSIONS = 50
+
+# ``Class.method`` of the event handler running in the current task, set by
+# :func:`track_event`; empty outside event handlers.
+current_event: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_event", default=""
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}"
+            for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}"
+            for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = []
+        names = self.label_names + ("le",)
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+_collectors: list[Callable[[], None]] = []
+
+EVENT_SECONDS = Histogram(
+    "app_event_duration_seconds",
+    "Time spent in a Reflex event handler, including yielded updates.",
+    ["event"],
+)
+EVENT_ERRORS = Counter(
+    "app_event_errors_total", "Event handlers that raised an exception.", ["event"]
+)
+DB_QUERY_SECONDS = Histogram(
+    "app_db_query_duration_seconds",
+    "Database statement execution time by calling event.",
+    ["event"],
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "app_db_pool_wait_seconds", "Time spent waiting for a pooled connection."
+)
+DB_POOL = Gauge(
+    "app_db_pool", "psycopg_pool statistics (see ConnectionPool.get_stats).", ["stat"]
+)
+LLM_TTFT_SECONDS = Histogram(
+    "app_llm_time_to_first_token_seconds",
+    "Time from sending a chat request to the first streamed token.",
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "app_llm_output_tokens_per_second",
+    "Streaming rate of chat responses (one streamed delta counts as one token).",
+    buckets=(5, 10, 20, 40, 60, 80, 100, 150, 200, 400),
+)
+ACTIVE_SESSIONS = Gauge("app_active_sessions", "Connected websocket sessions.")
+PROCESS_RSS = Gauge("process_resident_memory_bytes", "Resident memory of this process.")
+STATE_BYTES = Gauge(
+    "app_session_state_bytes",
+    f"Serialized state size over up to {MAX_SIZED_SESSIONS} in-memory sessions.",
+    ["quantile"],
+)
+
+
+def collector(fn: Callable[[], None]) -> Callable[[], None]:
+    """Register a function that refreshes gauges right before each scrape."""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    for collect in _collectors:
+        try:
+            collect()
+        except Exception as e:
+            logger.warning(f"Metrics collector {collect.__name__} failed: {e}")
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def track_event(fn: Callable) -> Callable:
+    """Time an event handler into ``app_event_duration_seconds``.
+
+    The wrapper keeps the handler's kind (plain function, coroutine or async
+    generator) and signature, which Reflex relies on to dispatch it. Handlers
+    selected for profiling are also wrapped by :func:`app.profiling.profile_event`.
+    """
+    fn = profile_event(fn)
+
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def async_gen_wrapper(*args, **kwargs):
+            event = event_name(fn, args)
+            started = time.perf_counter()
+            token = current_event.set(event)
+            try:
+                async for update in fn(*args, **kwargs):
+                    yield update
+            except Exception:
+                EVENT_ERRORS.inc(event=event)
+                raise
+            finally:
+                EVENT_SECONDS.observe(time.perf_counter() - started, event=event)
+                try:
+                    current_event.reset(token)
+                except ValueError:
+                    # Closed from another task (an abandoned generator being
+                    # finalized); that task never saw the value.
+                    pass
+
+        return async_gen_wrapper
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            event = event_name(fn, args)
+            started = time.perf_counter()
+            token = current_event.set(event)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                EVENT_ERRORS.inc(event=event)
+                raise
+            finally:
+                EVENT_SECONDS.observe(time.perf_counter() - started, event=event)
+                current_event.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        event = event_name(fn, args)
+        started = time.perf_counter()
+        token = current_event.set(event)
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            EVENT_ERRORS.inc(event=event)
+            raise
+        finally:
+            EVENT_SECONDS.observe(time.perf_counter() - started, event=event)
+            current_event.reset(token)
+
+    return wrapper
+
+
+@collector
+def _collect_pool() -> None:
+    from app.db import pool_stats
+
+    for stat, value in pool_stats().items():
+        DB_POOL.set(value, stat=stat)
+
+
+@collector
+def _collect_memory() -> None:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        PROCESS_RSS.set(pages * os.sysconf("SC_PAGE_SIZE"))
+    except OSError:
+        # Not Linux: fall back to the peak RSS (KiB on BSD, bytes on macOS).
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        PROCESS_RSS.set(peak if sys.platform == "darwin" else peak * 1024)
+
+
+_app = None
+
+
+def register_app(app) -> None:
+    """Let the scrape-time collectors read session data from the Reflex app."""
+    global _app
+    _app = app
+
+
+@collector
+def _collect_sessions() -> None:
+    if _app is None:
+        return
+    namespace = _app.event_namespace
+    if namespace is not None:
+        ACTIVE_SESSIONS.set(len(namespace.token_to_sid))
+    try:
+        states = getattr(_app.state_manager, "states", None)
+    except ValueError:
+        return
+    if not states:
+        return
+    sizes = sorted(
+        len(state._serialize())
+        for state in list(states.values())[-MAX_SIZED_SESSIONS:]
+    )
+    STATE_BYTES.set(sizes[len(sizes) // 2], quantile="0.5")
+    STATE_BYTES.set(sizes[-1], quantile="1")
@@ -0,0 +1,251 @@
+"""Opt-in sampling profiler for event handlers, with flamegraph output.
+
+Enable with ``PROFILE_SAMPLE_RATE`` (fraction of invocations to profile,
+e.g. ``0.05``) and optionally restrict it to some handlers with
+``PROFILE_EVENTS=DashboardState.fetch_dashboard_data,TicketsState.fetch_rows``.
+The decision is made when the handler is decorated: with profiling off, or
+for handlers whose method name is not listed, :func:`profile_event` returns
+the handler unchanged so there is no per-call cost at all. Handlers are named
+after the state they run on (see :func:`event_name`), so a handler shared by
+several states through a mixin is listed once per state.
+
+While a sampled invocation runs, a background thread records its stack
+every ``PROFILE_INTERVAL_MS``. Because handlers are coroutines, a sample is
+one of:
+
+* the handler is running: the real stack from the handler down;
+* the handler is suspended: its chain of awaits, ending in ``<await>``
+  (e.g. a database query waiting in ``fetch_all``);
+* the handler has yielded and Reflex is processing the update (state
+  diffing, serialization, emitting): the stack under ``[reflex]``;
+* otherwise ``<waiting for event loop>``.
+
+Samples are aggregated per event as collapsed stacks (``a;b;c count``)
+which ``GET /profile/{event}`` serves for flamegraph.pl or speedscope.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_EVENTS = {
+    name.strip() for name in os.environ.get("PROFILE_EVENTS", "").split(",") if name.strip()
+}
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+MAX_STACKS_PER_EVENT = 5000
+
+_lock = threading.Lock()
+_stacks: dict[str, Counter] = {}
+_invocations: Counter = Counter()
+_active: dict[int, "_Invocation"] = {}
+_sampler: threading.Thread | None = None
+
+
+class _Invocation:
+    __slots__ = ("event", "thread_id", "wrapper_frame", "task", "handler")
+
+    def __init__(self, event: str, wrapper_frame, handler=None):
+        self.event = event
+        self.thread_id = threading.get_ident()
+        self.wrapper_frame = wrapper_frame
+        # The handler's own coroutine or async generator (None for sync handlers).
+        self.handler = handler
+        self.task = asyncio.current_task() if handler is not None else None
+
+
+def event_name(fn: Callable, args: tuple) -> str:
+    """``Class.method`` for a call of the handler ``fn`` with ``args``.
+
+    The class is the state the handler runs on (``__class__`` also sees
+    through the proxy of background events), which for a handler defined on
+    a mixin is not the class that defined it.
+    """
+    if not args:
+        return fn.__qualname__
+    return f"{args[0].__class__.__name__}.{fn.__name__}"
+
+
+def is_enabled(event: str) -> bool:
+    return PROFILE_SAMPLE_RATE > 0 and (not PROFILE_EVENTS or event in PROFILE_EVENTS)
+
+
+def _may_profile(fn: Callable) -> bool:
+    """Whether ``fn`` is profiled on any state, judged by its method name."""
+    if PROFILE_SAMPLE_RATE <= 0:
+        return False
+    return not PROFILE_EVENTS or any(
+        name.rsplit(".", 1)[-1] == fn.__name__ for name in PROFILE_EVENTS
+    )
+
+
+def _label(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}".replace(";", ":")
+
+
+def _stack_below(leaf, root, include_root: bool = False) -> list[str] | None:
+    """Labels from ``root`` down to ``leaf``, or None if ``root`` is not on the stack."""
+    labels = []
+    frame = leaf
+    while frame is not None:
+        if frame is root:
+            if include_root:
+                labels.append(_label(frame))
+            return labels[::-1]
+        labels.append(_label(frame))
+        frame = frame.f_back
+    return None
+
+
+def _await_chain(awaitable) -> tuple[list[str], bool]:
+    """Labels along a suspended coroutine's awaits and whether it is awaiting."""
+    labels = []
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "ag_frame", None
+        )
+        if frame is None:
+            # A future (e.g. a query running in the executor) or a finished coroutine.
+            return labels, True
+        labels.append(_label(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "ag_await", None
+        )
+    return labels, False
+
+
+def _sample(invocation: _Invocation, current: dict) -> str:
+    leaf = current.get(invocation.thread_id)
+    running = _stack_below(leaf, invocation.wrapper_frame) if leaf else None
+    if running:
+        return ";".join(running)
+    if invocation.handler is not None:
+        labels, awaiting = _await_chain(invocation.handler)
+        if awaiting:
+            return ";".join(labels + ["<await>"])
+        task_frame = invocation.task.get_coro().cr_frame if invocation.task else None
+        if leaf is not None and task_frame is not None:
+            reflex = _stack_below(leaf, task_frame, include_root=True)
+            if reflex:
+                return ";".join(["[reflex]"] + reflex)
+    return "<waiting for event loop>"
+
+
+def _run_sampler() -> None:
+    interval = PROFILE_INTERVAL_MS / 1000
+    while True:
+        time.sleep(interval)
+        with _lock:
+            active = list(_active.values())
+        if not active:
+            continue
+        current = sys._current_frames()
+        for invocation in active:
+            try:
+                stack = _sample(invocation, current)
+            except Exception:
+                continue
+            with _lock:
+                counts = _stacks.setdefault(invocation.event, Counter())
+                if stack in counts or len(counts) < MAX_STACKS_PER_EVENT:
+                    counts[stack] += 1
+        del current
+
+
+def _start(invocation: _Invocation) -> int:
+    global _sampler
+    with _lock:
+        _active[id(invocation)] = invocation
+        _invocations[invocation.event] += 1
+        if _sampler is None:
+            _sampler = threading.Thread(
+                target=_run_sampler, name="event-profiler", daemon=True
+            )
+            _sampler.start()
+    return id(invocation)
+
+
+def _stop(key: int) -> None:
+    with _lock:
+        _active.pop(key, None)
+
+
+def profile_event(fn: Callable) -> Callable:
+    """Wrap a handler for sampled profiling, or return it as-is if disabled."""
+    if not _may_profile(fn):
+        return fn
+
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def async_gen_wrapper(*args, **kwargs):
+            handler = fn(*args, **kwargs)
+            event = event_name(fn, args)
+            if random.random() >= PROFILE_SAMPLE_RATE or not is_enabled(event):
+                async for update in handler:
+                    yield update
+                return
+            key = _start(_Invocation(event, sys._getframe(), handler))
+            try:
+                async for update in handler:
+                    yield update
+            finally:
+                _stop(key)
+
+        return async_gen_wrapper
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            handler = fn(*args, **kwargs)
+            event = event_name(fn, args)
+            if random.random() >= PROFILE_SAMPLE_RATE or not is_enabled(event):
+                return await handler
+            key = _start(_Invocation(event, sys._getframe(), handler))
+            try:
+                return await handler
+            finally:
+                _stop(key)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        event = event_name(fn, args)
+        if random.random() >= PROFILE_SAMPLE_RATE or not is_enabled(event):
+            return fn(*args, **kwargs)
+        key = _start(_Invocation(event, sys._getframe()))
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _stop(key)
+
+    return wrapper
+
+
+def profiled_events() -> dict[str, tuple[int, int]]:
+    """Return ``{event: (profiled invocations, samples)}``."""
+    with _lock:
+        return {
+            event: (_invocations[event], sum(_stacks.get(event, Counter()).values()))
+            for event in _invocations
+        }
+
+
+def collapsed_stacks(event: str) -> str:
+    """Collapsed-stack text (one ``frame;frame;frame count`` line per stack)."""
+    with _lock:
+        counts = dict(_stacks.get(event, {}))
+    return "".join(f"{stack} {count}\n" for stack, count in counts.items())
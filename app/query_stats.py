@@ -0,0 +1,180 @@
+"""In-process statistics and slow-query log for the SQL run through ``app.db``.
+
+Every statement executed by ``app.db`` is reported to :func:`record` with its
+duration, row count, pool wait and the event that issued it. Statements are
+grouped by a normalized fingerprint (literals and parameters replaced by
+``?``) so the same query shape aggregates across calls. Statements slower
+than ``SLOW_QUERY_MS`` are logged and, when ``EXPLAIN_SLOW_QUERIES`` is on,
+re-run under ``EXPLAIN (ANALYZE, BUFFERS)`` in the background (read-only
+``SELECT``/``WITH`` statements only, at most once per fingerprint every
+``EXPLAIN_INTERVAL_SECONDS``).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "500"))
+EXPLAIN_SLOW_QUERIES = os.environ.get("EXPLAIN_SLOW_QUERIES", "false").lower() == "true"
+EXPLAIN_INTERVAL_SECONDS = float(os.environ.get("EXPLAIN_INTERVAL_SECONDS", "300"))
+MAX_SLOW_ENTRIES = 200
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """Normalize a statement so calls differing only in values group together."""
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def calling_event() -> str:
+    """Return ``Class.method`` of the event handler issuing the query.
+
+    Read from the context :func:`app.metrics.track_event` sets, so queries
+    made by helpers are attributed to the event that called them. Empty
+    outside event handlers.
+    """
+    return metrics.current_event.get()
+
+
+@dataclass
+class QueryStat:
+    fingerprint: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    pool_wait_ms: float = 0.0
+    slow_calls: int = 0
+    callers: set[str] = field(default_factory=set)
+    last_plan: str = ""
+    last_explained: float = 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+@dataclass
+class SlowQuery:
+    at: float
+    fingerprint: str
+    duration_ms: float
+    rows: int
+    pool_wait_ms: float
+    caller: str
+
+
+_lock = threading.Lock()
+_stats: dict[str, QueryStat] = {}
+_slow: deque[SlowQuery] = deque(maxlen=MAX_SLOW_ENTRIES)
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+
+def record(
+    sql: str,
+    params,
+    duration_ms: float,
+    rows: int,
+    pool_wait_ms: float,
+    caller: str,
+) -> None:
+    key = fingerprint(sql)
+    slow = duration_ms >= SLOW_QUERY_MS
+    metrics.DB_QUERY_SECONDS.observe(duration_ms / 1000, event=caller)
+    metrics.DB_POOL_WAIT_SECONDS.observe(pool_wait_ms / 1000)
+    explain = False
+    with _lock:
+        stat = _stats.get(key)
+        if stat is None:
+            stat = _stats[key] = QueryStat(fingerprint=key)
+        stat.calls += 1
+        stat.total_ms += duration_ms
+        stat.max_ms = max(stat.max_ms, duration_ms)
+        stat.rows += rows
+        stat.pool_wait_ms += pool_wait_ms
+        if caller:
+            stat.callers.add(caller)
+        if slow:
+            stat.slow_calls += 1
+            _slow.append(
+                SlowQuery(time.time(), key, duration_ms, rows, pool_wait_ms, caller)
+            )
+            now = time.monotonic()
+            if (
+                EXPLAIN_SLOW_QUERIES
+                and _is_read_only(key)
+                and now - stat.last_explained >= EXPLAIN_INTERVAL_SECONDS
+            ):
+                stat.last_explained = now
+                explain = True
+    if slow:
+        logger.warning(
+            f"Slow query {duration_ms:.0f} ms ({rows} rows, "
+            f"waited {pool_wait_ms:.0f} ms for a connection) in {caller or '?'}: {key}"
+        )
+    if explain:
+        _explain_executor.submit(_capture_plan, key, sql, params)
+
+
+def _is_read_only(normalized_sql: str) -> bool:
+    head = normalized_sql.lstrip("( ").split(" ", 1)[0].upper()
+    if head not in ("SELECT", "WITH"):
+        return False
+    upper = normalized_sql.upper()
+    return not any(
+        f" {word} " in f" {upper} " for word in ("INSERT", "UPDATE", "DELETE", "FOR")
+    )
+
+
+def _capture_plan(key: str, sql: str, params) -> None:
+    from app.db import get_pool
+
+    try:
+        with get_pool().connection() as conn:
+            with conn.transaction(force_rollback=True):
+                rows = conn.execute(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params, prepare=False
+                ).fetchall()
+        plan = "\n".join(row[0] for row in rows)
+    except Exception as e:
+        logger.warning(f"Could not capture plan for slow query {key}: {e}")
+        return
+    with _lock:
+        if key in _stats:
+            _stats[key].last_plan = plan
+    logger.info(f"Plan for slow query {key}:\n{plan}")
+
+
+def snapshot() -> tuple[list[QueryStat], list[SlowQuery]]:
+    """Return copies of the per-fingerprint stats (slowest total first) and slow log."""
+    with _lock:
+        stats = [
+            QueryStat(**{**vars(s), "callers": set(s.callers)}) for s in _stats.values()
+        ]
+        slow = list(_slow)
+    stats.sort(key=lambda s: s.total_ms, reverse=True)
+    return stats, slow
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+        _slow.clear()
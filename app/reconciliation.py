@@ -0,0 +1,250 @@
+"""Reconciliation of refund requests against Stripe payments.
+
+Finds refunds and payments that disagree with each other:
+
+* ``missing_payment``: the refund has no payment id, or its payment does not
+  exist.
+* ``duplicate_refund``: more than one refund that was not denied claims the
+  same payment.
+* ``payment_not_refunded``: the refund is approved but its payment is not
+  marked ``refunded``.
+* ``refund_not_approved``: the payment is marked ``refunded`` but no approved
+  refund points at it.
+
+The whole check is one set-based statement: ``refund_requests`` is joined to
+``stripe_payments`` once (a hash join plus a window count per payment), every
+check filters that joined set, and the findings are written to
+``reconciliation_discrepancies`` by the same statement. Nothing is pulled into
+Python, so a run over millions of rows takes seconds. Each run is recorded in
+``reconciliation_runs`` and replaces the previous run's discrepancies; runs
+never overlap.
+
+Command line usage::
+
+    python -m app.reconciliation
+    python -m app.reconciliation --show 20
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+
+from psycopg.types.json import Jsonb
+
+from app.db import fetch_one, get_pool, wait_until_ready
+
+logger = logging.getLogger(__name__)
+
+# Held for the duration of a run so two runs never interleave their writes.
+RECONCILE_LOCK_KEY = 0x7265636F6E63
+# Memory for the join and window sort, so large runs stay in memory.
+RECONCILE_WORK_MEM = os.environ.get("RECONCILE_WORK_MEM", "256MB")
+# Discrepancies listed on the admin page; the counts cover all of them.
+REPORT_ROWS = int(os.environ.get("RECONCILE_REPORT_ROWS", "500"))
+
+KINDS = {
+    "missing_payment": "Refund points at a missing payment",
+    "duplicate_refund": "Payment claimed by several refunds",
+    "payment_not_refunded": "Approved refund, payment not marked refunded",
+    "refund_not_approved": "Refunded payment without an approved refund",
+}
+
+RECONCILE_SQL = """
+    WITH refs AS MATERIALIZED (
+        SELECT r.refund_id, r.payment_id, r.approved,
+               p.payment_id IS NOT NULL AS has_payment,
+               p.payment_status, p.amount_cents,
+               COUNT(*) FILTER (WHERE r.approved IS DISTINCT FROM false)
+                   OVER (PARTITION BY r.payment_id) AS claims
+        FROM refund_requests r
+        LEFT JOIN stripe_payments p ON p.payment_id = r.payment_id
+    ),
+    found AS (
+        INSERT INTO reconciliation_discrepancies
+            (run_id, kind, refund_id, payment_id, amount_cents, detail)
+        SELECT %(run_id)s, 'missing_payment', refund_id, payment_id, NULL,
+               CASE WHEN payment_id IS NULL THEN 'Refund has no payment'
+                    ELSE 'Payment ' || payment_id || ' does not exist' END
+        FROM refs
+        WHERE NOT has_payment
+        UNION ALL
+        SELECT %(run_id)s, 'duplicate_refund', refund_id, payment_id,
+               amount_cents, claims || ' refunds claim this payment'
+        FROM refs
+        WHERE has_payment AND claims > 1 AND approved IS DISTINCT FROM false
+        UNION ALL
+        SELECT %(run_id)s, 'payment_not_refunded', refund_id, payment_id,
+               amount_cents,
+               'Refund approved but payment is ' || COALESCE(payment_status, 'unset')
+        FROM refs
+        WHERE has_payment AND approved
+          AND payment_status IS DISTINCT FROM 'refunded'
+        UNION ALL
+        SELECT %(run_id)s, 'refund_not_approved', NULL, p.payment_id,
+               p.amount_cents, 'Payment refunded without an approved refund'
+        FROM stripe_payments p
+        WHERE p.payment_status = 'refunded'
+          AND NOT EXISTS (
+              SELECT 1 FROM refund_requests r
+              WHERE r.payment_id = p.payment_id AND r.approved
+          )
+        RETURNING kind
+    )
+    SELECT (SELECT COUNT(*) FROM refs),
+           (SELECT COUNT(*) FROM stripe_payments),
+           (SELECT COALESCE(json_object_agg(kind, n), '{}')
+            FROM (SELECT kind, COUNT(*) AS n FROM found GROUP BY kind) k)
+"""
+
+REPORT_SQL = """
+    WITH run AS (
+        SELECT * FROM reconciliation_runs
+        WHERE finished_at IS NOT NULL
+        ORDER BY run_id DESC
+        LIMIT 1
+    )
+    SELECT json_build_object(
+        'run', (
+            SELECT json_build_object(
+                'run_id', run_id,
+                'finished_at', to_char(finished_at, 'YYYY-MM-DD HH24:MI:SS'),
+                'duration', to_char(
+                    EXTRACT(EPOCH FROM finished_at - started_at), 'FM9999990.0'
+                ) || ' s',
+                'refunds', refunds_checked,
+                'payments', payments_checked,
+                'counts', counts
+            )
+            FROM run
+        ),
+        'rows', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'kind', kind,
+                'refund_id', COALESCE(refund_id, ''),
+                'payment_id', COALESCE(payment_id, ''),
+                'amount', CASE WHEN amount_cents IS NULL THEN ''
+                    ELSE '$' || to_char(amount_cents / 100.0, 'FM999999999990.00')
+                    END,
+                'detail', detail
+            ) ORDER BY kind, payment_id, refund_id), '[]')
+            FROM (
+                SELECT d.* FROM reconciliation_discrepancies d
+                JOIN run ON run.run_id = d.run_id
+                WHERE %(kind)s::text = '' OR d.kind = %(kind)s
+                ORDER BY d.kind, d.payment_id, d.refund_id
+                LIMIT %(limit)s
+            ) shown
+        )
+    )
+"""
+
+
+@dataclass
+class ReconciliationRun:
+    run_id: int
+    refunds_checked: int
+    payments_checked: int
+    counts: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def discrepancies(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def summary(self) -> str:
+        return (
+            f"run {self.run_id}: checked {self.refunds_checked} refunds and "
+            f"{self.payments_checked} payments in {self.seconds:.1f}s, "
+            f"{self.discrepancies} discrepancies"
+        )
+
+
+def reconcile() -> ReconciliationRun:
+    """Check every refund against its payment and store the discrepancies.
+
+    Runs in one transaction: the new run's discrepancies and the removal of
+    the previous run's appear together. Raises ``RuntimeError`` if another
+    run is in progress.
+    """
+    wait_until_ready()
+    started = time.perf_counter()
+    pool = get_pool()
+    with pool.connection() as conn:
+        with conn.transaction():
+            locked = conn.execute(
+                "SELECT pg_try_advisory_xact_lock(%s)", (RECONCILE_LOCK_KEY,)
+            ).fetchone()[0]
+            if not locked:
+                raise RuntimeError("A reconciliation run is already in progress.")
+            conn.execute(
+                "SELECT set_config('work_mem', %s, true)", (RECONCILE_WORK_MEM,)
+            )
+            run_id = conn.execute(
+                "INSERT INTO reconciliation_runs DEFAULT VALUES RETURNING run_id"
+            ).fetchone()[0]
+            refunds, payments, counts = conn.execute(
+                RECONCILE_SQL, {"run_id": run_id}
+            ).fetchone()
+            conn.execute(
+                "DELETE FROM reconciliation_discrepancies WHERE run_id < %s",
+                (run_id,),
+            )
+            conn.execute(
+                "UPDATE reconciliation_runs SET finished_at = clock_timestamp(), "
+                "refunds_checked = %s, payments_checked = %s, counts = %s "
+                "WHERE run_id = %s",
+                (refunds, payments, Jsonb(counts), run_id),
+            )
+    run = ReconciliationRun(
+        run_id, refunds, payments, counts, time.perf_counter() - started
+    )
+    logger.info(f"Reconciliation {run.summary}")
+    return run
+
+
+async def latest_report(kind: str = "", limit: int = REPORT_ROWS) -> dict:
+    """Return ``{"run", "rows"}`` for the latest finished run.
+
+    ``run`` is ``None`` before the first run. ``rows`` holds up to ``limit``
+    discrepancies, only those of ``kind`` if given, formatted for display.
+    """
+    row = await fetch_one(REPORT_SQL, {"kind": kind, "limit": limit}, prepare=True)
+    return row[0]
+
+
+def main(argv: list[str] | None = None) -> int:
+    from app.db import ensure_schema
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--show", type=int, default=0, metavar="N", help="print N discrepancies"
+    )
+    args = parser.parse_args(argv)
+    ensure_schema()
+    run = reconcile()
+    print(run.summary)
+    for kind, label in KINDS.items():
+        print(f"  {label}: {run.counts.get(kind, 0)}")
+    if args.show:
+        with get_pool().connection() as conn:
+            rows = conn.execute(
+                "SELECT kind, refund_id, payment_id, detail "
+                "FROM reconciliation_discrepancies WHERE run_id = %s "
+                "ORDER BY kind, payment_id, refund_id LIMIT %s",
+                (run.run_id, args.show),
+            ).fetchall()
+        for kind, refund_id, payment_id, detail in rows:
+            print(f"{kind}\t{refund_id or '-'}\t{payment_id or '-'}\t{detail}")
+    return 1 if run.discrepancies else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    sys.exit(main())
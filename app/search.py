@@ -0,0 +1,119 @@
+"""Global search across tickets, refunds and payments.
+
+Each entity is searched on its list page's search fields (``ILIKE
+'%term%'``, answered from the trigram indexes created in ``db.py``) for its
+best ``SEARCH_LIMIT`` matches, ranked exact match first, then prefix match,
+then any other match, newest first within a rank. The three queries go to
+the database together in one pipelined batch and their results are merged
+into a single ranked list.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import urlencode
+
+from app.db import fetch_batch
+from app.states.payments_state import PAYMENT_SPEC
+from app.states.refunds_state import REFUND_SPEC
+from app.states.tickets_state import TICKET_SPEC
+from app.table_engine import EntitySpec
+
+SEARCH_LIMIT = 5
+# Shorter terms cannot use the trigram indexes, so they are not searched.
+SEARCH_MIN_CHARS = 3
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """How one entity's matches are shown: SQL expressions and the page they open."""
+
+    kind: str
+    spec: EntitySpec
+    title: str
+    detail: str
+    date: str
+    page: str
+
+
+SOURCES = (
+    SearchSource(
+        "Ticket",
+        TICKET_SPEC,
+        title="COALESCE(subject, '')",
+        detail="COALESCE(customer_id, '') || ' · ' || COALESCE(status, '')",
+        date="created_at",
+        page="/tickets",
+    ),
+    SearchSource(
+        "Refund",
+        REFUND_SPEC,
+        title="COALESCE(sku, '')",
+        detail="'Ticket ' || COALESCE(ticket_id, '-')",
+        date="request_date",
+        page="/refunds",
+    ),
+    SearchSource(
+        "Payment",
+        PAYMENT_SPEC,
+        title="'$' || to_char(COALESCE(amount_cents, 0) / 100.0, 'FM999999999990.00')"
+        " || ' ' || COALESCE(currency, '')",
+        detail="COALESCE(customer_id, '') || ' · ' || COALESCE(payment_status, '')",
+        date="payment_date",
+        page="/payments",
+    ),
+)
+
+
+@lru_cache(maxsize=None)
+def _source_sql(source: SearchSource) -> str:
+    fields = source.spec.search_fields
+    rank = ", ".join(
+        f"CASE WHEN {f} ILIKE %(exact)s THEN 0 WHEN {f} ILIKE %(prefix)s THEN 1 "
+        "ELSE 2 END"
+        for f in fields
+    )
+    matches = " OR ".join(f"{f} ILIKE %(pattern)s" for f in fields)
+    return (
+        f"SELECT {source.spec.key}, {source.title}, {source.detail}, "
+        f"LEAST({rank}) AS rank, "
+        f"COALESCE(EXTRACT(EPOCH FROM {source.date}), 0)::float8 AS at "
+        f"FROM {source.spec.table} WHERE {matches} "
+        f"ORDER BY rank, {source.date} DESC NULLS LAST LIMIT %(limit)s"
+    )
+
+
+def _escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def search_all(term: str, limit: int = SEARCH_LIMIT) -> list[dict[str, str]]:
+    """Return up to ``limit`` matches per entity, best first.
+
+    Each match is ``{"kind", "id", "title", "detail", "href"}``.
+    """
+    escaped = _escape(term)
+    params = {
+        "exact": escaped,
+        "prefix": f"{escaped}%",
+        "pattern": f"%{escaped}%",
+        "limit": limit,
+    }
+    results = await fetch_batch(
+        [(_source_sql(source), params) for source in SOURCES], prepare=True
+    )
+    matches = [
+        (rank, -at, source, key, title, detail)
+        for source, rows in zip(SOURCES, results)
+        for key, title, detail, rank, at in rows
+    ]
+    matches.sort(key=lambda m: m[:2])
+    return [
+        {
+            "kind": source.kind,
+            "id": key,
+            "title": title,
+            "detail": detail,
+            "href": f"{source.page}?{urlencode({'search': key})}",
+        }
+        for _, _, source, key, title, detail in matches
+    ]
@@ -0,0 +1,58 @@
+import reflex as rx
+import datetime
+from app import query_stats
+from app.query_stats import SLOW_QUERY_MS
+from app.metrics import track_event
+
+
+class AdminState(rx.State):
+    query_rows: list[dict[str, str]] = []
+    slow_rows: list[dict[str, str]] = []
+    expanded_fingerprint: str = ""
+    slow_query_ms: float = SLOW_QUERY_MS
+
+    @rx.event
+    @track_event
+    def load_query_stats(self):
+        stats, slow = query_stats.snapshot()
+        self.query_rows = [
+            {
+                "fingerprint": s.fingerprint,
+                "calls": str(s.calls),
+                "mean_ms": f"{s.mean_ms:.1f}",
+                "max_ms": f"{s.max_ms:.1f}",
+                "total_ms": f"{s.total_ms:.0f}",
+                "rows": str(s.rows),
+                "pool_wait_ms": f"{s.pool_wait_ms / s.calls:.1f}" if s.calls else "0.0",
+                "slow_calls": str(s.slow_calls),
+                "callers": ", ".join(sorted(s.callers)),
+                "plan": s.last_plan,
+            }
+            for s in stats
+        ]
+        self.slow_rows = [
+            {
+                "at": datetime.datetime.fromtimestamp(q.at).strftime("%Y-%m-%d %H:%M:%S"),
+                "fingerprint": q.fingerprint,
+                "duration_ms": f"{q.duration_ms:.0f}",
+                "rows": str(q.rows),
+                "pool_wait_ms": f"{q.pool_wait_ms:.0f}",
+                "caller": q.caller,
+            }
+            for q in reversed(slow)
+        ]
+
+    @rx.event
+    @track_event
+    def reset_query_stats(self):
+        query_stats.reset()
+        self.expanded_fingerprint = ""
+        return AdminState.load_query_stats
+
+    @rx.event
+    @track_event
+    def toggle_plan(self, fingerprint: str):
+        if self.expanded_fingerprint == fingerprint:
+            self.expanded_fingerprint = ""
+        else:
+            self.expanded_fingerprint = fingerprint
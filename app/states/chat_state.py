@@ -1,30 +1,221 @@
 import reflex as rx
 import os
+import uuid
 from typing import Any
-from openai import AsyncOpenAI
-from databricks.sdk import WorkspaceClient
-from app.db import fetch_all
+from app.clients import async_openai, workspace_client
+from app.db import execute, fetch_all, fetch_batch
+from app import metrics
+from app.metrics import track_event
 import logging
-import json
+import time
 
 LLM_MODEL = os.environ.get("DATABRICKS_LLM_MODEL", "databricks-claude-sonnet-4-5")
+# Messages kept in session state; older ones stay in the chat_messages table
+# and are paged back in on request. At least the 10 sent to the model.
+CHAT_HISTORY_WINDOW = max(10, int(os.environ.get("CHAT_HISTORY_WINDOW", "20")))
+CHAT_HISTORY_PAGE = 20
+GREETING = "Hello! I'm your AI assistant. I have access to your Help Tickets, Refund Requests, and Payment records. How can I help you today?"
 
+SAVE_MESSAGES_SQL = """
+    INSERT INTO chat_messages (conversation_id, seq, role, content)
+    SELECT %(cid)s, seq, role, content
+    FROM unnest(%(seqs)s::int[], %(roles)s::text[], %(contents)s::text[])
+        AS m(seq, role, content)
+    ON CONFLICT DO NOTHING
+"""
+EARLIER_MESSAGES_SQL = """
+    SELECT role, content FROM chat_messages
+    WHERE conversation_id = %(cid)s AND seq >= %(start)s AND seq < %(end)s
+    ORDER BY seq
+"""
 
-class ChatState(rx.State):
-    messages: list[dict[str, str]] = [
+# Each query returns one JSON text value, built and formatted by Postgres.
+TICKET_STATS_SQL = """
+    SELECT COALESCE(json_object_agg(COALESCE(status, 'null'), n), '{}')::text
+    FROM (SELECT status, COUNT(*) AS n FROM help_ticket GROUP BY status) s
+"""
+RECENT_TICKETS_SQL = """
+    SELECT COALESCE(json_agg(t), '[]')::text
+    FROM (
+        SELECT ticket_id AS id, subject, status, customer_id AS customer
+        FROM help_ticket ORDER BY created_at DESC LIMIT 10
+    ) t
+"""
+REFUND_STATS_SQL = """
+    SELECT COALESCE(json_object_agg(
+        CASE approved WHEN TRUE THEN 'True' WHEN FALSE THEN 'False' ELSE 'None' END, n
+    ), '{}')::text
+    FROM (SELECT approved, COUNT(*) AS n FROM refund_requests GROUP BY approved) s
+"""
+RECENT_REFUNDS_SQL = """
+    SELECT COALESCE(json_agg(r), '[]')::text
+    FROM (
+        SELECT refund_id AS id,
+               '$' || to_char(COALESCE(amount_cents, 0) / 100.0, 'FM999999999990.00') AS amount,
+               sku,
+               CASE approved WHEN TRUE THEN 'True' WHEN FALSE THEN 'False' ELSE 'None' END AS approved
+        FROM refund_requests
+        LEFT JOIN stripe_payments ON refund_requests.payment_id = stripe_payments.payment_id
+        ORDER BY request_date DESC LIMIT 10
+    ) r
+"""
+PAYMENT_STATS_SQL = """
+    SELECT COALESCE(json_agg(s), '[]')::text
+    FROM (
+        SELECT payment_status AS status,
+               COUNT(*) AS count,
+               '$' || to_char(COALESCE(SUM(amount_cents), 0) / 100.0, 'FM999999999990.00') AS volume
+        FROM stripe_payments GROUP BY payment_status
+    ) s
+"""
+RECENT_PAYMENTS_SQL = """
+    SELECT COALESCE(json_agg(p), '[]')::text
+    FROM (
+        SELECT payment_id AS id,
+               '$' || to_char(COALESCE(amount_cents, 0) / 100.0, 'FM999999999990.00') AS amount,
+               payment_status AS status,
+               customer_id AS customer
+        FROM stripe_payments ORDER BY payment_date DESC LIMIT 10
+    ) p
+"""
+
+# context selector value -> the sections it includes
+CONTEXT_SECTIONS = {
+    "all": ["tickets", "refunds", "payments"],
+    "tickets": ["tickets"],
+    "refunds": ["refunds"],
+    "payments": ["payments"],
+}
+SECTION_QUERIES = {
+    "tickets": (TICKET_STATS_SQL, RECENT_TICKETS_SQL),
+    "refunds": (REFUND_STATS_SQL, RECENT_REFUNDS_SQL),
+    "payments": (PAYMENT_STATS_SQL, RECENT_PAYMENTS_SQL),
+}
+SECTION_TEMPLATES = {
+    "tickets": "\nTICKET STATISTICS:\n{stats}\nRECENT TICKETS:\n{recent}\n",
+    "refunds": "\nREFUND STATISTICS (None=Pending):\n{stats}\nRECENT REFUNDS:\n{recent}\n",
+    "payments": "\nPAYMENT STATISTICS:\n{stats}\nRECENT PAYMENTS:\n{recent}\n",
+}
+
+
+async def build_data_context(current_context: str) -> str:
+    """Summarize live data for the system prompt.
+
+    All statistics and recent-record queries for the selected sections are
+    sent in a single pipelined batch; each returns its section as JSON text.
+    """
+    sections = CONTEXT_SECTIONS.get(current_context, [])
+    results = await fetch_batch(
+        [(sql, None) for section in sections for sql in SECTION_QUERIES[section]],
+        prepare=True,
+    )
+    data_context = ""
+    for i, section in enumerate(sections):
+        stats, recent = results[2 * i][0][0], results[2 * i + 1][0][0]
+        data_context += SECTION_TEMPLATES[section].format(stats=stats, recent=recent)
+    return data_context
+
+
+async def _save_messages(
+    conversation_id: str, first_seq: int, messages: list[dict[str, str]]
+) -> None:
+    await execute(
+        SAVE_MESSAGES_SQL,
         {
-            "role": "assistant",
-            "content": "Hello! I'm your AI assistant. I have access to your Help Tickets, Refund Requests, and Payment records. How can I help you today?",
-        }
-    ]
+            "cid": conversation_id,
+            "seqs": list(range(first_seq, first_seq + len(messages))),
+            "roles": [m["role"] for m in messages],
+            "contents": [m["content"] for m in messages],
+        },
+    )
+
+
+class ChatState(rx.State):
+    # The latest CHAT_HISTORY_WINDOW messages of the conversation.
+    messages: list[dict[str, str]] = [{"role": "assistant", "content": GREETING}]
+    # The reply being streamed. Kept out of ``messages`` so that each token
+    # sends this one string rather than the whole history.
+    streaming_reply: str = ""
+    has_earlier: bool = False
     loading: bool = False
     context_selector: str = "all"
+    _conversation_id: str = ""
+    # Sequence number of messages[0] and of the next message to save, and how
+    # many messages at the end of ``messages`` are not saved yet.
+    _first_seq: int = 0
+    _next_seq: int = 0
+    _unsaved: int = 1
+
+    def _append(self, role: str, content: str) -> None:
+        self.messages.append({"role": role, "content": content})
+        self._unsaved += 1
+
+    async def _flush_history(self):
+        """Save new messages to chat_messages, then trim ``messages`` to the window.
+
+        If the save fails nothing is trimmed and the messages stay unsaved, so
+        the next flush retries them.
+        """
+        async with self:
+            if not self._conversation_id:
+                self._conversation_id = str(uuid.uuid4())
+            conversation_id = self._conversation_id
+            first_seq = self._next_seq
+            unsaved = [dict(m) for m in self.messages[len(self.messages) - self._unsaved :]]
+        if unsaved:
+            try:
+                await _save_messages(conversation_id, first_seq, unsaved)
+            except Exception as e:
+                logging.exception(f"Error saving chat history: {e}")
+                return
+        async with self:
+            if self._conversation_id != conversation_id:
+                return
+            self._next_seq = first_seq + len(unsaved)
+            self._unsaved -= len(unsaved)
+            overflow = min(
+                len(self.messages) - CHAT_HISTORY_WINDOW,
+                len(self.messages) - self._unsaved,
+            )
+            if overflow > 0:
+                self.messages = self.messages[overflow:]
+                self._first_seq += overflow
+                self.has_earlier = True
+
+    @rx.event(background=True)
+    @track_event
+    async def load_earlier(self):
+        async with self:
+            conversation_id = self._conversation_id
+            end = self._first_seq
+        if not conversation_id or end <= 0:
+            return
+        start = max(0, end - CHAT_HISTORY_PAGE)
+        try:
+            rows = await fetch_all(
+                EARLIER_MESSAGES_SQL,
+                {"cid": conversation_id, "start": start, "end": end},
+                prepare=True,
+            )
+        except Exception as e:
+            logging.exception(f"Error loading chat history: {e}")
+            return
+        async with self:
+            if self._conversation_id != conversation_id or self._first_seq != end:
+                return
+            self.messages = [
+                {"role": row[0], "content": row[1]} for row in rows
+            ] + self.messages
+            self._first_seq = start
+            self.has_earlier = start > 0
 
     @rx.event
+    @track_event
     def set_context(self, value: str):
         self.context_selector = value
 
     @rx.event
+    @track_event
     def clear_chat(self):
         self.messages = [
             {
@@ -32,77 +223,28 @@ class ChatState(rx.State):
                 "content": "Chat history cleared. How can I help you?",
             }
         ]
+        self.has_earlier = False
+        self._conversation_id = ""
+        self._first_seq = 0
+        self._next_seq = 0
+        self._unsaved = 1
 
     @rx.event(background=True)
+    @track_event
     async def send_message(self, form_data: dict[str, Any]):
         user_msg = form_data.get("message_input", "").strip()
         if not user_msg:
             return
         async with self:
-            self.messages.append({"role": "user", "content": user_msg})
+            self._append("user", user_msg)
             self.loading = True
             current_context = self.context_selector
+            history = [
+                dict(m) for m in self.messages if m["role"] != "system"
+            ][-10:]
         yield
-        data_context = ""
         try:
-            if current_context in ["all", "tickets"]:
-                t_rows_stats = await fetch_all(
-                    "SELECT status, COUNT(*) FROM help_ticket GROUP BY status"
-                )
-                t_stats = {row[0]: row[1] for row in t_rows_stats}
-                t_recent_rows = await fetch_all(
-                    "SELECT ticket_id, subject, status, customer_id FROM help_ticket ORDER BY created_at DESC LIMIT 10"
-                )
-                t_rows = [
-                    dict(zip(["id", "subject", "status", "customer"], row))
-                    for row in t_recent_rows
-                ]
-                data_context += f"\nTICKET STATISTICS:\n{json.dumps(t_stats)}\nRECENT TICKETS:\n{json.dumps(t_rows)}\n"
-            if current_context in ["all", "refunds"]:
-                r_rows_stats = await fetch_all(
-                    "SELECT approved, COUNT(*) FROM refund_requests GROUP BY approved"
-                )
-                r_stats = {str(row[0]): row[1] for row in r_rows_stats}
-                r_recent_rows = await fetch_all(
-                    "SELECT refund_id, amount_cents, sku, approved FROM refund_requests LEFT JOIN stripe_payments ON refund_requests.payment_id = stripe_payments.payment_id ORDER BY request_date DESC LIMIT 10"
-                )
-                r_rows = []
-                for row in r_recent_rows:
-                    r_rows.append(
-                        {
-                            "id": row[0],
-                            "amount": f"${(row[1] or 0) / 100:.2f}",
-                            "sku": row[2],
-                            "approved": str(row[3]),
-                        }
-                    )
-                data_context += f"\nREFUND STATISTICS (None=Pending):\n{json.dumps(r_stats)}\nRECENT REFUNDS:\n{json.dumps(r_rows)}\n"
-            if current_context in ["all", "payments"]:
-                p_rows_stats = await fetch_all(
-                    "SELECT payment_status, COUNT(*), SUM(amount_cents) FROM stripe_payments GROUP BY payment_status"
-                )
-                p_stats = []
-                for row in p_rows_stats:
-                    p_stats.append(
-                        {
-                            "status": row[0],
-                            "count": row[1],
-                            "volume": f"${(row[2] or 0) / 100:.2f}",
-                        }
-                    )
-                p_recent_rows = await fetch_all(
-                    "SELECT payment_id, amount_cents, payment_status, customer_id FROM stripe_payments ORDER BY payment_date DESC LIMIT 10"
-                )
-                p_rows = [
-                    dict(
-                        zip(
-                            ["id", "amount", "status", "customer"],
-                            [row[0], f"${(row[1] or 0) / 100:.2f}", row[2], row[3]],
-                        )
-                    )
-                    for row in p_recent_rows
-                ]
-                data_context += f"\nPAYMENT STATISTICS:\n{json.dumps(p_stats)}\nRECENT PAYMENTS:\n{json.dumps(p_rows)}\n"
+            data_context = await build_data_context(current_context)
         except Exception as e:
             logging.exception(f"Error fetching context data: {e}")
             data_context = (
@@ -110,7 +252,7 @@ class ChatState(rx.State):
             )
         system_prompt = f"\n        You are a helpful AI assistant for a Customer Support Admin Dashboard.\n        You have access to the following REAL-TIME database records:\n        \n        {data_context}\n        \n        Instructions:\n        1. Use the provided data to answer specific questions about tickets, refunds, or payments.\n        2. If the data is present, cite specific numbers or IDs.\n        3. If the user asks about data not shown here, politely explain you only see the recent 10 records and summary stats.\n        4. Be concise, professional, and helpful.\n        "
         try:
-            w = WorkspaceClient()
+            w = workspace_client()
             host = w.config.host
             if not host.startswith("http"):
                 host = f"https://{host}"
@@ -119,31 +261,29 @@ class ChatState(rx.State):
         except Exception as e:
             logging.exception(f"Databricks auth error: {e}")
             async with self:
-                self.messages.append(
-                    {
-                        "role": "assistant",
-                        "content": "AI chat requires a Databricks workspace with Foundation Model Serving. "
-                        "Could not authenticate — please check that DATABRICKS_HOST is set and your credentials are configured.",
-                    }
+                self._append(
+                    "assistant",
+                    "AI chat requires a Databricks workspace with Foundation Model Serving. "
+                    "Could not authenticate — please check that DATABRICKS_HOST is set and your credentials are configured.",
                 )
                 self.loading = False
+            await self._flush_history()
             return
         if not token or not host:
             async with self:
-                self.messages.append(
-                    {
-                        "role": "assistant",
-                        "content": "Error: Could not authenticate with Databricks. Please check DATABRICKS_HOST and Service Principal credentials.",
-                    }
+                self._append(
+                    "assistant",
+                    "Error: Could not authenticate with Databricks. Please check DATABRICKS_HOST and Service Principal credentials.",
                 )
                 self.loading = False
+            await self._flush_history()
             return
+        current_content = ""
         try:
-            client = AsyncOpenAI(api_key=token, base_url=f"{host}/serving-endpoints")
+            client = async_openai(token, f"{host}/serving-endpoints")
             api_messages = [{"role": "system", "content": system_prompt}]
-            api_messages.extend(
-                [m for m in self.messages if m["role"] != "system"][-10:]
-            )
+            api_messages.extend(history)
+            requested_at = time.perf_counter()
             response = await client.chat.completions.create(
                 messages=api_messages,
                 model=LLM_MODEL,
@@ -151,17 +291,27 @@ class ChatState(rx.State):
                 temperature=0.5,
                 stream=True,
             )
-            async with self:
-                self.messages.append({"role": "assistant", "content": ""})
-            yield
-            current_content = ""
+            first_token_at = None
+            token_count = 0
             async for chunk in response:
                 if chunk.choices[0].delta.content is not None:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        metrics.LLM_TTFT_SECONDS.observe(first_token_at - requested_at)
+                    token_count += 1
                     content_chunk = chunk.choices[0].delta.content
                     current_content += content_chunk
                     async with self:
-                        self.messages[-1]["content"] = current_content
+                        self.streaming_reply = current_content
                     yield
+            if first_token_at is not None:
+                elapsed = time.perf_counter() - first_token_at
+                if elapsed > 0:
+                    metrics.LLM_TOKENS_PER_SECOND.observe(token_count / elapsed)
+            async with self:
+                self._append("assistant", current_content)
+                self.streaming_reply = ""
+            current_content = ""
         except Exception as e:
             logging.exception(f"LLM Error: {e}")
             error_hint = str(e)
@@ -175,12 +325,11 @@ class ChatState(rx.State):
             else:
                 friendly = f"I encountered an error connecting to the AI service: {error_hint}"
             async with self:
-                self.messages.append(
-                    {
-                        "role": "assistant",
-                        "content": friendly,
-                    }
-                )
+                if current_content:
+                    self._append("assistant", current_content)
+                self._append("assistant", friendly)
         finally:
             async with self:
-                self.loading = False
\ No newline at end of file
+                self.streaming_reply = ""
+                self.loading = False
+            await self._flush_history()
\ No newline at end of file
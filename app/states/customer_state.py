@@ -0,0 +1,89 @@
+import reflex as rx
+from typing import Optional, TypedDict
+from app.customers import load_customer
+from app.metrics import track_event
+import logging
+
+
+class CustomerTotals(TypedDict):
+    tickets: int
+    open_tickets: int
+    payments: int
+    paid: str
+    refunds: int
+    pending_refunds: int
+    refunded: str
+
+
+class CustomerTicket(TypedDict):
+    ticket_id: str
+    subject: str
+    status: str
+    date: str
+
+
+class CustomerPayment(TypedDict):
+    payment_id: str
+    amount: float
+    currency: str
+    status: str
+    date: str
+
+
+class CustomerRefund(TypedDict):
+    refund_id: str
+    ticket_id: str
+    sku: str
+    amount: float
+    approved: Optional[bool]
+    date: str
+
+
+EMPTY_TOTALS: CustomerTotals = {
+    "tickets": 0,
+    "open_tickets": 0,
+    "payments": 0,
+    "paid": "$0.00",
+    "refunds": 0,
+    "pending_refunds": 0,
+    "refunded": "$0.00",
+}
+
+
+class CustomerState(rx.State):
+    # The customer loaded; the route argument itself is ``self.customer_id``.
+    customer: str = ""
+    totals: CustomerTotals = EMPTY_TOTALS
+    tickets: list[CustomerTicket] = []
+    payments: list[CustomerPayment] = []
+    refunds: list[CustomerRefund] = []
+    loading: bool = False
+
+    @rx.var
+    def has_records(self) -> bool:
+        return (
+            self.totals["tickets"] + self.totals["payments"] + self.totals["refunds"]
+            > 0
+        )
+
+    @rx.event(background=True)
+    @track_event
+    async def load_customer(self):
+        async with self:
+            customer_id = self.customer_id
+            self.customer = customer_id
+            self.loading = True
+        try:
+            data = await load_customer(customer_id)
+            async with self:
+                if self.customer != customer_id:
+                    return
+                self.totals = data["totals"]
+                self.tickets = data["tickets"]
+                self.payments = data["payments"]
+                self.refunds = data["refunds"]
+                self.loading = False
+        except Exception as e:
+            logging.exception(f"Error loading customer {customer_id}: {e}")
+            async with self:
+                self.loading = False
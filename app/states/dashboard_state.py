@@ -1,7 +1,7 @@
 import reflex as rx
 from typing import Optional, TypedDict
-from app.db import fetch_all, fetch_one
-import datetime
+from app.db import fetch_batch
+from app.metrics import track_event
 import logging
 
 
@@ -23,6 +23,32 @@ class RefundTrendData(TypedDict):
     count: int
 
 
+TICKET_STATUS_SQL = """
+    SELECT status, COUNT(*) as count
+    FROM help_ticket
+    GROUP BY status
+"""
+REFUND_METRICS_SQL = """
+    SELECT
+        COUNT(*) as total,
+        COUNT(CASE WHEN approved IS NULL THEN 1 END) as pending,
+        COUNT(CASE WHEN approved = TRUE THEN 1 END) as approved
+    FROM refund_requests
+"""
+REFUND_TREND_SQL = """
+    SELECT to_char(DATE(request_date), 'Mon DD') as r_date, COUNT(*) as count
+    FROM refund_requests
+    WHERE request_date IS NOT NULL
+    GROUP BY DATE(request_date)
+    ORDER BY DATE(request_date) ASC
+"""
+PAYMENT_STATUS_SQL = """
+    SELECT payment_status, COUNT(*), SUM(amount_cents)
+    FROM stripe_payments
+    GROUP BY payment_status
+"""
+
+
 class SidebarState(rx.State):
     @rx.var
     def current_page(self) -> str:
@@ -43,15 +69,25 @@ class DashboardState(rx.State):
     is_loading: bool = False
 
     @rx.event(background=True)
+    @track_event
     async def fetch_dashboard_data(self):
         async with self:
             self.is_loading = True
         try:
-            ticket_rows = await fetch_all("""
-                SELECT status, COUNT(*) as count 
-                FROM help_ticket 
-                GROUP BY status
-            """)
+            (
+                ticket_rows,
+                refund_metric_rows,
+                refund_trend_rows,
+                payment_rows,
+            ) = await fetch_batch(
+                [
+                    (TICKET_STATUS_SQL, None),
+                    (REFUND_METRICS_SQL, None),
+                    (REFUND_TREND_SQL, None),
+                    (PAYMENT_STATUS_SQL, None),
+                ],
+                prepare=True,
+            )
             status_colors = {
                 "open": "#10B981",
                 "pending": "#F59E0B",
@@ -74,34 +110,14 @@ class DashboardState(rx.State):
                         "fill": status_colors.get(status, "#6B7280"),
                     }
                 )
-            refund_metrics = await fetch_one("""
-                SELECT 
-                    COUNT(*) as total,
-                    COUNT(CASE WHEN approved IS NULL THEN 1 END) as pending,
-                    COUNT(CASE WHEN approved = TRUE THEN 1 END) as approved
-                FROM refund_requests
-            """)
+            refund_metrics = refund_metric_rows[0] if refund_metric_rows else None
             total_r = refund_metrics[0] if refund_metrics else 0
             pending_r = refund_metrics[1] if refund_metrics else 0
             approved_r = refund_metrics[2] if refund_metrics else 0
             approval_rate = approved_r / total_r * 100 if total_r > 0 else 0.0
-            refund_trend_rows = await fetch_all("""
-                SELECT DATE(request_date) as r_date, COUNT(*) as count
-                FROM refund_requests
-                GROUP BY DATE(request_date)
-                ORDER BY r_date ASC
-            """)
-            temp_refund_trend = []
-            for row in refund_trend_rows:
-                if row[0]:
-                    temp_refund_trend.append(
-                        {"date": row[0].strftime("%b %d"), "count": row[1]}
-                    )
-            payment_rows = await fetch_all("""
-                SELECT payment_status, COUNT(*), SUM(amount_cents)
-                FROM stripe_payments
-                GROUP BY payment_status
-            """)
+            temp_refund_trend = [
+                {"date": row[0], "count": row[1]} for row in refund_trend_rows
+            ]
             payment_colors = {
                 "succeeded": "#10B981",
                 "failed": "#EF4444",
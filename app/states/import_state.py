@@ -0,0 +1,105 @@
+import reflex as rx
+import asyncio
+import logging
+import os
+import tempfile
+from app.importer import import_file
+from app.table_engine import invalidate
+from app.states.payments_state import PaymentsState, PAYMENT_SPEC
+from app.states.refunds_state import RefundsState, REFUND_SPEC
+from app.metrics import track_event
+
+MAX_REPORTED_ERRORS = 100
+# Uploads are copied to disk this many bytes at a time, never read whole.
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class ImportState(rx.State):
+    entity: str = ""
+    is_open: bool = False
+    importing: bool = False
+    summary: str = ""
+    errors: list[dict[str, str]] = []
+    error_count: int = 0
+    # The spooled upload waiting for run_import; kept server-side so a client
+    # cannot point the import at another file.
+    _upload_path: str = ""
+    _upload_format: str = ""
+
+    @rx.event
+    @track_event
+    def open_import(self, entity: str):
+        self.entity = entity
+        self.summary = ""
+        self.errors = []
+        self.error_count = 0
+        self.is_open = True
+
+    @rx.event
+    @track_event
+    def close_import(self):
+        self.is_open = False
+
+    @rx.event
+    @track_event
+    async def handle_upload(self, files: list[rx.UploadFile]):
+        """Spool the upload to a temporary file and import it in the background.
+
+        Upload handlers cannot be background events, so this one only writes
+        the file; the import runs in ``run_import`` without holding the
+        state lock.
+        """
+        if not files or self.importing:
+            return
+        upload = files[0]
+        fmt = "jsonl" if (upload.name or "").endswith((".jsonl", ".ndjson")) else "csv"
+        f = tempfile.NamedTemporaryFile(
+            prefix="import-", suffix=f".{fmt}", delete=False
+        )
+        try:
+            with f:
+                while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+        except Exception as e:
+            logging.exception(f"Error receiving {self.entity} upload: {e}")
+            os.unlink(f.name)
+            return rx.toast(f"Import failed: {str(e)}")
+        self._upload_path = f.name
+        self._upload_format = fmt
+        self.importing = True
+        return ImportState.run_import
+
+    @rx.event(background=True)
+    @track_event
+    async def run_import(self):
+        async with self:
+            entity = self.entity
+            path, fmt = self._upload_path, self._upload_format
+            self._upload_path = ""
+        if not path:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            report = await loop.run_in_executor(None, import_file, entity, path, fmt)
+            async with self:
+                self.summary = report.summary
+                self.error_count = len(report.errors)
+                self.errors = [
+                    {"line": str(line_no), "message": message}
+                    for line_no, message in report.errors[:MAX_REPORTED_ERRORS]
+                ]
+                self.importing = False
+            yield rx.toast(f"Import finished — {report.summary}")
+            if entity == "payments":
+                invalidate(PAYMENT_SPEC)
+                yield PaymentsState.fetch_rows
+            elif entity == "refunds":
+                invalidate(REFUND_SPEC)
+                yield RefundsState.fetch_rows
+        except Exception as e:
+            logging.exception(f"Error importing {entity}: {e}")
+            async with self:
+                self.importing = False
+            yield rx.toast(f"Import failed: {str(e)}")
+        finally:
+            os.unlink(path)
@@ -0,0 +1,503 @@
+"""State shared by the tickets, refunds and payments list pages.
+
+:class:`ListState` holds everything the three pages have in common: paging
+and page size, sorting, the filter and search box, windowed and infinite
+scrolling, expanding a row to show its related records, selection and bulk
+updates, the create/edit modal and deletion. All of it is driven by the
+page's :class:`~app.table_engine.EntitySpec`, so a page's state only declares
+the spec, how to fetch the related records of its rows and how to save its
+form::
+
+    class TicketsState(ListState, rx.State):
+        spec: ClassVar[EntitySpec] = TICKET_SPEC
+        noun: ClassVar[str] = "ticket"
+        sort_column: str = TICKET_SPEC.default_sort
+        _fetch_related = staticmethod(_fetch_related_refunds)
+
+        async def _save_row(self, form_data: dict) -> str:
+            ...
+
+Class attributes must be annotated ``ClassVar``, otherwise Reflex turns them
+into state vars.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, ClassVar
+from urllib.parse import urlencode
+
+import reflex as rx
+
+from app.db import EAGER_RELATED_ROWS, fetch_all
+from app.metrics import track_event
+from app.table_engine import (
+    CHUNK_ROWS,
+    PAGE_SIZES,
+    WINDOW_ROWS,
+    EntitySpec,
+    chunk_step,
+    count_rows,
+    delete_row,
+    fetch_chunk,
+    fetch_page,
+    invalidate,
+    merge_chunk,
+    row_dict,
+    window_start_for,
+)
+
+
+class ListState(rx.State, mixin=True):
+    # The listed table; rows are in its column order, see spec.index().
+    spec: ClassVar[EntitySpec]
+    # Singular name used in messages ("Ticket deleted").
+    noun: ClassVar[str] = ""
+    # Form values for a new record.
+    new_row: ClassVar[dict] = {}
+    # Bulk update over the selected keys (``%(ids)s``); it must return one
+    # ``(key, changed)`` row per key found. Params come from _bulk_change().
+    bulk_sql: ClassVar[str] = ""
+    # ``await _fetch_related(keys)`` returns the related records of each key,
+    # with an entry for every key.
+    _fetch_related: ClassVar[Callable[[list[str]], Awaitable[dict[str, Any]]]]
+
+    rows: list[tuple[Any, ...]] = []
+    loading: bool = False
+    search_query: str = ""
+    # Each state starts sorted by its spec's default_sort.
+    sort_column: str = ""
+    sort_order: str = "desc"
+    filter_value: str = "all"
+    is_open: bool = False
+    is_edit_mode: bool = False
+    editing_id: str = ""
+    delete_id: str = ""
+    expanded_id: str = ""
+    # Backend-only: related records per row on this page, never sent to the
+    # browser; only the expanded row's are, through the page's computed vars.
+    _related_cache: dict[str, Any] = {}
+    eager_related: bool = EAGER_RELATED_ROWS
+    loading_related: bool = False
+    selected_ids: list[str] = []
+    bulk_outcomes: list[dict[str, str]] = []
+    page: int = 1
+    page_size: int = 10
+    total_count: int = 0
+    # Page row that the rows var starts at; see table_engine.window_start_for().
+    window_start: int = 0
+    _window_target: int = 0
+    # Infinite scroll: rows are fetched by cursor as the table scrolls instead
+    # of by page; _cursors holds each loaded row's (sort value, key).
+    infinite: bool = False
+    has_more: bool = False
+    loading_more: bool = False
+    _cursors: list[tuple] = []
+
+    async def _save_row(self, form_data: dict) -> str:
+        """Insert or update the record in the modal form; return the toast."""
+        raise NotImplementedError
+
+    def _bulk_change(self, value: str) -> tuple[dict, str]:
+        """Params for ``bulk_sql`` setting ``value``, and how to describe it."""
+        raise NotImplementedError
+
+    def _row_key(self, row: tuple) -> str:
+        return row[self.spec.index(self.spec.key)]
+
+    @rx.var
+    def total_pages(self) -> int:
+        return (self.total_count + self.page_size - 1) // self.page_size
+
+    @rx.var
+    def page_rows(self) -> int:
+        if self.infinite:
+            return self.window_start + len(self.rows)
+        return max(
+            0, min(self.page_size, self.total_count - (self.page - 1) * self.page_size)
+        )
+
+    @rx.var
+    def has_next(self) -> bool:
+        return self.page < self.total_pages
+
+    @rx.var
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @rx.var
+    def export_query(self) -> str:
+        return urlencode(
+            {
+                "filter": self.filter_value,
+                "search": self.search_query,
+                "sort": self.sort_column,
+                "order": self.sort_order,
+            }
+        )
+
+    @rx.var
+    def page_selected(self) -> bool:
+        return len(self.rows) > 0 and all(
+            self._row_key(row) in self.selected_ids for row in self.rows
+        )
+
+    @rx.var
+    def current_row(self) -> dict:
+        if self.is_edit_mode:
+            for row in self.rows:
+                if self._row_key(row) == self.editing_id:
+                    return row_dict(self.spec, row)
+        return dict(self.new_row)
+
+    @rx.event
+    @track_event
+    def load_page(self):
+        """Apply ``?search=`` and ``?new=true`` from the URL, then fetch."""
+        params = self.router.url.query_parameters
+        if params.get("search"):
+            self.search_query = params["search"]
+            self.page = 1
+        if params.get("new") == "true":
+            return [self.__class__.open_create_modal, self.__class__.fetch_rows]
+        return self.__class__.fetch_rows
+
+    @rx.event(background=True)
+    @track_event
+    async def fetch_rows(self):
+        async with self:
+            self.loading = True
+        try:
+            cursors = []
+            if self.infinite:
+                total = await count_rows(
+                    self.spec, self.filter_value, self.search_query
+                )
+                rows, cursors = await fetch_chunk(
+                    self.spec,
+                    self.filter_value,
+                    self.search_query,
+                    self.sort_column,
+                    self.sort_order,
+                    None,
+                    CHUNK_ROWS,
+                )
+            else:
+                total, rows = await fetch_page(
+                    self.spec,
+                    self.filter_value,
+                    self.search_query,
+                    self.sort_column,
+                    self.sort_order,
+                    self.page,
+                    self.page_size,
+                    limit=WINDOW_ROWS,
+                )
+            related = {}
+            if self.eager_related and rows:
+                related = await self._fetch_related([self._row_key(r) for r in rows])
+            async with self:
+                self.rows = rows
+                self.window_start = 0
+                self._window_target = 0
+                self._cursors = cursors
+                self.has_more = len(cursors) == CHUNK_ROWS
+                self._related_cache = related
+                self.total_count = total
+                self.loading = False
+        except Exception as e:
+            logging.exception(f"Error fetching {self.spec.name}: {e}")
+            async with self:
+                self.loading = False
+
+    @rx.event
+    @track_event
+    def next_page(self):
+        if self.has_next:
+            self.page += 1
+            return self.__class__.fetch_rows
+
+    @rx.event
+    @track_event
+    def prev_page(self):
+        if self.has_prev:
+            self.page -= 1
+            return self.__class__.fetch_rows
+
+    @rx.event
+    @track_event
+    def set_page(self, page_num: int):
+        self.page = page_num
+        return self.__class__.fetch_rows
+
+    @rx.event
+    @track_event
+    def set_page_size(self, size: str):
+        if int(size) in PAGE_SIZES:
+            self.page_size = int(size)
+            self.page = 1
+            return self.__class__.fetch_rows
+
+    @rx.event
+    @track_event
+    def toggle_infinite(self):
+        self.infinite = not self.infinite
+        self.page = 1
+        return self.__class__.fetch_rows
+
+    async def _load_chunk(self, first_visible: int):
+        """Fetch the chunk before or after the loaded rows if scrolling needs it.
+
+        ``window_start`` counts the rows evicted from the top; see
+        table_engine.merge_chunk().
+        """
+        async with self:
+            step = chunk_step(
+                first_visible, self.window_start, len(self.rows), self.has_more
+            )
+            if not step or self.loading_more or not self._cursors:
+                return
+            cursor = self._cursors[-1] if step > 0 else self._cursors[0]
+            self.loading_more = True
+        try:
+            rows, cursors = await fetch_chunk(
+                self.spec,
+                self.filter_value,
+                self.search_query,
+                self.sort_column,
+                self.sort_order,
+                cursor,
+                CHUNK_ROWS,
+                backward=step < 0,
+            )
+            related = {}
+            if self.eager_related and rows:
+                related = await self._fetch_related([self._row_key(r) for r in rows])
+            async with self:
+                self.loading_more = False
+                current = self._cursors[-1:] if step > 0 else self._cursors[:1]
+                if current != [cursor]:
+                    return
+                merged = merge_chunk(
+                    self.rows,
+                    self._cursors,
+                    self.window_start,
+                    rows,
+                    cursors,
+                    step,
+                    self.has_more,
+                )
+                self.rows, self._cursors, self.window_start, self.has_more = merged
+                if self.eager_related:
+                    kept = {self._row_key(r) for r in self.rows}
+                    self._related_cache = {
+                        k: v
+                        for k, v in {**self._related_cache, **related}.items()
+                        if k in kept
+                    }
+        except Exception as e:
+            logging.exception(f"Error fetching {self.spec.name}: {e}")
+            async with self:
+                self.loading_more = False
+
+    @rx.event(background=True)
+    @track_event
+    async def scroll_to_row(self, first_visible: int):
+        if self.infinite:
+            await self._load_chunk(first_visible)
+            return
+        async with self:
+            start = window_start_for(first_visible, self.page_rows)
+            if start == self.window_start:
+                return
+            self._window_target = start
+        try:
+            _, rows = await fetch_page(
+                self.spec,
+                self.filter_value,
+                self.search_query,
+                self.sort_column,
+                self.sort_order,
+                self.page,
+                self.page_size,
+                start=start,
+                limit=WINDOW_ROWS,
+            )
+            related = {}
+            if self.eager_related and rows:
+                related = await self._fetch_related([self._row_key(r) for r in rows])
+            async with self:
+                if self._window_target != start:
+                    return
+                self.rows = rows
+                self.window_start = start
+                if self.eager_related:
+                    self._related_cache = related
+        except Exception as e:
+            logging.exception(f"Error fetching {self.spec.name}: {e}")
+
+    @rx.event(background=True)
+    @track_event
+    async def toggle_row(self, row_id: str):
+        async with self:
+            if self.expanded_id == row_id:
+                self.expanded_id = ""
+                return
+            self.expanded_id = row_id
+            if row_id in self._related_cache:
+                return
+            self.loading_related = True
+        try:
+            related = await self._fetch_related([row_id])
+            async with self:
+                self._related_cache[row_id] = related[row_id]
+                self.loading_related = False
+        except Exception as e:
+            logging.exception(f"Error fetching related records: {e}")
+            async with self:
+                self.loading_related = False
+
+    @rx.event
+    @track_event
+    def sort_by(self, column: str):
+        if self.sort_column == column:
+            self.sort_order = "asc" if self.sort_order == "desc" else "desc"
+        else:
+            self.sort_column = column
+            self.sort_order = "asc"
+        return self.__class__.fetch_rows
+
+    @rx.event
+    @track_event
+    def set_filter(self, value: str):
+        self.filter_value = value
+        self.page = 1
+        return self.__class__.fetch_rows
+
+    @rx.event
+    @track_event
+    def search(self, query: str):
+        self.search_query = query
+        self.page = 1
+        return self.__class__.fetch_rows
+
+    @rx.event
+    @track_event
+    def open_create_modal(self):
+        self.is_edit_mode = False
+        self.is_open = True
+
+    @rx.event
+    @track_event
+    def open_edit_modal(self, row_id: str):
+        self.is_edit_mode = True
+        self.editing_id = row_id
+        self.is_open = True
+
+    @rx.event
+    @track_event
+    def close_modal(self):
+        self.is_open = False
+
+    @rx.event(background=True)
+    @track_event
+    async def save(self, form_data: dict):
+        try:
+            msg = await self._save_row(form_data)
+            invalidate(self.spec)
+            async with self:
+                self.is_open = False
+                yield rx.toast(msg)
+                yield self.__class__.fetch_rows
+        except Exception as e:
+            logging.exception(f"Error saving {self.noun}: {e}")
+            async with self:
+                yield rx.toast(f"Error: {str(e)}")
+
+    @rx.event
+    @track_event
+    def toggle_select(self, row_id: str):
+        if row_id in self.selected_ids:
+            self.selected_ids.remove(row_id)
+        else:
+            self.selected_ids.append(row_id)
+
+    @rx.event
+    @track_event
+    def set_page_selected(self, checked: bool):
+        page_ids = [self._row_key(row) for row in self.rows]
+        if checked:
+            self.selected_ids = self.selected_ids + [
+                key for key in page_ids if key not in self.selected_ids
+            ]
+        else:
+            self.selected_ids = [
+                key for key in self.selected_ids if key not in page_ids
+            ]
+
+    @rx.event
+    @track_event
+    def clear_selection(self):
+        self.selected_ids = []
+
+    @rx.event
+    @track_event
+    def dismiss_bulk_outcomes(self):
+        self.bulk_outcomes = []
+
+    @rx.event(background=True)
+    @track_event
+    async def bulk_set(self, value: str):
+        ids = list(self.selected_ids)
+        if not ids:
+            return
+        try:
+            params, label = self._bulk_change(value)
+            rows = await fetch_all(self.bulk_sql, {**params, "ids": ids})
+            found = {row[0]: row[1] for row in rows}
+            outcomes = [
+                {
+                    "id": key,
+                    "outcome": "not found"
+                    if key not in found
+                    else ("updated" if found[key] else "unchanged"),
+                }
+                for key in ids
+            ]
+            updated_count = sum(1 for o in outcomes if o["outcome"] == "updated")
+            invalidate(self.spec)
+            async with self:
+                self.bulk_outcomes = outcomes
+                self.selected_ids = []
+                yield rx.toast(
+                    f"{updated_count} of {len(ids)} {self.spec.name} {label}"
+                )
+                yield self.__class__.fetch_rows
+        except Exception as e:
+            logging.exception(f"Error updating {self.spec.name} in bulk: {e}")
+            async with self:
+                yield rx.toast(f"Error: {str(e)}")
+
+    @rx.event
+    @track_event
+    def prompt_delete(self, row_id: str):
+        self.delete_id = row_id
+
+    @rx.event
+    @track_event
+    def cancel_delete(self):
+        self.delete_id = ""
+
+    @rx.event(background=True)
+    @track_event
+    async def confirm_delete(self):
+        if not self.delete_id:
+            return
+        try:
+            await delete_row(self.spec, self.delete_id)
+            async with self:
+                self.delete_id = ""
+                yield rx.toast(f"{self.noun.capitalize()} deleted")
+                yield self.__class__.fetch_rows
+        except Exception as e:
+            logging.exception(f"Error deleting {self.noun}: {e}")
+            async with self:
+                yield rx.toast(f"Error: {str(e)}")
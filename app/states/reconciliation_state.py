@@ -0,0 +1,101 @@
+import reflex as rx
+import asyncio
+import logging
+from typing import TypedDict
+from app.reconciliation import KINDS, latest_report, reconcile
+from app.metrics import track_event
+
+
+class Discrepancy(TypedDict):
+    kind: str
+    refund_id: str
+    payment_id: str
+    amount: str
+    detail: str
+
+
+class KindCount(TypedDict):
+    kind: str
+    label: str
+    count: int
+
+
+class ReconciliationState(rx.State):
+    has_run: bool = False
+    finished_at: str = ""
+    duration: str = ""
+    refunds_checked: int = 0
+    payments_checked: int = 0
+    kind_counts: list[KindCount] = []
+    rows: list[Discrepancy] = []
+    kind_filter: str = ""
+    loading: bool = False
+    running: bool = False
+
+    @rx.var
+    def total(self) -> int:
+        return sum(k["count"] for k in self.kind_counts)
+
+    @rx.var
+    def shown_total(self) -> int:
+        if self.kind_filter:
+            return sum(
+                k["count"] for k in self.kind_counts if k["kind"] == self.kind_filter
+            )
+        return self.total
+
+    @rx.event(background=True)
+    @track_event
+    async def load_report(self):
+        async with self:
+            self.loading = True
+            kind = self.kind_filter
+        try:
+            report = await latest_report(kind)
+            async with self:
+                if self.kind_filter != kind:
+                    return
+                run = report["run"]
+                self.has_run = run is not None
+                if run is not None:
+                    counts = run["counts"] or {}
+                    self.finished_at = run["finished_at"]
+                    self.duration = run["duration"]
+                    self.refunds_checked = run["refunds"]
+                    self.payments_checked = run["payments"]
+                    self.kind_counts = [
+                        {"kind": k, "label": label, "count": counts.get(k, 0)}
+                        for k, label in KINDS.items()
+                    ]
+                self.rows = report["rows"]
+                self.loading = False
+        except Exception as e:
+            logging.exception(f"Error loading reconciliation report: {e}")
+            async with self:
+                self.loading = False
+
+    @rx.event
+    @track_event
+    def filter_kind(self, kind: str):
+        self.kind_filter = "" if self.kind_filter == kind else kind
+        return ReconciliationState.load_report
+
+    @rx.event(background=True)
+    @track_event
+    async def run_reconciliation(self):
+        async with self:
+            if self.running:
+                return
+            self.running = True
+        try:
+            loop = asyncio.get_running_loop()
+            run = await loop.run_in_executor(None, reconcile)
+            async with self:
+                self.running = False
+            yield rx.toast(f"Reconciliation finished — {run.summary}")
+            yield ReconciliationState.load_report
+        except Exception as e:
+            logging.exception(f"Error running reconciliation: {e}")
+            async with self:
+                self.running = False
+            yield rx.toast(f"Reconciliation failed: {str(e)}")
@@ -0,0 +1,51 @@
+import reflex as rx
+from typing import TypedDict
+from app.search import SEARCH_MIN_CHARS, search_all
+from app.metrics import track_event
+import logging
+
+
+class SearchResult(TypedDict):
+    kind: str
+    id: str
+    title: str
+    detail: str
+    href: str
+
+
+class SearchState(rx.State):
+    query: str = ""
+    results: list[SearchResult] = []
+    searching: bool = False
+
+    @rx.var
+    def show_results(self) -> bool:
+        return len(self.query) >= SEARCH_MIN_CHARS
+
+    @rx.event(background=True)
+    @track_event
+    async def search(self, query: str):
+        query = query.strip()
+        async with self:
+            self.query = query
+            if len(query) < SEARCH_MIN_CHARS:
+                self.results = []
+                return
+            self.searching = True
+        try:
+            results = await search_all(query)
+            async with self:
+                if self.query != query:
+                    return
+                self.results = results
+                self.searching = False
+        except Exception as e:
+            logging.exception(f"Error searching: {e}")
+            async with self:
+                self.searching = False
+
+    @rx.event
+    @track_event
+    def clear(self):
+        self.query = ""
+        self.results = []
@@ -0,0 +1,27 @@
+import asyncio
+import reflex as rx
+from app import db
+from app.metrics import track_event
+
+POLL_SECONDS = 0.5
+
+
+class StartupState(rx.State):
+    warming_up: bool = False
+    init_error: str = ""
+
+    @rx.event(background=True)
+    @track_event
+    async def watch_database(self):
+        """Show the warming-up banner until the database is initialized."""
+        if db.is_ready():
+            return
+        async with self:
+            self.warming_up = True
+        while not db.is_ready():
+            async with self:
+                self.init_error = db.init_error() or ""
+            await asyncio.sleep(POLL_SECONDS)
+        async with self:
+            self.warming_up = False
+            self.init_error = ""
@@ -0,0 +1,395 @@
+"""Declarative list queries shared by the tickets, refunds and payments pages.
+
+Each entity is described once by an :class:`EntitySpec` (columns, sortable
+fields, search fields, filters). The spec compiles to parameterized SQL that
+is cached per query shape (so each shape is also a single server-side
+prepared statement), and Postgres formats each column from its kind
+(``to_char`` for timestamps, ``COALESCE`` for NULLs), so page rows come
+back ready to display with no per-row Python. The list pages, exports and
+any paging or caching improvements all go through the same code.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app import customers
+from app.cache import TTLCache
+from app.db import execute, fetch_all, fetch_batch, fetch_one
+
+COUNT_CACHE_SECONDS = float(os.environ.get("COUNT_CACHE_SECONDS", "10"))
+
+_count_cache = TTLCache(COUNT_CACHE_SECONDS, name="counts")
+
+# Page sizes offered by the list pages. Pages larger than WINDOW_ROWS are held
+# in state one window at a time: the window moves in WINDOW_STEP-row steps as
+# the table scrolls and starts WINDOW_OVERSCAN rows above the first visible row.
+PAGE_SIZES = (10, 100, 500, 1000, 5000)
+WINDOW_ROWS = 60
+WINDOW_STEP = 20
+WINDOW_OVERSCAN = 10
+# Infinite scroll: rows are fetched CHUNK_ROWS at a time by cursor, at most
+# SCROLL_ROWS are held at once, and the next chunk is fetched once the first
+# visible row is within SCROLL_AHEAD rows of the end of those loaded.
+CHUNK_ROWS = 50
+SCROLL_ROWS = 200
+SCROLL_AHEAD = 40
+
+_FORMATS = {"timestamp": "YYYY-MM-DD HH24:MI", "date": "YYYY-MM-DD"}
+
+
+def _literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+@dataclass(frozen=True)
+class Column:
+    """A selected column.
+
+    ``kind`` is one of ``text``, ``int``, ``bool``, ``timestamp`` or ``date``
+    and controls formatting; ``null`` is the value used when the column is NULL.
+    """
+
+    name: str
+    kind: str = "text"
+    null: Any = ""
+
+    @property
+    def projection(self) -> str:
+        """SQL select expression returning the column formatted for display."""
+        expr = self.name
+        if self.kind in _FORMATS:
+            expr = f"to_char({expr}, '{_FORMATS[self.kind]}')"
+        if self.null is not None:
+            expr = f"COALESCE({expr}, {_literal(self.null)})"
+        return expr if expr == self.name else f"{expr} AS {self.name}"
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """Everything the engine needs to list one table.
+
+    Filtering is either an equality match on ``filter_column`` or, when
+    ``filter_predicates`` is set, one of a fixed set of named predicates.
+    The filter value ``"all"`` disables filtering.
+    """
+
+    name: str
+    table: str
+    key: str
+    columns: tuple[Column, ...]
+    default_sort: str
+    sortable: tuple[str, ...]
+    search_fields: tuple[str, ...]
+    filter_column: str | None = None
+    filter_predicates: tuple[tuple[str, str], ...] = ()
+
+    @property
+    def column_list(self) -> str:
+        return ", ".join(c.name for c in self.columns)
+
+    @property
+    def projection_list(self) -> str:
+        return ", ".join(c.projection for c in self.columns)
+
+    def index(self, column: str) -> int:
+        """Position of ``column`` in the rows returned by :func:`fetch_page`."""
+        return [c.name for c in self.columns].index(column)
+
+
+def _filter_key(spec: EntitySpec, filter_value: str) -> str | None:
+    if not filter_value or filter_value == "all":
+        return None
+    if spec.filter_predicates:
+        return filter_value if filter_value in dict(spec.filter_predicates) else None
+    return "=" if spec.filter_column else None
+
+
+@lru_cache(maxsize=256)
+def _compile_where(spec: EntitySpec, filter_key: str | None, has_search: bool) -> str:
+    conditions = []
+    if filter_key == "=":
+        conditions.append(f"{spec.filter_column} = %(filter)s")
+    elif filter_key is not None:
+        conditions.append(dict(spec.filter_predicates)[filter_key])
+    if has_search:
+        conditions.append(
+            "(" + " OR ".join(f"{f} ILIKE %(search)s" for f in spec.search_fields) + ")"
+        )
+    where = " AND ".join(conditions) if conditions else "TRUE"
+    return f"FROM {spec.table} WHERE {where}"
+
+
+def _order_by(spec: EntitySpec, sort_column: str, sort_order: str) -> str:
+    sort_col = sort_column if sort_column in spec.sortable else spec.default_sort
+    order = "DESC" if sort_order == "desc" else "ASC"
+    # Qualified, so it sorts by the stored column (and can use its index)
+    # rather than by the formatted output column of the same name.
+    return f"ORDER BY {spec.table}.{sort_col} {order}"
+
+
+@lru_cache(maxsize=256)
+def _compile_page(
+    spec: EntitySpec, filter_key: str | None, has_search: bool, order_by: str
+) -> str:
+    return (
+        f"SELECT {spec.projection_list} "
+        f"{_compile_where(spec, filter_key, has_search)} "
+        f"{order_by} LIMIT %(limit)s OFFSET %(offset)s"
+    )
+
+
+def _params(spec: EntitySpec, filter_value: str, search_query: str) -> dict:
+    params = {}
+    if _filter_key(spec, filter_value) == "=":
+        params["filter"] = filter_value
+    if search_query:
+        params["search"] = f"%{search_query}%"
+    return params
+
+
+def select_sql(
+    spec: EntitySpec,
+    filter_value: str,
+    search_query: str,
+    sort_column: str,
+    sort_order: str,
+) -> tuple[str, dict]:
+    """Return the full, unpaginated listing query and its params (for exports)."""
+    where = _compile_where(spec, _filter_key(spec, filter_value), bool(search_query))
+    order_by = _order_by(spec, sort_column, sort_order)
+    return (
+        f"SELECT {spec.column_list} {where} {order_by}",
+        _params(spec, filter_value, search_query),
+    )
+
+
+def _keyset(spec: EntitySpec, sort_col: str, desc: bool, after_null: bool) -> str:
+    """Condition selecting the rows after a cursor ``(sort value, key)``.
+
+    Postgres sorts NULLs last ascending and first descending; the NULL
+    branches keep rows with a NULL sort value reachable.
+    """
+    sort, key = f"{spec.table}.{sort_col}", f"{spec.table}.{spec.key}"
+    if after_null:
+        if desc:
+            return f"({sort} IS NOT NULL OR {key} < %(after_key)s)"
+        return f"({sort} IS NULL AND {key} > %(after_key)s)"
+    if desc:
+        return f"({sort}, {key}) < (%(after_sort)s, %(after_key)s)"
+    return f"(({sort}, {key}) > (%(after_sort)s, %(after_key)s) OR {sort} IS NULL)"
+
+
+@lru_cache(maxsize=256)
+def _compile_chunk(
+    spec: EntitySpec,
+    filter_key: str | None,
+    has_search: bool,
+    sort_col: str,
+    desc: bool,
+    after: str | None,
+) -> str:
+    where = _compile_where(spec, filter_key, has_search)
+    if after is not None:
+        where += " AND " + _keyset(spec, sort_col, desc, after == "null")
+    order = "DESC" if desc else "ASC"
+    return (
+        f"SELECT {spec.projection_list}, {spec.table}.{sort_col} {where} "
+        f"ORDER BY {spec.table}.{sort_col} {order}, {spec.table}.{spec.key} {order} "
+        f"LIMIT %(limit)s"
+    )
+
+
+async def fetch_chunk(
+    spec: EntitySpec,
+    filter_value: str,
+    search_query: str,
+    sort_column: str,
+    sort_order: str,
+    after: tuple | None,
+    limit: int,
+    backward: bool = False,
+) -> tuple[list[tuple], list[tuple]]:
+    """Return up to ``limit`` rows following the cursor ``after``, and their cursors.
+
+    Rows are formatted as by :func:`fetch_page`. A row's cursor is its
+    ``(sort value, key)``; passing the last one fetches the rows after it
+    without an ``OFFSET``, and with ``backward`` passing the first one
+    fetches the rows before it (still returned in display order). The sort
+    key is the stored column plus the table key, so the order is total.
+    """
+    sort_col = sort_column if sort_column in spec.sortable else spec.default_sort
+    desc = (sort_order == "desc") != backward
+    sql = _compile_chunk(
+        spec,
+        _filter_key(spec, filter_value),
+        bool(search_query),
+        sort_col,
+        desc,
+        None if after is None else "null" if after[0] is None else "value",
+    )
+    params = {**_params(spec, filter_value, search_query), "limit": limit}
+    if after is not None:
+        params.update(after_sort=after[0], after_key=after[1])
+    rows = await fetch_all(sql, params, prepare=True)
+    if backward:
+        rows.reverse()
+    key = spec.index(spec.key)
+    return [row[:-1] for row in rows], [(row[-1], row[key]) for row in rows]
+
+
+def chunk_step(first_visible: int, start: int, loaded: int, has_more: bool) -> int:
+    """Which chunk an infinite-scroll list needs: 1 next, -1 previous, 0 none.
+
+    ``start`` is the position of the first loaded row; rows before it have
+    been evicted to keep at most ``SCROLL_ROWS`` loaded.
+    """
+    if has_more and first_visible + SCROLL_AHEAD >= start + loaded:
+        return 1
+    if start > 0 and first_visible < start + WINDOW_OVERSCAN:
+        return -1
+    return 0
+
+
+def merge_chunk(
+    rows: list[tuple],
+    cursors: list[tuple],
+    start: int,
+    chunk: list[tuple],
+    chunk_cursors: list[tuple],
+    step: int,
+    has_more: bool,
+) -> tuple[list[tuple], list[tuple], int, bool]:
+    """Add a chunk fetched for ``step`` (see :func:`chunk_step`) to the loaded rows.
+
+    Returns the new ``(rows, cursors, start, has_more)``. At most
+    ``SCROLL_ROWS`` stay loaded: appending evicts rows from the top (``start``
+    counts them) and prepending evicts from the bottom.
+    """
+    if step > 0:
+        loaded = rows + chunk
+        evicted = max(0, len(loaded) - SCROLL_ROWS)
+        return (
+            loaded[evicted:],
+            (cursors + chunk_cursors)[evicted:],
+            start + evicted,
+            len(chunk) == CHUNK_ROWS,
+        )
+    loaded = chunk + rows
+    return (
+        loaded[:SCROLL_ROWS],
+        (chunk_cursors + cursors)[:SCROLL_ROWS],
+        max(0, start - len(chunk)),
+        has_more or len(loaded) > SCROLL_ROWS,
+    )
+
+
+def window_start_for(first_visible: int, page_rows: int) -> int:
+    """First row of the window to load when ``first_visible`` is scrolled to the top."""
+    start = max(0, first_visible - WINDOW_OVERSCAN) // WINDOW_STEP * WINDOW_STEP
+    return max(0, min(start, page_rows - WINDOW_ROWS))
+
+
+def row_dict(spec: EntitySpec, row: tuple) -> dict:
+    """Map a formatted row back to ``{column: value}`` (e.g. for an edit form)."""
+    return {column.name: value for column, value in zip(spec.columns, row)}
+
+
+def _count_key(spec: EntitySpec, filter_value: str, search_query: str) -> tuple:
+    params = _params(spec, filter_value, search_query)
+    return (_filter_key(spec, filter_value), tuple(sorted(params.items())))
+
+
+def _count_sql(spec: EntitySpec, filter_value: str, search_query: str) -> str:
+    where = _compile_where(spec, _filter_key(spec, filter_value), bool(search_query))
+    return f"SELECT COUNT(*) {where}"
+
+
+async def count_rows(spec: EntitySpec, filter_value: str, search_query: str) -> int:
+    """``COUNT(*)`` for a filter, cached for ``COUNT_CACHE_SECONDS``."""
+    cache_key = _count_key(spec, filter_value, search_query)
+    total = _count_cache.get(spec.name, cache_key)
+    if total is None:
+        result = await fetch_one(
+            _count_sql(spec, filter_value, search_query),
+            _params(spec, filter_value, search_query),
+            prepare=True,
+        )
+        total = result[0] if result else 0
+        _count_cache.set(spec.name, cache_key, total)
+    return total
+
+
+async def fetch_page(
+    spec: EntitySpec,
+    filter_value: str,
+    search_query: str,
+    sort_column: str,
+    sort_order: str,
+    page: int,
+    page_size: int,
+    start: int = 0,
+    limit: int | None = None,
+) -> tuple[int, list[tuple]]:
+    """Return ``(total_count, rows)`` for one page of a listing.
+
+    ``start`` and ``limit`` select a window of the page's rows (see
+    :func:`window_start_for`); by default the whole page is returned.
+
+    Rows are tuples in ``spec`` column order, already formatted by Postgres
+    (see :attr:`Column.projection`). They are kept as tuples rather than
+    dicts so that session state, which Reflex serializes and diffs on every
+    event, does not repeat the column names in every row; use
+    ``spec.index(name)`` to address a column.
+
+    When the count is not cached, the count and page queries are sent
+    together in one pipelined round trip.
+    """
+    sql = _compile_page(
+        spec,
+        _filter_key(spec, filter_value),
+        bool(search_query),
+        _order_by(spec, sort_column, sort_order),
+    )
+    params = _params(spec, filter_value, search_query)
+    size = page_size - start if limit is None else min(limit, page_size - start)
+    page_params = {
+        **params,
+        "limit": size,
+        "offset": (page - 1) * page_size + start,
+    }
+    cache_key = _count_key(spec, filter_value, search_query)
+    total = _count_cache.get(spec.name, cache_key)
+    if total is None:
+        count_result, rows = await fetch_batch(
+            [
+                (_count_sql(spec, filter_value, search_query), params),
+                (sql, page_params),
+            ],
+            prepare=True,
+        )
+        total = count_result[0][0] if count_result else 0
+        _count_cache.set(spec.name, cache_key, total)
+    else:
+        rows = await fetch_all(sql, page_params, prepare=True)
+    return total, rows
+
+
+async def delete_row(spec: EntitySpec, key_value: str) -> None:
+    await execute(
+        f"DELETE FROM {spec.table} WHERE {spec.key} = %(key)s", {"key": key_value}
+    )
+    invalidate(spec)
+
+
+def invalidate(spec: EntitySpec) -> None:
+    """Drop cached results for a table after it has been written to."""
+    _count_cache.invalidate(spec.name)
+    customers.invalidate()
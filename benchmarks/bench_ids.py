@@ -0,0 +1,77 @@
+"""Compare btree insert throughput for random UUIDs vs. time-ordered ids.
+
+Inserts the same number of rows into two identical tables, one keyed by
+``str(uuid.uuid4())`` (the previous id scheme) and one by ``app.ids.new_id``,
+and reports insert rate and final primary-key index size for each. The gap
+widens once the index no longer fits in ``shared_buffers``, so use enough
+rows for your instance size.
+
+Usage::
+
+    python -m benchmarks.bench_ids --dsn postgresql://postgres@localhost/postgres
+    python -m benchmarks.bench_ids --rows 2000000 --batch-size 5000
+"""
+
+import argparse
+import time
+import uuid
+
+import psycopg
+
+from app.ids import new_id, TICKET_PREFIX
+
+GENERATORS = {
+    "uuid4": lambda: str(uuid.uuid4()),
+    "ulid": lambda: new_id(TICKET_PREFIX),
+}
+
+
+def run(dsn: str, rows: int, batch_size: int) -> dict[str, dict[str, float]]:
+    results = {}
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute("CREATE SCHEMA IF NOT EXISTS bench_ids")
+        for name, generate in GENERATORS.items():
+            table = f"bench_ids.ids_{name}"
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"CREATE TABLE {table} (id TEXT PRIMARY KEY, payload TEXT)")
+            started = time.perf_counter()
+            with conn.cursor() as cur:
+                for start in range(0, rows, batch_size):
+                    batch = [
+                        (generate(), "x" * 32)
+                        for _ in range(min(batch_size, rows - start))
+                    ]
+                    with conn.transaction():
+                        cur.executemany(
+                            f"INSERT INTO {table} (id, payload) VALUES (%s, %s)", batch
+                        )
+            elapsed = time.perf_counter() - started
+            index_bytes = conn.execute(
+                "SELECT pg_relation_size(%s::regclass)", (f"{table}_pkey",)
+            ).fetchone()[0]
+            results[name] = {
+                "seconds": elapsed,
+                "rows_per_sec": rows / elapsed,
+                "index_mb": index_bytes / 1024 / 1024,
+            }
+        conn.execute("DROP SCHEMA bench_ids CASCADE")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default="", help="libpq DSN (defaults to PG* env)")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    results = run(args.dsn, args.rows, args.batch_size)
+    print(f"{'ids':<8}{'rows/s':>12}{'seconds':>10}{'index MB':>10}")
+    for name, r in results.items():
+        print(
+            f"{name:<8}{r['rows_per_sec']:>12,.0f}{r['seconds']:>10.1f}{r['index_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare list-page latency with and without server-side prepared statements.
+
+Builds a ``help_ticket``-shaped table, then runs the table engine's page and
+count queries for the tickets list (random filter, search and offset) once
+with ``prepare=False`` (parsed and planned on every call) and once with
+``prepare=True`` (prepared on first use). Also reports the planning time
+Postgres spends on each query shape, which is what preparation saves.
+
+Usage::
+
+    python -m benchmarks.bench_prepared --dsn postgresql://postgres@localhost/postgres
+    python -m benchmarks.bench_prepared --rows 1000000 --iterations 5000
+"""
+
+import argparse
+import dataclasses
+import random
+import re
+import statistics
+import time
+
+import psycopg
+
+from app.states.tickets_state import TICKET_SPEC
+from app.table_engine import (
+    _compile_page,
+    _compile_where,
+    _filter_key,
+    _order_by,
+    _params,
+)
+
+STATUSES = ["open", "pending", "resolved", "closed"]
+SEARCHES = ["", "", "", "CUST-1", "login"]
+
+
+def _setup(conn: psycopg.Connection, table: str, rows: int) -> None:
+    conn.execute("CREATE SCHEMA IF NOT EXISTS bench_prepared")
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(
+        f"""
+        CREATE TABLE {table} AS
+        SELECT 'TKT-' || i AS ticket_id,
+               'CUST-' || (i % 5000) AS customer_id,
+               (ARRAY['Cannot login', 'Billing question', 'Refund please'])[1 + i % 3]
+                   AS subject,
+               (ARRAY['open', 'pending', 'resolved', 'closed'])[1 + i % 4] AS status,
+               NOW() - i * INTERVAL '1 minute' AS created_at,
+               NULL::timestamp AS resolved_at
+        FROM generate_series(1, %s) AS i
+        """,
+        (rows,),
+    )
+    conn.execute(f"CREATE INDEX ON {table} (created_at)")
+    conn.execute(f"CREATE INDEX ON {table} (status, created_at)")
+    conn.execute(f"ANALYZE {table}")
+
+
+def _queries(spec, rng: random.Random) -> list[tuple[str, dict]]:
+    status = rng.choice(["all"] + STATUSES)
+    search = rng.choice(SEARCHES)
+    filter_key = _filter_key(spec, status)
+    params = _params(spec, status, search)
+    page_sql = _compile_page(
+        spec, filter_key, bool(search), _order_by(spec, "created_at", "desc")
+    )
+    count_sql = f"SELECT COUNT(*) {_compile_where(spec, filter_key, bool(search))}"
+    page_params = {**params, "limit": 10, "offset": rng.randrange(0, 50) * 10}
+    return [(count_sql, params), (page_sql, page_params)]
+
+
+def _planning_ms(conn: psycopg.Connection, sql: str, params: dict) -> float:
+    plan = conn.execute(
+        f"EXPLAIN (ANALYZE, SUMMARY, FORMAT TEXT) {sql}", params, prepare=False
+    ).fetchall()
+    for (line,) in plan:
+        match = re.match(r"Planning Time: ([\d.]+) ms", line)
+        if match:
+            return float(match.group(1))
+    return 0.0
+
+
+def run(
+    dsn: str, rows: int, iterations: int, seed: int
+) -> dict[str, dict[str, float]]:
+    spec = dataclasses.replace(TICKET_SPEC, table="bench_prepared.help_ticket")
+    results = {}
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        _setup(conn, spec.table, rows)
+        for mode, prepare in (("unprepared", False), ("prepared", True)):
+            rng = random.Random(seed)
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                for sql, params in _queries(spec, rng):
+                    conn.execute(sql, params, prepare=prepare).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[mode] = {
+                "mean_ms": statistics.fmean(timings),
+                "p50_ms": timings[len(timings) // 2],
+                "p95_ms": timings[int(len(timings) * 0.95)],
+            }
+        rng = random.Random(seed)
+        planning = [
+            _planning_ms(conn, sql, params)
+            for _ in range(50)
+            for sql, params in _queries(spec, rng)
+        ]
+        results["planning"] = {"mean_ms": statistics.fmean(planning)}
+        conn.execute("DROP SCHEMA bench_prepared CASCADE")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default="", help="libpq DSN (defaults to PG* env)")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run(args.dsn, args.rows, args.iterations, args.seed)
+    print(f"{'mode':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for mode in ("unprepared", "prepared"):
+        r = results[mode]
+        print(f"{mode:<12}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}")
+    saved = results["unprepared"]["mean_ms"] - results["prepared"]["mean_ms"]
+    print(
+        f"\nPlanning time per query (unprepared): "
+        f"{results['planning']['mean_ms']:.3f} ms; "
+        f"saved per page load (count + page): {saved:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Measure cold-start import time of the app and fail past a budget.
+
+Imports ``app.app`` (what every backend worker and every hot reload does)
+in fresh interpreters with ``-X importtime``, and reports the median wall
+time, the slowest imports by cumulative time, and any heavy SDK that was
+imported eagerly. Exits non-zero if the median exceeds ``--budget-ms`` or a
+module from ``--lazy`` is imported at startup, so it can gate CI.
+
+Importing does not connect to the database (see ``app.db.init_database``).
+
+Usage::
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --budget-ms 2000 --top 25
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_BUDGET_MS = 2500
+# Heavy SDKs that must only be imported on first use (see app.clients).
+LAZY_MODULES = ("databricks.sdk", "openai")
+
+
+def import_once(module: str) -> tuple[float, dict[str, int]]:
+    """Import ``module`` in a fresh interpreter; return wall seconds and
+    each imported module's cumulative import time in microseconds."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    return elapsed, cumulative
+
+
+def eager_lazy_modules(cumulative: dict[str, int], lazy: list[str]) -> list[str]:
+    """Return the modules of ``lazy`` that were imported, or any submodule."""
+    return [
+        module
+        for module in lazy
+        if any(name == module or name.startswith(module + ".") for name in cumulative)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.environ.get("STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        help=f"fail if the median import exceeds this (default {DEFAULT_BUDGET_MS})",
+    )
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument(
+        "--lazy",
+        nargs="*",
+        default=list(LAZY_MODULES),
+        help="modules that must not be imported at startup",
+    )
+    args = parser.parse_args()
+
+    # The first run warms the OS page cache and is not counted.
+    import_once(args.module)
+    timings = []
+    cumulative: dict[str, int] = {}
+    for _ in range(args.runs):
+        elapsed, cumulative = import_once(args.module)
+        timings.append(elapsed)
+    median_ms = statistics.median(timings) * 1000
+
+    print("Slowest imports (cumulative, last run):")
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+    for name, micros in slowest[: args.top]:
+        print(f"  {micros / 1000:>9.1f} ms  {name}")
+    print(
+        f"\nimport {args.module}: median {median_ms:.0f} ms, "
+        f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms "
+        f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)"
+    )
+
+    failed = False
+    eager = eager_lazy_modules(cumulative, args.lazy)
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: median {median_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
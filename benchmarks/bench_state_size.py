@@ -0,0 +1,241 @@
+"""Measure serialized session state size and per-event diff cost.
+
+Builds one session's state the way the list and chat pages fill it (a page
+of rows with eagerly loaded related records, and a chat conversation), then
+reports for each page:
+
+* ``stored``: pickled bytes of the state, as kept by the Redis state manager
+  and as exposed by the ``reflex_session_state_bytes`` metric;
+* ``hydrate``: JSON bytes sent to the browser on page load;
+* per event: JSON bytes of the delta Reflex computes and sends, and the time
+  taken to compute and serialize it.
+
+No database is needed: rows come from ``app.datagen`` and the related-record
+queries are answered from the same synthetic batch.
+
+Usage::
+
+    python -m benchmarks.bench_state_size
+    python -m benchmarks.bench_state_size --page-size 100 --messages 50 --tokens 300
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+
+import reflex as rx
+from reflex.utils.format import json_dumps
+
+from app.datagen import GenerationConfig, build_batch
+from app.states import chat_state, payments_state, refunds_state, tickets_state
+from app.states.chat_state import ChatState
+from app.states.payments_state import PAYMENT_SPEC, PaymentsState
+from app.states.refunds_state import REFUND_SPEC, RefundsState
+from app.states.tickets_state import TICKET_SPEC, TicketsState
+
+END = datetime.datetime(2025, 1, 1)
+
+
+def _substate(root: rx.State, state: type[rx.State]) -> rx.State:
+    return root.get_substate(state.get_full_name().split(".")[1:])
+
+
+def _delta(root: rx.State, mutate, repeat: int = 1) -> tuple[int, float]:
+    """Apply ``mutate`` ``repeat`` times; return mean delta bytes and ms."""
+    total_bytes, total_seconds = 0, 0.0
+    for i in range(repeat):
+        mutate(i)
+        started = time.perf_counter()
+        payload = json_dumps(root.get_delta())
+        total_seconds += time.perf_counter() - started
+        total_bytes += len(payload)
+        root._clean()
+    return total_bytes // repeat, total_seconds / repeat * 1000
+
+
+def _sizes(root: rx.State, state: rx.State) -> tuple[int, int]:
+    return len(state._serialize()), len(json_dumps(state.dict()))
+
+
+_STRFTIME = {"timestamp": "%Y-%m-%d %H:%M", "date": "%Y-%m-%d"}
+
+
+def _display_row(spec, row: tuple) -> tuple:
+    """Format a datagen row the way ``Column.projection`` does in Postgres."""
+    return tuple(
+        column.null
+        if value is None
+        else value.strftime(_STRFTIME[column.kind])
+        if column.kind in _STRFTIME
+        else value
+        for column, value in zip(spec.columns, row)
+    )
+
+
+def _day(value) -> str:
+    return value.strftime("%Y-%m-%d") if value else ""
+
+
+def _related_queries(tickets, payments, refunds):
+    """Answer the related-record queries of the list states from one batch.
+
+    Returns the JSON values those queries build, already decoded.
+    """
+    payment_by_id = {p[0]: p for p in payments}
+    ticket_by_id = {t[0]: t for t in tickets}
+    by_date = sorted(refunds, key=lambda r: r[4], reverse=True)
+
+    def grouped(wanted, key, entry):
+        related = {}
+        for r in by_date:
+            if r[key] in wanted:
+                related.setdefault(r[key], []).append(entry(r))
+        return list(related.items())
+
+    async def fetch_all(sql, params=None, prepare=None):
+        if "tids" in params:
+            return grouped(
+                set(params["tids"]),
+                1,
+                lambda r: {
+                    "refund_id": r[0],
+                    "amount": (payment_by_id[r[2]][2] or 0) / 100.0,
+                    "approved": r[5],
+                    "date": _day(r[4]),
+                },
+            )
+        if "pids" in params:
+            return grouped(
+                set(params["pids"]),
+                2,
+                lambda r: {
+                    "refund_id": r[0],
+                    "sku": r[3],
+                    "approved": r[5],
+                    "date": _day(r[4]),
+                },
+            )
+        wanted = set(params["rids"])
+        rows = []
+        for r in refunds:
+            if r[0] in wanted:
+                t, p = ticket_by_id[r[1]], payment_by_id[r[2]]
+                ticket = {"subject": t[2], "status": t[3], "customer_id": t[1]}
+                payment = {
+                    "amount": (p[2] or 0) / 100.0,
+                    "currency": p[3],
+                    "status": p[4],
+                    "date": _day(p[5]),
+                }
+                rows.append((r[0], {"ticket": ticket, "payment": payment}))
+        return rows
+
+    return fetch_all
+
+
+def measure(page_size: int, messages: int, tokens: int) -> dict[str, dict]:
+    batch = build_batch(
+        GenerationConfig(
+            tickets=page_size * 2,
+            payments=page_size * 2,
+            refunds=page_size,
+            customers=page_size,
+            end=END,
+        ),
+        0,
+    )
+    fetch_all = _related_queries(batch.tickets, batch.payments, batch.refunds)
+    for module in (tickets_state, refunds_state, payments_state):
+        module.fetch_all = fetch_all
+
+    root = rx.State(_reflex_internal_init=True)
+    results = {}
+    pages = (
+        (
+            TicketsState,
+            TICKET_SPEC,
+            batch.tickets[:page_size],
+            tickets_state._fetch_related_refunds,
+        ),
+        (
+            RefundsState,
+            REFUND_SPEC,
+            batch.refunds[:page_size],
+            refunds_state._fetch_related_records,
+        ),
+        (
+            PaymentsState,
+            PAYMENT_SPEC,
+            batch.payments[:page_size],
+            payments_state._fetch_related_refunds,
+        ),
+    )
+    for state_cls, spec, raw_rows, fetch_related in pages:
+        state = _substate(root, state_cls)
+        rows = [_display_row(spec, row) for row in raw_rows]
+        ids = [row[0] for row in raw_rows]
+        related = asyncio.run(fetch_related(ids))
+
+        def load_page(_, state=state, rows=rows, related=related):
+            state.rows = rows
+            state._related_cache = related
+            state.total_count = 1_000_000
+
+        page_bytes, page_ms = _delta(root, load_page)
+        def expand(i, state=state, ids=ids):
+            state.expanded_id = ids[i % len(ids)]
+
+        expand_bytes, expand_ms = _delta(root, expand, repeat=len(ids))
+        stored, hydrate = _sizes(root, state)
+        results[spec.name] = {
+            "stored": stored,
+            "hydrate": hydrate,
+            "page load delta": page_bytes,
+            "page load ms": page_ms,
+            "expand delta": expand_bytes,
+            "expand ms": expand_ms,
+        }
+
+    chat = _substate(root, ChatState)
+    words = [f"word{i} " for i in range(tokens)]
+    reply = "".join(words)
+    for i in range(messages // 2):
+        chat._append("user", f"Question {i}: how many open tickets are there?")
+        chat._append("assistant", f"{reply}({i})")
+    # What the conversation keeps in state after each reply is saved.
+    chat.messages = chat.messages[-chat_state.CHAT_HISTORY_WINDOW :]
+    root._clean()
+
+    def stream(i):
+        chat.streaming_reply = "".join(words[: i + 1])
+
+    token_bytes, token_ms = _delta(root, stream, repeat=tokens)
+    stored, hydrate = _sizes(root, chat)
+    results["chat"] = {
+        "stored": stored,
+        "hydrate": hydrate,
+        "token delta": token_bytes,
+        "token ms": token_ms,
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=40, help="chat messages sent")
+    parser.add_argument("--tokens", type=int, default=200, help="tokens per reply")
+    args = parser.parse_args()
+
+    results = measure(args.page_size, args.messages, args.tokens)
+    for page, values in results.items():
+        print(page)
+        for name, value in values.items():
+            unit = "ms" if name.endswith("ms") else "bytes"
+            shown = f"{value:.3f}" if unit == "ms" else f"{value:,}"
+            print(f"  {name:<18}{shown:>12} {unit}")
+
+
+if __name__ == "__main__":
+    main()
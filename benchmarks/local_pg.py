@@ -0,0 +1,165 @@
+"""Throwaway local Postgres standing in for Lakebase during benchmarks.
+
+``local_postgres()`` yields libpq connection settings for, in order of
+preference:
+
+1. an existing server given by ``dsn`` (or ``BENCH_DSN``),
+2. a temporary cluster created with ``initdb``/``pg_ctl`` from ``PATH``
+   (or ``--pg-bin``), listening on a free localhost port,
+3. a ``postgres`` Docker container.
+
+The cluster or container is removed again on exit.
+"""
+
+import contextlib
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from typing import Iterator
+
+import psycopg
+
+BENCH_PASSWORD = "bench"
+DOCKER_IMAGE = os.environ.get("BENCH_PG_IMAGE", "postgres:16")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(settings: dict[str, str], timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with psycopg.connect(**settings, password=BENCH_PASSWORD):
+                return
+        except psycopg.OperationalError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def _settings_from_dsn(dsn: str) -> dict[str, str]:
+    info = psycopg.conninfo.conninfo_to_dict(dsn)
+    return {
+        "host": str(info.get("host", "localhost")),
+        "port": str(info.get("port", "5432")),
+        "user": str(info.get("user", "postgres")),
+        "dbname": str(info.get("dbname", "postgres")),
+        "password": str(info.get("password", "")),
+    }
+
+
+@contextlib.contextmanager
+def _pg_ctl_cluster(pg_bin: str) -> Iterator[dict[str, str]]:
+    initdb = os.path.join(pg_bin, "initdb") if pg_bin else shutil.which("initdb")
+    pg_ctl = os.path.join(pg_bin, "pg_ctl") if pg_bin else shutil.which("pg_ctl")
+    data_dir = tempfile.mkdtemp(prefix="bench-pg-")
+    port = _free_port()
+    try:
+        subprocess.run(
+            [initdb, "-D", data_dir, "-U", "postgres", "--auth=trust"],
+            check=True,
+            capture_output=True,
+        )
+        subprocess.run(
+            [
+                pg_ctl,
+                "-D",
+                data_dir,
+                "-l",
+                os.path.join(data_dir, "server.log"),
+                "-o",
+                f"-p {port} -k {data_dir} -c listen_addresses=127.0.0.1",
+                "-w",
+                "start",
+            ],
+            check=True,
+            capture_output=True,
+        )
+        settings = {
+            "host": "127.0.0.1",
+            "port": str(port),
+            "user": "postgres",
+            "dbname": "postgres",
+        }
+        _wait_ready(settings)
+        yield settings
+    finally:
+        subprocess.run(
+            [pg_ctl, "-D", data_dir, "-m", "fast", "stop"], capture_output=True
+        )
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def _docker_container() -> Iterator[dict[str, str]]:
+    port = _free_port()
+    container = subprocess.run(
+        [
+            "docker",
+            "run",
+            "-d",
+            "--rm",
+            "-e",
+            f"POSTGRES_PASSWORD={BENCH_PASSWORD}",
+            "-p",
+            f"127.0.0.1:{port}:5432",
+            DOCKER_IMAGE,
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    try:
+        settings = {
+            "host": "127.0.0.1",
+            "port": str(port),
+            "user": "postgres",
+            "dbname": "postgres",
+        }
+        _wait_ready(settings)
+        yield settings
+    finally:
+        subprocess.run(["docker", "stop", container], capture_output=True)
+
+
+@contextlib.contextmanager
+def local_postgres(dsn: str = "", pg_bin: str = "") -> Iterator[dict[str, str]]:
+    """Yield ``host``/``port``/``user``/``dbname``/``password`` for a local server."""
+    dsn = dsn or os.environ.get("BENCH_DSN", "")
+    if dsn:
+        yield _settings_from_dsn(dsn)
+    elif pg_bin or shutil.which("pg_ctl"):
+        with _pg_ctl_cluster(pg_bin) as settings:
+            yield {**settings, "password": BENCH_PASSWORD}
+    elif shutil.which("docker"):
+        with _docker_container() as settings:
+            yield {**settings, "password": BENCH_PASSWORD}
+    else:
+        raise RuntimeError(
+            "No Postgres available: pass --dsn, put initdb/pg_ctl on PATH "
+            "(or pass --pg-bin), or install Docker."
+        )
+
+
+def use_for_app(settings: dict[str, str]) -> None:
+    """Point ``app.db`` at the local server instead of Lakebase.
+
+    Sets the PG* variables the pool reads and swaps the Databricks token call
+    for the fixed local password.
+    """
+    from app import db
+
+    os.environ["PGHOST"] = settings["host"]
+    os.environ["PGPORT"] = settings["port"]
+    os.environ["PGUSER"] = settings["user"]
+    os.environ["PGDATABASE"] = settings["dbname"]
+    os.environ["PGSSLMODE"] = "disable"
+    password = settings["password"]
+    db.set_credential_provider(lambda: password)
@@ -0,0 +1,326 @@
+"""Load-test the app's data paths against a local Postgres.
+
+Brings up a throwaway Postgres (see ``benchmarks.local_pg``), points
+``app.db`` at it with a fixed password instead of a Databricks token, seeds
+synthetic data (``app.datagen``) scaled by ``--scale`` and drives the same code the event
+handlers run: dashboard aggregates, list pages, search, row expansion,
+payment saves and the chat context. Each scenario runs ``--concurrency``
+concurrent sessions for ``--duration`` seconds and reports p50/p95/p99
+latency and throughput.
+
+Runs are seeded, and ``--output`` writes the results with the package
+versions and settings used, so two runs (e.g. before and after a Reflex or
+psycopg upgrade) can be compared with ``--compare``::
+
+    python -m benchmarks.run --scale 10 --output before.json
+    python -m benchmarks.run --scale 10 --output after.json --compare before.json
+    python -m benchmarks.run --dsn postgresql://postgres@localhost/bench --scenarios list search
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import random
+import subprocess
+import time
+from importlib import metadata
+from typing import Awaitable, Callable
+
+from benchmarks.local_pg import local_postgres, use_for_app
+
+TICKETS_PER_SCALE = 10_000
+PAYMENTS_PER_SCALE = 10_000
+REFUNDS_PER_SCALE = 2_000
+CUSTOMERS_PER_SCALE = 1_000
+WARMUP_ITERATIONS = 5
+SAMPLE_IDS = 1000
+
+
+def seed(scale: int, rng_seed: int) -> dict[str, int]:
+    """Replace the app tables' contents with ``scale`` units of synthetic data."""
+    from app.datagen import GenerationConfig, generate
+
+    config = GenerationConfig(
+        tickets=TICKETS_PER_SCALE * scale,
+        payments=PAYMENTS_PER_SCALE * scale,
+        refunds=REFUNDS_PER_SCALE * scale,
+        customers=CUSTOMERS_PER_SCALE * scale,
+        seed=rng_seed,
+    )
+    generate(config, truncate=True)
+    return {
+        "tickets": config.tickets,
+        "payments": config.payments,
+        "refunds": config.refunds,
+        "customers": config.customers,
+    }
+
+
+def sample_ids() -> dict[str, list[str]]:
+    """Pick existing ticket and refund ids for the row-expansion scenario."""
+    from app.db import get_pool
+
+    with get_pool().connection() as conn:
+        return {
+            table: [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT {column} FROM {table} ORDER BY random() LIMIT %s",
+                    (SAMPLE_IDS,),
+                )
+            ]
+            for table, column in (
+                ("help_ticket", "ticket_id"),
+                ("refund_requests", "refund_id"),
+            )
+        }
+
+
+def scenarios(
+    counts: dict[str, int], ids: dict[str, list[str]]
+) -> dict[str, Callable[[random.Random], Awaitable]]:
+    from app.ids import new_id, PAYMENT_PREFIX
+    from app.db import execute, fetch_batch
+    from app.table_engine import fetch_page, invalidate
+    from app.states.chat_state import build_data_context
+    from app.states.dashboard_state import (
+        TICKET_STATUS_SQL,
+        REFUND_METRICS_SQL,
+        REFUND_TREND_SQL,
+        PAYMENT_STATUS_SQL,
+    )
+    from app.states.tickets_state import TICKET_SPEC, _fetch_related_refunds
+    from app.states.refunds_state import REFUND_SPEC, _fetch_related_records
+    from app.states.payments_state import PAYMENT_SPEC, INSERT_PAYMENT_SQL
+
+    specs = [TICKET_SPEC, REFUND_SPEC, PAYMENT_SPEC]
+
+    def customer_id(rng: random.Random) -> str:
+        return f"CUST-{rng.randrange(counts['customers']):07d}"
+
+    async def dashboard(rng):
+        await fetch_batch(
+            [
+                (TICKET_STATUS_SQL, None),
+                (REFUND_METRICS_SQL, None),
+                (REFUND_TREND_SQL, None),
+                (PAYMENT_STATUS_SQL, None),
+            ],
+            prepare=True,
+        )
+
+    async def list_page(rng):
+        spec = rng.choice(specs)
+        await fetch_page(
+            spec,
+            "all",
+            "",
+            rng.choice(spec.sortable),
+            rng.choice(["asc", "desc"]),
+            rng.randint(1, 20),
+            10,
+        )
+
+    async def search(rng):
+        await fetch_page(
+            TICKET_SPEC,
+            rng.choice(["all", "open", "pending", "resolved", "closed"]),
+            customer_id(rng),
+            "created_at",
+            "desc",
+            1,
+            10,
+        )
+
+    async def expand(rng):
+        if rng.random() < 0.5:
+            await _fetch_related_refunds([rng.choice(ids["help_ticket"])])
+        else:
+            await _fetch_related_records([rng.choice(ids["refund_requests"])])
+
+    async def save(rng):
+        await execute(
+            INSERT_PAYMENT_SQL,
+            {
+                "pid": new_id(PAYMENT_PREFIX),
+                "cid": customer_id(rng),
+                "amt": rng.randint(500, 20000),
+                "curr": "USD",
+                "stat": "succeeded",
+            },
+        )
+        invalidate(PAYMENT_SPEC)
+
+    async def chat_context(rng):
+        await build_data_context("all")
+
+    return {
+        "dashboard": dashboard,
+        "list": list_page,
+        "search": search,
+        "expand": expand,
+        "save": save,
+        "chat_context": chat_context,
+    }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[max(index, 0)]
+
+
+async def run_scenario(
+    operation: Callable[[random.Random], Awaitable],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> dict[str, float]:
+    warmup = random.Random(seed)
+    for _ in range(WARMUP_ITERATIONS):
+        await operation(warmup)
+
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def session(index: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await operation(rng)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_per_s": len(latencies) / elapsed,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def environment(settings: dict[str, str]) -> dict[str, str]:
+    from app.db import get_pool
+
+    with get_pool().connection() as conn:
+        server = conn.execute("SHOW server_version").fetchone()[0]
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    versions = {}
+    for package in ("reflex", "psycopg", "psycopg-pool"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "postgres": server,
+        **versions,
+    }
+
+
+def print_results(results: dict[str, dict[str, float]], baseline: dict | None) -> None:
+    header = f"{'scenario':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    if baseline:
+        header += f"{'Δ p95':>10}{'Δ req/s':>10}"
+    print(header)
+    for name, r in results.items():
+        line = (
+            f"{name:<14}{r['throughput_per_s']:>10.1f}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}"
+        )
+        before = (baseline or {}).get(name)
+        if before:
+            p95 = (r["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+            rps = (
+                (r["throughput_per_s"] / before["throughput_per_s"] - 1) * 100
+                if before["throughput_per_s"]
+                else 0.0
+            )
+            line += f"{p95:>+9.1f}%{rps:>+9.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default="", help="use an existing server (BENCH_DSN)")
+    parser.add_argument("--pg-bin", default="", help="directory containing pg_ctl")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="*", help="subset of scenarios to run")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    with local_postgres(args.dsn, args.pg_bin) as settings:
+        use_for_app(settings)
+        from app.db import ensure_schema
+
+        ensure_schema()
+        counts = seed(args.scale, args.seed)
+        available = scenarios(counts, sample_ids())
+        selected = args.scenarios or list(available)
+        unknown = set(selected) - set(available)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+        async def run_all() -> dict[str, dict[str, float]]:
+            return {
+                name: await run_scenario(
+                    available[name], args.concurrency, args.duration, args.seed
+                )
+                for name in selected
+            }
+
+        results = asyncio.run(run_all())
+        report = {
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "environment": environment(settings),
+            "settings": {
+                "scale": args.scale,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "seed": args.seed,
+                "rows": counts,
+            },
+            "results": results,
+        }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""Simulate concurrent Reflex browser sessions against a running app.
+
+Each simulated session connects to the backend's Reflex websocket
+(``/_event``) with its own token, hydrates like a browser tab and replays
+scripted journeys through real event handlers: opening pages (which fires
+their ``on_load``), searching, paging, expanding rows, approving refunds
+and chatting. Chained events the server sends back are re-emitted as the
+frontend would, and each step is timed until the state it waits for
+arrives in a delta, so background handlers are measured end to end.
+
+Sessions are added in levels (``--levels 10 25 50 100``). At each level the
+per-step round-trip latency is measured for ``--duration`` seconds and the
+app's ``/metrics`` are scraped for resident memory, connected sessions and
+state size, giving memory per session. The first level whose p95 exceeds
+``--degrade-factor`` times the first level's p95 is reported as the point
+where latency degrades.
+
+Journeys write to the database (refund approvals), so run against a test
+deployment seeded with ``app.datagen``. Requires an asyncio websocket
+client: ``pip install "python-socketio[asyncio_client]"``.
+
+Usage::
+
+    reflex run --env prod   # in another terminal
+    python -m benchmarks.ws_load --url http://localhost:8000 --levels 10 50 100 200
+    python -m benchmarks.ws_load --journeys browse --think-ms 200 --output ws.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.request
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import socketio
+from reflex.constants import CompileVars
+from reflex.constants.state import FIELD_MARKER
+from reflex.state import State
+
+from app.states.chat_state import ChatState
+from app.states.dashboard_state import DashboardState
+from app.states.payments_state import PaymentsState
+from app.states.refunds_state import REFUND_SPEC, RefundsState
+from app.states.tickets_state import TICKET_SPEC, TicketsState
+from app.table_engine import EntitySpec
+from benchmarks.run import percentile
+
+ANY = object()
+CONNECT_CONCURRENCY = 20
+
+
+@dataclass(frozen=True)
+class Step:
+    """One user action and the state change that marks it complete.
+
+    ``route`` opens a page (its ``on_load`` runs); otherwise ``handler`` on
+    ``state`` is fired with ``payload`` (a dict, or a function of the session
+    returning one, or None to skip the step). Without ``wait_var`` the step
+    completes on the final update for the event.
+    """
+
+    label: str
+    state: type[State] | None = None
+    handler: str = ""
+    payload: dict | Callable[["Session"], dict | None] = field(default_factory=dict)
+    route: str = ""
+    wait_state: type[State] | None = None
+    wait_var: str = ""
+    wait_value: Any = ANY
+
+
+def _first(
+    state: type[State], spec: EntitySpec, column: str
+) -> Callable[["Session"], Any]:
+    def pick(session: "Session"):
+        rows = session.var(state, "rows") or []
+        return rows[0][spec.index(column)] if rows else None
+
+    return pick
+
+
+def _payload(**builders: Callable[["Session"], Any]) -> Callable[["Session"], dict | None]:
+    def build(session: "Session") -> dict | None:
+        values = {name: pick(session) for name, pick in builders.items()}
+        return None if any(v is None for v in values.values()) else values
+
+    return build
+
+
+def _open(route: str, state: type[State] | None, loading_var: str = "loading") -> Step:
+    if state is None:
+        return Step(f"open {route}", route=route)
+    return Step(
+        f"open {route}",
+        route=route,
+        wait_state=state,
+        wait_var=loading_var,
+        wait_value=False,
+    )
+
+
+JOURNEYS: dict[str, list[Step]] = {
+    "browse": [
+        _open("/", DashboardState, "is_loading"),
+        _open("/tickets", TicketsState),
+        Step(
+            "search tickets",
+            TicketsState,
+            "search",
+            _payload(query=_first(TicketsState, TICKET_SPEC, "customer_id")),
+            wait_state=TicketsState,
+            wait_var="loading",
+            wait_value=False,
+        ),
+        Step(
+            "clear search",
+            TicketsState,
+            "search",
+            {"query": ""},
+            wait_state=TicketsState,
+            wait_var="loading",
+            wait_value=False,
+        ),
+        Step(
+            "next page",
+            TicketsState,
+            "set_page",
+            {"page_num": 2},
+            wait_state=TicketsState,
+            wait_var="loading",
+            wait_value=False,
+        ),
+        Step(
+            "expand ticket",
+            TicketsState,
+            "toggle_row",
+            _payload(row_id=_first(TicketsState, TICKET_SPEC, "ticket_id")),
+            wait_state=TicketsState,
+            wait_var="related_refunds",
+        ),
+        _open("/payments", PaymentsState),
+        Step(
+            "sort payments",
+            PaymentsState,
+            "sort_by",
+            {"column": "amount_cents"},
+            wait_state=PaymentsState,
+            wait_var="loading",
+            wait_value=False,
+        ),
+    ],
+    "refunds": [
+        _open("/refunds", RefundsState),
+        Step(
+            "expand refund",
+            RefundsState,
+            "toggle_row",
+            _payload(row_id=_first(RefundsState, REFUND_SPEC, "refund_id")),
+            wait_state=RefundsState,
+            wait_var="related_ticket",
+        ),
+        Step(
+            "select refund",
+            RefundsState,
+            "toggle_select",
+            _payload(row_id=_first(RefundsState, REFUND_SPEC, "refund_id")),
+        ),
+        Step(
+            "approve refunds",
+            RefundsState,
+            "bulk_set",
+            {"value": "true"},
+            wait_state=RefundsState,
+            wait_var="bulk_outcomes",
+        ),
+    ],
+    "chat": [
+        _open("/chat", None),
+        Step(
+            "chat message",
+            ChatState,
+            "send_message",
+            {"form_data": {"message_input": "How many open tickets are there?"}},
+            wait_state=ChatState,
+            wait_var="loading",
+            wait_value=False,
+        ),
+    ],
+}
+
+
+class StepTimeout(Exception):
+    pass
+
+
+class Session:
+    """One simulated browser tab with its own Reflex token and state mirror."""
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+        self.token = str(uuid.uuid4())
+        self.route = "/"
+        self.state: dict[str, dict[str, Any]] = {}
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.client.on("event", self._on_update)
+        self._waiter: tuple[str, str, Any, asyncio.Future] | None = None
+
+    def var(self, state: type[State], name: str) -> Any:
+        return self.state.get(state.get_full_name(), {}).get(name + FIELD_MARKER)
+
+    async def connect(self) -> None:
+        await self.client.connect(
+            f"{self.url}?token={self.token}",
+            socketio_path="/_event",
+            transports=["websocket"],
+        )
+        await self.run(Step("hydrate", State, CompileVars.HYDRATE))
+
+    async def close(self) -> None:
+        await self.client.disconnect()
+
+    async def _emit(self, name: str, payload: dict) -> None:
+        await self.client.emit(
+            "event",
+            {
+                "token": self.token,
+                "name": name,
+                "payload": payload,
+                "router_data": {"pathname": self.route, "query": {}, "asPath": self.route},
+            },
+        )
+
+    async def _on_update(self, update: dict) -> None:
+        for substate, delta in (update.get("delta") or {}).items():
+            self.state.setdefault(substate, {}).update(delta)
+            if self._waiter and self._waiter[0] == substate:
+                _, key, value, done = self._waiter
+                if key in delta and (value is ANY or delta[key] == value):
+                    if not done.done():
+                        done.set_result(None)
+        for event in update.get("events") or []:
+            # Frontend-only events (toasts, scripts, redirects) start with "_".
+            if not event["name"].startswith("_"):
+                await self._emit(event["name"], event.get("payload") or {})
+        if update.get("final") and self._waiter and self._waiter[0] == "":
+            if not self._waiter[3].done():
+                self._waiter[3].set_result(None)
+
+    async def run(self, step: Step) -> float | None:
+        """Perform ``step`` and return its latency in ms (None if skipped)."""
+        payload = step.payload(self) if callable(step.payload) else step.payload
+        if payload is None:
+            return None
+        if step.route:
+            self.route = step.route
+            name = f"{State.get_full_name()}.{CompileVars.ON_LOAD_INTERNAL}"
+        else:
+            name = f"{step.state.get_full_name()}.{step.handler}"
+        done = asyncio.get_running_loop().create_future()
+        if step.wait_var:
+            key = step.wait_var + FIELD_MARKER
+            self._waiter = (step.wait_state.get_full_name(), key, step.wait_value, done)
+        else:
+            self._waiter = ("", "", ANY, done)
+        started = time.perf_counter()
+        try:
+            await self._emit(name, payload)
+            await asyncio.wait_for(done, self.timeout)
+        except asyncio.TimeoutError:
+            raise StepTimeout(step.label) from None
+        finally:
+            self._waiter = None
+        return (time.perf_counter() - started) * 1000
+
+
+@dataclass
+class LevelStats:
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    recording: bool = False
+
+    def add(self, label: str, latency_ms: float) -> None:
+        if self.recording:
+            self.latencies.setdefault(label, []).append(latency_ms)
+
+    def error(self, label: str) -> None:
+        if self.recording:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+
+async def drive(
+    session: Session,
+    journeys: list[str],
+    think_ms: float,
+    stats: list[LevelStats],
+    stop: asyncio.Event,
+    rng: random.Random,
+) -> None:
+    while not stop.is_set():
+        for step in JOURNEYS[rng.choice(journeys)]:
+            if stop.is_set():
+                return
+            try:
+                latency = await session.run(step)
+            except Exception:
+                stats[-1].error(step.label)
+                continue
+            if latency is not None:
+                stats[-1].add(step.label, latency)
+            await asyncio.sleep(rng.expovariate(1000 / think_ms) if think_ms else 0)
+
+
+def scrape_metrics(url: str) -> dict[str, float]:
+    """Read the gauges used for memory per session from the app's /metrics."""
+    wanted = {
+        "process_resident_memory_bytes": "rss_bytes",
+        "app_active_sessions": "active_sessions",
+        'app_session_state_bytes{quantile="0.5"}': "state_bytes_p50",
+        'app_session_state_bytes{quantile="1"}': "state_bytes_max",
+    }
+    with urllib.request.urlopen(f"{url}/metrics", timeout=10) as response:
+        text = response.read().decode()
+    values = {}
+    for line in text.splitlines():
+        name, _, value = line.rpartition(" ")
+        if name in wanted:
+            values[wanted[name]] = float(value)
+    return values
+
+
+async def run(args: argparse.Namespace) -> dict:
+    stats: list[LevelStats] = [LevelStats()]
+    stop = asyncio.Event()
+    sessions: list[Session] = []
+    tasks: list[asyncio.Task] = []
+    gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    baseline = await asyncio.to_thread(scrape_metrics, args.url)
+    levels = []
+
+    async def start_session(index: int) -> None:
+        session = Session(args.url, args.timeout)
+        async with gate:
+            await session.connect()
+        sessions.append(session)
+        rng = random.Random(args.seed * 100_003 + index)
+        tasks.append(
+            asyncio.create_task(
+                drive(session, args.journeys, args.think_ms, stats, stop, rng)
+            )
+        )
+
+    try:
+        for level in sorted(args.levels):
+            stats.append(LevelStats())
+            await asyncio.gather(*(start_session(i) for i in range(len(sessions), level)))
+            await asyncio.sleep(args.settle)
+            stats[-1].recording = True
+            await asyncio.sleep(args.duration)
+            stats[-1].recording = False
+            scraped = await asyncio.to_thread(scrape_metrics, args.url)
+            all_latencies = sorted(
+                x for values in stats[-1].latencies.values() for x in values
+            )
+            rss_growth = scraped.get("rss_bytes", 0) - baseline.get("rss_bytes", 0)
+            levels.append(
+                {
+                    "sessions": level,
+                    "steps_per_s": len(all_latencies) / args.duration,
+                    "p50_ms": percentile(all_latencies, 50),
+                    "p95_ms": percentile(all_latencies, 95),
+                    "p99_ms": percentile(all_latencies, 99),
+                    "errors": sum(stats[-1].errors.values()),
+                    "memory_per_session_bytes": rss_growth / level,
+                    **scraped,
+                    "steps": {
+                        label: {
+                            "count": len(values),
+                            "p50_ms": percentile(sorted(values), 50),
+                            "p95_ms": percentile(sorted(values), 95),
+                        }
+                        for label, values in stats[-1].latencies.items()
+                    },
+                }
+            )
+            print_level(levels[-1])
+    finally:
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+    knee = None
+    if levels and levels[0]["p95_ms"]:
+        for level in levels[1:]:
+            if level["p95_ms"] > args.degrade_factor * levels[0]["p95_ms"]:
+                knee = level["sessions"]
+                break
+    return {"baseline": baseline, "levels": levels, "degrades_at_sessions": knee}
+
+
+def print_level(level: dict) -> None:
+    print(
+        f"{level['sessions']:>6} sessions  {level['steps_per_s']:>7.1f} steps/s  "
+        f"p50 {level['p50_ms']:>7.1f} ms  p95 {level['p95_ms']:>7.1f} ms  "
+        f"p99 {level['p99_ms']:>7.1f} ms  errors {level['errors']:>4}  "
+        f"{level['memory_per_session_bytes'] / 1024:>8.0f} KiB/session"
+    )
+    for label, step in level["steps"].items():
+        print(f"        {label:<18}{step['count']:>6}  p95 {step['p95_ms']:>7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000", help="backend URL")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 25, 50, 100])
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per level")
+    parser.add_argument("--settle", type=float, default=5.0, help="seconds before measuring")
+    parser.add_argument(
+        "--journeys", nargs="+", choices=sorted(JOURNEYS), default=sorted(JOURNEYS)
+    )
+    parser.add_argument("--think-ms", type=float, default=500.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-step timeout")
+    parser.add_argument("--degrade-factor", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    knee = report["degrades_at_sessions"]
+    if knee:
+        print(f"\np95 exceeded {args.degrade_factor}x the first level at {knee} sessions")
+    else:
+        print("\nNo latency degradation within the tested levels")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), **report}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
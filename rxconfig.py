@@ -1,3 +1,5 @@
+import os
+
 import reflex as rx
 from dotenv import load_dotenv
 
@@ -5,5 +7,9 @@ load_dotenv()
 
 config = rx.Config(
     app_name="app",
+    # With a Redis-compatible server, session state lives in Redis and the
+    # production backend runs several worker processes (GRANIAN_WORKERS,
+    # default 2 x CPUs + 1) behind the same port.
+    redis_url=os.environ.get("REFLEX_REDIS_URL") or None,
     plugins=[rx.plugins.TailwindV3Plugin(), rx.plugins.SitemapPlugin()],
 )